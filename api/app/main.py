@@ -12,6 +12,7 @@ auth = JWTBearer()
 app = FastAPI(title="ANGEL.AI Quantum API", version="0.1.0", dependencies=[Depends(auth)])
 app.middleware("http")(allowlist_middleware)
 app.include_router(quantum.router, prefix="/api")
+app.add_event_handler("shutdown", quantum.jobs.close)
 
 
 @app.get("/health")
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
+from typing import Dict
 import numpy as np
 
 from .indicators import realized_vol
@@ -16,6 +18,10 @@ class SizingParams:
     dd_scale: float = 2.0
     max_fraction: float = 0.20
     min_fraction: float = 0.01
+    # Volatility sized against: "realized" (trailing 20-bar std) or "garch"
+    # (GARCH(1,1) conditional volatility refitted on trailing windows). Only
+    # "garch" runs widen take-profit/stop-loss by DynamicThresholdsConfig.
+    vol_model: str = "realized"
 
 
 @dataclass
@@ -32,12 +38,24 @@ def adaptive_fraction(returns: np.ndarray, dd: float, sp: SizingParams) -> float
     return float(min(sp.max_fraction, max(sp.min_fraction, frac)))
 
 
-def apply_dynamic_thresholds(tp: float, sl: float, rsi_low: float, rsi_high: float, sigma: float, cfg: DynamicThresholdsConfig):
-    """Adjust thresholds when volatility ``sigma`` is high."""
-    if cfg.widen_in_high_vol and sigma > 0.02:
-        tp, sl = tp * cfg.widen_factor, sl * cfg.widen_factor
-        rsi_low, rsi_high = rsi_low - 2, rsi_high + 2
-    return tp, sl, rsi_low, rsi_high
+def apply_dynamic_thresholds(tp: float, sl: float, rsi_low: float, rsi_high: float, sigma, cfg: DynamicThresholdsConfig):
+    """Adjust thresholds when volatility ``sigma`` is high.
+
+    ``sigma`` may be a volatility series, such as
+    :func:`.garch.conditional_vol`; the thresholds are then per bar.
+    """
+    if np.ndim(sigma) == 0:
+        if cfg.widen_in_high_vol and sigma > 0.02:
+            tp, sl = tp * cfg.widen_factor, sl * cfg.widen_factor
+            rsi_low, rsi_high = rsi_low - 2, rsi_high + 2
+        return tp, sl, rsi_low, rsi_high
+    high = cfg.widen_in_high_vol & (np.asarray(sigma) > 0.02)
+    widen = np.where(high, cfg.widen_factor, 1.0)
+    return tp * widen, sl * widen, rsi_low - 2 * high, rsi_high + 2 * high
+
+
+# Upper bound on ``RunConfig.workers``, which sizes process pools.
+MAX_WORKERS = int(os.getenv("QUANTUM_MAX_WORKERS", str(os.cpu_count() or 1)))
 
 
 @dataclass
@@ -45,6 +63,31 @@ class RunConfig:
     """Run parameters for the backtester."""
     reinvest: float = 0.70
     seed: int = 42
+    trials: int = 60
+    workers: int = 1
+    pruner: str = "median"
+    prune_stages: int = 5
+    # Bar length of the input data; higher timeframes are built from it.
+    timeframe: str = "1m"
+    # Higher timeframe each strategy's entries must be confirmed on, by
+    # strategy key, e.g. {"qbx3": "15m", "ms7": "1h"}.
+    confirm_tf: Dict[str, str] = field(default_factory=dict)
+    # "float32" stores price columns and features in single precision;
+    # equity is always compounded in float64.
+    precision: str = "float64"
+    # Artifacts written by run_full: "none", "metrics" (per-bar CSV and
+    # trade ledger) or "full" (also equity and drawdown plots).
+    outputs: str = "full"
+    # Points per plotted curve after LTTB downsampling.
+    plot_points: int = 2000
+    # Leave plots to ``BacktestEngine.render_plots`` so callers can draw
+    # them in the background once the report is returned.
+    background_plots: bool = False
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = min(self.workers, MAX_WORKERS)
 
 
 @dataclass
@@ -2,15 +2,21 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+import copy
+import itertools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict, fields, replace
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
-import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import optuna
 import pandas as pd
+from numpy.lib.format import open_memmap
 
 from .adaptive import (
     DynamicThresholdsConfig,
@@ -18,21 +24,74 @@ from .adaptive import (
     RunConfig,
     SizingParams,
     VenueCosts,
-    adaptive_fraction,
 )
-from .indicators import garch_proxy
+from .engine import (
+    VENUE_CYCLE,
+    PositionState,
+    TradeLedger,
+    resolve_signals,
+    rolling_vol,
+    run_positions,
+    run_positions_batch,
+)
+from .datacache import load_columns
+from .garch import FIT_WINDOW, REFIT_EVERY, walk_forward_vol
+from .features import FeatureCache, cached, feature_cache
+from .plots import Curve, render_curves, render_in_background
+from .shared import SharedFrame, SharedFrameSpec, attach_frame
+from .streaming import FeatureStream
 from .strategies import (
     ATRTrendArbConfig,
     MomentumStacker7Config,
     QBX3Config,
+    SIGNALS,
     SSv2Config,
-    atr_trend_arb,
-    momentum_stacker_7,
-    quantumboost_x3,
-    sentimentsurge_v2,
 )
+from .timeframes import Timeframes
+
+logger = logging.getLogger(__name__)
+
+CONFIG_TYPES = {
+    "qbx3": QBX3Config,
+    "ssv2": SSv2Config,
+    "atra": ATRTrendArbConfig,
+    "ms7": MomentumStacker7Config,
+}
+
+# Flat tuning parameter name -> (strategy key, config field).
+PARAM_FIELDS: Dict[str, Tuple[str, str]] = {
+    "qbx3_rsi_low": ("qbx3", "rsi_buy_low"),
+    "qbx3_rsi_high": ("qbx3", "rsi_sell_high"),
+    "qbx3_sent": ("qbx3", "sentiment_buy"),
+    "qbx3_tp": ("qbx3", "tp_pct"),
+    "qbx3_sl": ("qbx3", "sl_pct"),
+    "ssv2_sent": ("ssv2", "sentiment_buy"),
+    "ssv2_tp": ("ssv2", "tp_pct"),
+    "ssv2_sl": ("ssv2", "sl_pct"),
+    "atra_n": ("atra", "bb_n"),
+    "atra_k": ("atra", "bb_k"),
+    "atra_delta": ("atra", "atr_delta"),
+    "atra_tp": ("atra", "tp_pct"),
+    "atra_sl": ("atra", "sl_pct"),
+    "ms7_mom": ("ms7", "mom_thresh"),
+    "ms7_rsi_low": ("ms7", "rsi_low"),
+    "ms7_rsi_high": ("ms7", "rsi_high"),
+    "ms7_tp": ("ms7", "tp_pct"),
+    "ms7_sl": ("ms7", "sl_pct"),
+}
+
+TrialCallback = Callable[[optuna.Study, optuna.trial.FrozenTrial], None]
+
+# Columns stored in single precision by ``RunConfig.precision="float32"``.
+FLOAT_COLUMNS = ("open", "high", "low", "close", "volume", "sentiment")
+
+OUTPUT_POLICIES = ("none", "metrics", "full")
 
-matplotlib.use("Agg")
+# Length of the synthetic history used without an OHLCV CSV.
+SYNTHETIC_BARS = 6000
+
+# Per-process state for tuning workers, populated by ``_init_worker``.
+_WORKER: Dict[str, Any] = {}
 
 
 @dataclass
@@ -47,6 +106,7 @@ class Result:
     sharpe: float
     max_dd: float
     pnl: float
+    ledger: Optional[np.ndarray] = None
 
 
 class BacktestEngine:
@@ -75,105 +135,353 @@ class BacktestEngine:
         self.run = run
         self.seed = seed
         self.outdir = outdir
+        # Plots deferred by ``run.background_plots`` until ``render_plots``.
+        self.pending_plots: Dict[str, Curve] = {}
 
     def load_data(self) -> pd.DataFrame:
         """Load OHLCV and sentiment data, synthesising if necessary."""
         if self.csv:
-            df = pd.read_csv(self.csv)
-            df = df.rename(columns={c: c.lower() for c in df.columns})
+            df = load_columns(self.csv)
         else:
-            n = 6000
-            t = np.arange(n)
-            rng = np.random.default_rng(self.seed)
-            close = 100 + np.sin(t / 50.0) * 2 + rng.normal(0, 0.5, size=n)
-            high = close + 0.5
-            low = close - 0.5
-            volume = 1e5 + rng.normal(0, 2e4, size=n)
-            df = pd.DataFrame(
-                {
-                    "ts": t,
-                    "open": close,
-                    "high": high,
-                    "low": low,
-                    "close": close,
-                    "volume": volume,
-                }
-            )
+            df = pd.DataFrame({"ts": np.arange(SYNTHETIC_BARS), **synthetic_ohlcv(self.seed)})
         if self.csv_sent and Path(self.csv_sent).exists():
-            s = pd.read_csv(self.csv_sent)
-            s = s.rename(columns={c: c.lower() for c in s.columns})
+            s = load_columns(self.csv_sent)
             df["sentiment"] = s.get("sentiment", pd.Series(0.0, index=df.index)).fillna(0.0)
         else:
-            df["sentiment"] = 0.6 + 0.1 * np.tanh(np.sin(np.arange(len(df)) / 300.0))
+            df["sentiment"] = synthetic_sentiment(len(df))
+        dtype = self._float_dtype()
+        if dtype != np.float64:
+            cols = [c for c in FLOAT_COLUMNS if c in df]
+            df[cols] = df[cols].astype(dtype)
+        feature_cache(df)
         return df
 
+    def _float_dtype(self) -> type:
+        """Float type of columns and features selected by ``run.precision``."""
+        if self.run.precision == "float64":
+            return np.float64
+        if self.run.precision == "float32":
+            return np.float32
+        raise ValueError(f"unknown precision {self.run.precision!r}; expected float64 or float32")
+
+    def _widening(self) -> Optional[DynamicThresholdsConfig]:
+        """Threshold widening for trades; only GARCH-sized runs widen."""
+        return self.dyn if self.sizing.vol_model == "garch" else None
+
     def _tx_cost(self, venue: str, taker: bool = True) -> float:
         """Return the transaction cost for a venue."""
         c = self.venues.get(venue, VenueCosts())
         return c.taker_fee if taker else c.maker_fee
 
-    def simulate(self, df: pd.DataFrame, params: Dict[str, Any]) -> Result:
-        """Simulate trading given parameterised strategies."""
+    def _signals(self, df: pd.DataFrame, params: Dict[str, Any]) -> Tuple[np.ndarray, ...]:
+        """Return the position-engine inputs for ``params`` over ``df``."""
+        cache = feature_cache(df)
         px = df["close"].to_numpy()
         hi = df["high"].to_numpy()
         lo = df["low"].to_numpy()
-        vol = np.maximum(1.0, df["volume"].to_numpy())
+        vol = cached(
+            cache, ("floor", "volume", 1.0), lambda: np.maximum(1.0, df["volume"].to_numpy())
+        )
         sent = df["sentiment"].to_numpy()
-        ret = np.diff(px, prepend=px[0]) / px
-        sigma = garch_proxy(ret, 200)
-
-        e1, x1, tp1, sl1 = quantumboost_x3(px, vol, sent, params["qbx3"])
-        e2, x2, tp2, sl2 = sentimentsurge_v2(px, vol, sent, params["ssv2"])
-        e3, x3, tp3, sl3 = atr_trend_arb(px, hi, lo, params["atra"])
-        e4, x4, tp4, sl4 = momentum_stacker_7(px, params["ms7"])
-
-        entries = {"QBX3": e1, "SSv2": e2, "ATRA": e3, "MS7": e4}
-        exits = {"QBX3": x1, "SSv2": x2, "ATRA": x3, "MS7": x4}
-        tps = {"QBX3": tp1, "SSv2": tp2, "ATRA": tp3, "MS7": tp4}
-        sls = {"QBX3": sl1, "SSv2": sl2, "ATRA": sl3, "MS7": sl4}
-
-        equity = np.ones_like(px)
-        peak = 1.0
-        dd = 0.0
-        trades = 0
-        wins = 0
-        venue_cycle = ["binance", "bybit", "coinbase", "kraken"]
-        venue_idx = 0
-        frac = 0.01
-        for i in range(1, len(px)):
-            frac = adaptive_fraction(ret[:i], dd, self.sizing)
-            take = False
-            who = None
-            for name, mask in entries.items():
-                if mask[i]:
-                    who = name
-                    take = True
-                    break
-            if take:
-                tp = tps[who]
-                sl = sls[who]
-                r = (px[i] - px[i - 1]) / px[i - 1]
-                venue = venue_cycle[venue_idx % len(venue_cycle)]
-                venue_idx += 1
-                fee = self._tx_cost(venue, taker=True) + self.fees.slippage_bp / 1e4
-                pnl = (tp if r > tp else (-sl if r < -sl else r)) - fee
-                equity[i] = equity[i - 1] * (1 + frac * pnl)
-                trades += 1
-                wins += 1 if pnl > 0 else 0
-            else:
-                equity[i] = equity[i - 1]
-            peak = max(peak, equity[i])
-            dd = max(dd, (peak - equity[i]) / peak)
+        ret = cached(cache, ("ret", "close"), lambda: np.diff(px, prepend=px[0]) / px)
+        rv = self._volatility(ret, cache)
+
+        frames = Timeframes(df, self.run.timeframe)
+        entries, tps, sls = self._entries(px, hi, lo, vol, sent, params, cache, frames)
+        return px, rv, resolve_signals(entries), tps, sls, self._fee_cycle()
+
+    def simulate_paths(
+        self, paths: Mapping[str, np.ndarray], params: Dict[str, Any]
+    ) -> Dict[str, np.ndarray]:
+        """Simulate ``params`` over many independent price paths at once.
+
+        ``paths`` holds ``(runs, bars)`` close, high, low and volume
+        columns, as from :func:`synthetic_paths`, and a sentiment column
+        broadcastable to them. Indicators and signals are computed over the
+        whole matrix; paths trade on different bars, so positions are then
+        stepped path by path. Returns one entry per path of equity, pnl,
+        max_dd, trades, wins, wr and sharpe, matching :meth:`simulate`.
+        """
+        px = paths["close"]
+        vol = np.maximum(1.0, paths["volume"])
+        ret = np.diff(px, prepend=px[..., :1], axis=-1) / px
+        rv = self._volatility(ret, None)
+        entries, tps, sls = self._entries(
+            px, paths["high"], paths["low"], vol, paths["sentiment"], params, None
+        )
+        signal = resolve_signals(entries)
+        fee_cycle = self._fee_cycle()
+        rows = []
+        dyn = self._widening()
+        for i in range(len(px)):
+            equity, state = run_positions(
+                px[i], rv[i], signal[i], tps[i], sls[i], fee_cycle, self.sizing, dyn=dyn
+            )
+            rows.append(
+                (equity[-1], state.max_dd, state.trades, state.wins, _sharpe(equity))
+            )
+        equity, max_dd, trades, wins, sharpe = (np.array(c) for c in zip(*rows))
+        return {
+            "equity": equity,
+            "pnl": equity - 1.0,
+            "max_dd": max_dd,
+            "trades": trades,
+            "wins": wins,
+            "wr": wins / np.maximum(1, trades),
+            "sharpe": sharpe,
+        }
+
+    def _volatility(self, ret: np.ndarray, cache: Optional[FeatureCache]) -> np.ndarray:
+        """Per-bar volatility that trades are sized against."""
+        model = self.sizing.vol_model
+        if model == "realized":
+            return cached(cache, ("realized_vol", "ret", 20), lambda: rolling_vol(ret, 20))
+        if model == "garch":
+            return cached(
+                cache, ("garch_vol", "ret", FIT_WINDOW, REFIT_EVERY), lambda: self._garch_vol(ret)
+            )
+        raise ValueError(f"unknown vol_model {model!r}")
+
+    @staticmethod
+    def _garch_vol(ret: np.ndarray) -> np.ndarray:
+        """Walk-forward GARCH volatility; realized volatility until the first fit."""
+        vol = walk_forward_vol(ret)
+        warm = np.isnan(vol)
+        vol[warm] = rolling_vol(ret, 20)[warm]
+        return vol
+
+    def _entries(
+        self,
+        px: np.ndarray,
+        hi: np.ndarray,
+        lo: np.ndarray,
+        vol: np.ndarray,
+        sent: np.ndarray,
+        params: Dict[str, Any],
+        cache: Optional[FeatureCache],
+        frames: Optional[Timeframes] = None,
+    ) -> Tuple[Tuple[np.ndarray, ...], np.ndarray, np.ndarray]:
+        """Return entry masks in priority order and take-profit/stop-loss by code.
+
+        All strategies are evaluated by the compiled :data:`SIGNALS`
+        program. Higher-timeframe confirmations need ``frames`` over the
+        whole history.
+        """
+        columns = {"close": px, "high": hi, "low": lo, "volume": vol, "sentiment": sent}
+        masks = SIGNALS.evaluate(columns, params, cache, frames)
+        entries = tuple(masks[key, "entries"] for key in CONFIG_TYPES)
+        tp = [params[key].tp_pct for key in CONFIG_TYPES]
+        sl = [params[key].sl_pct for key in CONFIG_TYPES]
+        lead = np.broadcast_shapes(*(np.shape(e) for e in entries))[:-1]
+        return entries, _by_code(tp, lead), _by_code(sl, lead)
+
+    def _fee_cycle(self) -> np.ndarray:
+        """All-in taker fee per venue in round-robin order."""
+        return np.array(
+            [self._tx_cost(v, taker=True) + self.fees.slippage_bp / 1e4 for v in VENUE_CYCLE]
+        )
+
+    def simulate(self, df: pd.DataFrame, params: Dict[str, Any]) -> Result:
+        """Simulate trading given parameterised strategies.
+
+        The result carries a per-trade ledger with the :data:`TRADE_DTYPE`
+        fields.
+        """
+        inputs = self._signals(df, params)
+        ledger = TradeLedger(int(np.count_nonzero(inputs[2])))
+        equity, state = run_positions(*inputs, self.sizing, ledger=ledger, dyn=self._widening())
+        trades, wins = state.trades, state.wins
         wr = wins / max(1, trades)
         pnl = equity[-1] - 1.0
-        sharpe = float(
-            np.mean(np.diff(equity)) / (np.std(np.diff(equity)) + 1e-9) * np.sqrt(252 * 24 * 12)
-        )
+        sharpe = _sharpe(equity)
         drawdown = 1 - equity / np.maximum.accumulate(equity)
-        return Result(equity, drawdown, trades, wins, wr, sharpe, float(np.max(drawdown)), pnl)
+        return Result(
+            equity, drawdown, trades, wins, wr, sharpe, float(np.max(drawdown)), pnl, ledger.records
+        )
 
-    def _objective(self, trial: optuna.Trial, df: pd.DataFrame) -> float:
-        """Optuna objective for hyper-parameter tuning."""
+    def precision_check(self, params: Dict[str, Any]) -> Dict[str, float]:
+        """Compare a ``float32`` run of ``params`` against ``float64``.
+
+        Returns the share of bars with the same signal, the relative error
+        of the final equity, the absolute ``max_dd`` error, and the feature
+        cache footprint of the ``float32`` run relative to ``float64``.
+        """
+        runs = {}
+        for precision in ("float64", "float32"):
+            engine = copy.copy(self)
+            engine.run = replace(self.run, precision=precision)
+            df = engine.load_data()
+            signal = engine._signals(df, params)[2]
+            runs[precision] = (signal, engine.simulate(df, params), feature_cache(df).nbytes)
+        (sig64, res64, bytes64), (sig32, res32, bytes32) = runs["float64"], runs["float32"]
+        eq64, eq32 = float(res64.equity_curve[-1]), float(res32.equity_curve[-1])
+        return {
+            "signal_agreement": float(np.mean(sig64 == sig32)),
+            "equity_rel_error": abs(eq32 - eq64) / abs(eq64),
+            "max_dd_error": abs(res32.max_dd - res64.max_dd),
+            "feature_bytes_ratio": bytes32 / max(1, bytes64),
+        }
+
+    def simulate_stages(
+        self, df: pd.DataFrame, params: Dict[str, Any], stages: int
+    ) -> Iterator[PositionState]:
+        """Yield the position carry after each of ``stages`` equal bar segments.
+
+        The final carry matches :meth:`simulate` exactly, so callers can
+        stop early without stepping positions over the remaining bars.
+        Signals are computed once, over the whole history, before the
+        first segment.
+        """
+        inputs = self._signals(df, params)
+        state = PositionState()
+        for start, stop in _stage_bounds(len(df), stages):
+            _, state = run_positions(*inputs, self.sizing, state, start, stop, dyn=self._widening())
+            yield state
+
+    def simulate_stream(
+        self,
+        params: Dict[str, Any],
+        chunk_size: int = 1 << 16,
+        workdir: Optional[Path] = None,
+    ) -> Result:
+        """Simulate ``params`` over the OHLCV CSV in fixed-size chunks.
+
+        Columns are memory-mapped from the data cache and features are
+        streamed with :class:`FeatureStream`, so working memory is bounded
+        by ``chunk_size`` rather than history length. The equity and
+        drawdown curves are written to ``equity.npy``/``drawdown.npy``
+        memmaps under ``workdir`` (default ``outdir``). Results match
+        :meth:`simulate` exactly apart from Sharpe, which is accumulated
+        over two chunked passes.
+        """
+        if not self.csv:
+            raise ValueError("streaming requires csv_ohlcv_path")
+        if self.sizing.vol_model != "realized":
+            raise ValueError("streaming supports vol_model='realized' only")
+        if self.run.precision != "float64":
+            raise ValueError("streaming supports precision='float64' only")
+        cols = load_columns(self.csv)
+        n = len(cols)
+        px_all = cols["close"].to_numpy()
+        stream = FeatureStream(
+            px_all,
+            cols["high"].to_numpy(),
+            cols["low"].to_numpy(),
+            cols["volume"].to_numpy(),
+            params["atra"].bb_n,
+        )
+        sentiment = self._sentiment_chunks()
+        fee_cycle = self._fee_cycle()
+        workdir = workdir or self.outdir
+        workdir.mkdir(parents=True, exist_ok=True)
+        equity = open_memmap(workdir / "equity.npy", mode="w+", dtype=np.float64, shape=(n,))
+        drawdown = open_memmap(workdir / "drawdown.npy", mode="w+", dtype=np.float64, shape=(n,))
+
+        state = PositionState()
+        for a in range(0, n, chunk_size):
+            b = min(n, a + chunk_size)
+            arrays, feats = stream.chunk(a, b)
+            entries, tps, sls = self._entries(
+                arrays["close"],
+                arrays["high"],
+                arrays["low"],
+                arrays["volume"],
+                sentiment(a, b),
+                params,
+                feats,
+            )
+            # Later chunks carry the previous bar so fills can see its close.
+            lead = 1 if a else 0
+            if lead:
+                entries = tuple(np.concatenate(([False], e)) for e in entries)
+            rv = np.concatenate((np.zeros(lead), arrays["rv"]))
+            peak = state.peak
+            seg, state = run_positions(
+                px_all[a - lead : b],
+                rv,
+                resolve_signals(entries),
+                tps,
+                sls,
+                fee_cycle,
+                self.sizing,
+                state,
+                lead,
+                dyn=self._widening(),
+            )
+            equity[a:b] = seg
+            running = np.maximum.accumulate(np.concatenate(([peak], seg)))[1:]
+            drawdown[a:b] = 1 - seg / running
+        equity.flush()
+        drawdown.flush()
+
+        steps = n - 1
+        total = 0.0
+        for a in range(0, steps, chunk_size):
+            total += float(np.sum(np.diff(equity[a : a + chunk_size + 1])))
+        mean = total / steps
+        sq = 0.0
+        for a in range(0, steps, chunk_size):
+            sq += float(np.sum((np.diff(equity[a : a + chunk_size + 1]) - mean) ** 2))
+        sharpe = float(mean / (np.sqrt(sq / steps) + 1e-9) * np.sqrt(252 * 24 * 12))
+        wr = state.wins / max(1, state.trades)
+        pnl = equity[-1] - 1.0
+        return Result(equity, drawdown, state.trades, state.wins, wr, sharpe, state.max_dd, pnl)
+
+    def _sentiment_chunks(self) -> Callable[[int, int], np.ndarray]:
+        """Return a reader for sentiment over bars ``[a, b)``, as in :meth:`load_data`."""
+        if not (self.csv_sent and Path(self.csv_sent).exists()):
+            return lambda a, b: 0.6 + 0.1 * np.tanh(np.sin(np.arange(a, b) / 300.0))
+        s = load_columns(self.csv_sent)
+        if "sentiment" not in s:
+            return lambda a, b: np.zeros(b - a)
+        col = s["sentiment"].to_numpy()
+
+        def read(a: int, b: int) -> np.ndarray:
+            # load_data aligns on the index, so rows past the sentiment file are NaN.
+            out = np.full(b - a, np.nan)
+            part = np.asarray(col[a:b], dtype=np.float64)
+            out[: len(part)] = np.where(np.isnan(part), 0.0, part)
+            return out
+
+        return read
+
+    def sweep(
+        self,
+        df: pd.DataFrame,
+        grid: Union[Mapping[str, Sequence[Any]], Sequence[Mapping[str, Any]]],
+        max_cells: int = 2**24,
+    ) -> pd.DataFrame:
+        """Simulate many parameter sets in one vectorised pass.
+
+        Args:
+            df: Frame from :meth:`load_data`.
+            grid: Either a mapping of flat parameter names (as in
+                ``best_params``) to candidate values, expanded as a Cartesian
+                product, or a sequence of such mappings. Unspecified
+                parameters keep the strategy defaults.
+            max_cells: Upper bound on ``sets * bars`` evaluated per block.
+
+        Returns:
+            One row per parameter set with its parameters and summary
+            metrics (equity, pnl, max_dd, trades, wins, wr, sharpe, score).
+        """
+        table = _expand_grid(grid)
+        block = max(1, max_cells // max(1, len(df)))
+        parts = []
+        for bb_n, group in table.groupby("atra_n", sort=False):
+            for start in range(0, len(group), block):
+                rows = group.iloc[start : start + block]
+                values = {name: rows[name].to_numpy()[:, None] for name in PARAM_FIELDS}
+                values["atra_n"] = int(bb_n)
+                inputs = self._signals(df, self._build_params(values))
+                metrics = run_positions_batch(*inputs, self.sizing, self._widening())
+                parts.append(pd.DataFrame(metrics, index=rows.index))
+        metrics = pd.concat(parts).sort_index()
+        metrics["score"] = self._score(metrics["equity"], metrics["max_dd"])
+        return table.join(metrics)
+
+    def _suggest(self, trial: optuna.Trial) -> Dict[str, Any]:
+        """Sample strategy parameters for ``trial``."""
         params = {
             "qbx3": QBX3Config(
                 rsi_buy_low=trial.suggest_float("qbx3_rsi_low", 20, 40),
@@ -202,42 +510,140 @@ class BacktestEngine:
                 sl_pct=trial.suggest_float("ms7_sl", 0.005, 0.02),
             ),
         }
-        res = self.simulate(df, params)
-        return res.equity_curve[-1] - 0.5 * res.max_dd
+        return self._confirmed(params)
+
+    def _confirmed(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the higher-timeframe confirmations of ``run.confirm_tf`` to ``params``."""
+        for key, tf in self.run.confirm_tf.items():
+            if key not in params or "confirm_tf" not in {f.name for f in fields(params[key])}:
+                raise ValueError(f"strategy {key!r} has no higher-timeframe confirmation")
+            params[key] = replace(params[key], confirm_tf=tf)
+        return params
+
+    @staticmethod
+    def _score(equity: float, max_dd: float) -> float:
+        """Tuning objective: equity penalised by drawdown."""
+        return equity - 0.5 * max_dd
+
+    def _stages(self) -> int:
+        """Number of segments each trial is simulated in."""
+        return 1 if self.run.pruner == "none" else max(1, self.run.prune_stages)
+
+    def _objective(self, trial: optuna.Trial, df: pd.DataFrame) -> float:
+        """Optuna objective reporting intermediate values for pruning."""
+        stages = self._stages()
+        for step, state in enumerate(self.simulate_stages(df, self._suggest(trial), stages)):
+            value = self._score(state.equity, state.max_dd)
+            if step < stages - 1:
+                trial.report(value, step)
+                if trial.should_prune():
+                    raise optuna.TrialPruned()
+        return value
+
+    def _build_params(self, values: Mapping[str, Any]) -> Dict[str, Any]:
+        """Build strategy configs from flat Optuna parameter values."""
+        kwargs: Dict[str, Dict[str, Any]] = {key: {} for key in CONFIG_TYPES}
+        for name, (key, field) in PARAM_FIELDS.items():
+            kwargs[key][field] = values[name]
+        return self._confirmed({key: cls(**kwargs[key]) for key, cls in CONFIG_TYPES.items()})
 
-    def run_full(self) -> Dict[str, Any]:
-        """Run tuning then backtest using best parameters."""
+    def _tune(self, df: pd.DataFrame, on_trial: Optional[TrialCallback] = None) -> optuna.Study:
+        """Run the Optuna study, fanning trials out to worker processes.
+
+        With ``run.workers > 1`` trials are asked in batches of ``workers``
+        and advanced stage by stage in lockstep; intermediate values are
+        reported in order so a seed reproduces the same study for a given
+        worker count. Each trial of a batch stays on one worker process,
+        which computes its signals once and keeps them until the trial
+        finishes or is pruned. Workers read ``df`` from shared memory.
+        ``on_trial`` is called with the study and each finished trial.
+        """
+        sampler = optuna.samplers.TPESampler(seed=self.seed)
+        study = optuna.create_study(
+            direction="maximize", sampler=sampler, pruner=_make_pruner(self.run.pruner)
+        )
+        workers, trials = self.run.workers, self.run.trials
+        if workers <= 1:
+            callbacks = [on_trial] if on_trial else None
+            study.optimize(lambda tr: self._objective(tr, df), n_trials=trials, callbacks=callbacks)
+            return study
+        bounds = _stage_bounds(len(df), self._stages())
+        ctx = multiprocessing.get_context("spawn")
+        with SharedFrame(df) as shared, ExitStack() as stack:
+            pool = [
+                stack.enter_context(
+                    ProcessPoolExecutor(
+                        1, mp_context=ctx, initializer=_init_worker, initargs=(self, shared.spec)
+                    )
+                )
+                for _ in range(workers)
+            ]
+            done = 0
+            while done < trials:
+                batch = [study.ask() for _ in range(min(workers, trials - done))]
+                live = [(tr, self._suggest(tr), PositionState(), w) for tr, w in zip(batch, pool)]
+                for step, (start, stop) in enumerate(bounds):
+                    last = step == len(bounds) - 1
+                    futures = [
+                        worker.submit(_advance_job, (tr.number, params, state, start, stop, last))
+                        for tr, params, state, worker in live
+                    ]
+                    pending = []
+                    for (tr, params, _, worker), future in zip(live, futures):
+                        state = future.result()
+                        value = self._score(state.equity, state.max_dd)
+                        if last:
+                            finished = study.tell(tr, value)
+                        else:
+                            tr.report(value, step)
+                            if not tr.should_prune():
+                                pending.append((tr, params, state, worker))
+                                continue
+                            worker.submit(_drop_signals)
+                            finished = study.tell(tr, state=optuna.trial.TrialState.PRUNED)
+                        if on_trial:
+                            on_trial(study, finished)
+                    live = pending
+                done += len(batch)
+        return study
+
+    def run_full(self, emit: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """Run tuning then backtest using best parameters.
+
+        ``emit(kind, **data)`` receives progress events: ``loaded``, one
+        ``trial`` per finished tuning trial with the best value so far,
+        ``simulated`` and ``saved``.
+        """
+        if self.run.outputs not in OUTPUT_POLICIES:
+            raise ValueError(f"unknown outputs {self.run.outputs!r}; expected none, metrics or full")
+        emit = emit or _ignore_event
         df = self.load_data()
+        emit("loaded", bars=len(df))
         optuna.logging.set_verbosity(optuna.logging.WARNING)
-        study = optuna.create_study(direction="maximize")
-        study.optimize(lambda tr: self._objective(tr, df), n_trials=60)
+        total, finished = self.run.trials, itertools.count(1)
+        best_value: List[Optional[float]] = [None]
+
+        def on_trial(study: optuna.Study, trial: optuna.trial.FrozenTrial) -> None:
+            if trial.value is not None and (best_value[0] is None or trial.value > best_value[0]):
+                best_value[0] = trial.value
+            emit(
+                "trial",
+                n=next(finished),
+                total=total,
+                state=trial.state.name.lower(),
+                value=trial.value,
+                best=best_value[0],
+            )
+
+        study = self._tune(df, on_trial)
         best = study.best_params
-        params = {
-            "qbx3": QBX3Config(
-                best["qbx3_rsi_low"],
-                best["qbx3_rsi_high"],
-                best["qbx3_sent"],
-                best["qbx3_tp"],
-                best["qbx3_sl"],
-            ),
-            "ssv2": SSv2Config(best["ssv2_sent"], best["ssv2_tp"], best["ssv2_sl"]),
-            "atra": ATRTrendArbConfig(
-                best["atra_n"],
-                best["atra_k"],
-                best["atra_delta"],
-                best["atra_tp"],
-                best["atra_sl"],
-            ),
-            "ms7": MomentumStacker7Config(
-                best["ms7_mom"],
-                best["ms7_rsi_low"],
-                best["ms7_rsi_high"],
-                best["ms7_tp"],
-                best["ms7_sl"],
-            ),
-        }
+        params = self._build_params(best)
         res = self.simulate(df, params)
+        emit("simulated", equity=float(res.equity_curve[-1]), max_dd=res.max_dd, trades=res.trades)
         self._save_outputs(df, res)
+        emit("saved", outdir=str(self.outdir), plots_pending=bool(self.pending_plots))
+        cache_stats = feature_cache(df).stats()
+        logger.info("feature cache: %(hits)d hits, %(misses)d misses", cache_stats)
         perf_by_strategy = {"QBX3": float(res.pnl)}
         return {
             "summary": {
@@ -248,26 +654,149 @@ class BacktestEngine:
             },
             "best_params": best,
             "perf_by_strategy": perf_by_strategy,
+            "feature_cache": cache_stats,
         }
 
     def _save_outputs(self, df: pd.DataFrame, res: Result) -> None:
-        """Persist metrics and plots to the output directory."""
+        """Persist metrics and plots to the output directory per ``run.outputs``."""
+        if self.run.outputs == "none":
+            return
         out = self.outdir
         dfm = pd.DataFrame({"equity": res.equity_curve, "drawdown": res.drawdown})
         out.mkdir(parents=True, exist_ok=True)
         dfm.to_csv(out / "metrics.csv", index=False)
-        pd.DataFrame({"t": df["ts"], "px": df["close"]}).to_csv(
-            out / "trade_log.csv", index=False
-        )
-        plt.figure(figsize=(10, 4))
-        plt.plot(res.equity_curve)
-        plt.title("Equity Curve")
-        plt.tight_layout()
-        plt.savefig(out / "equity_curve.png")
-        plt.close()
-        plt.figure(figsize=(10, 3))
-        plt.plot(res.drawdown)
-        plt.title("Drawdown")
-        plt.tight_layout()
-        plt.savefig(out / "drawdown.png")
-        plt.close()
+        if res.ledger is not None:
+            np.save(out / "trades.npy", res.ledger)
+        if self.run.outputs != "full":
+            return
+        self.pending_plots = {
+            "equity_curve": Curve("Equity Curve", res.equity_curve, 4.0),
+            "drawdown": Curve("Drawdown", res.drawdown),
+        }
+        if not self.run.background_plots:
+            self.render_plots()
+
+    def render_plots(
+        self, outdir: Optional[Path] = None, background: bool = False
+    ) -> Optional[threading.Thread]:
+        """Draw plots left pending by ``run_full`` into ``outdir`` (default ``outdir``).
+
+        With ``background`` the plots are drawn on a thread, which is
+        returned; otherwise they are written before returning.
+        """
+        curves, self.pending_plots = self.pending_plots, {}
+        if not curves:
+            return None
+        outdir = self.outdir if outdir is None else outdir
+        if background:
+            return render_in_background(outdir, curves, self.run.plot_points)
+        render_curves(outdir, curves, self.run.plot_points)
+        return None
+
+
+def synthetic_ohlcv(seed: int, bars: int = SYNTHETIC_BARS) -> Dict[str, np.ndarray]:
+    """OHLCV columns of the synthetic history generated for ``seed``."""
+    t = np.arange(bars)
+    rng = np.random.default_rng(seed)
+    close = 100 + np.sin(t / 50.0) * 2 + rng.normal(0, 0.5, size=bars)
+    volume = 1e5 + rng.normal(0, 2e4, size=bars)
+    return {"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": volume}
+
+
+def synthetic_sentiment(bars: int) -> np.ndarray:
+    """Sentiment used when no sentiment CSV is given."""
+    return 0.6 + 0.1 * np.tanh(np.sin(np.arange(bars) / 300.0))
+
+
+def synthetic_paths(seeds: Sequence[int], bars: int = SYNTHETIC_BARS) -> Dict[str, np.ndarray]:
+    """Synthetic histories of ``seeds`` as ``(runs, bars)`` columns.
+
+    Row ``i`` equals the frame :meth:`BacktestEngine.load_data` synthesises
+    for ``seeds[i]``; sentiment is shared by every row.
+    """
+    rows = [synthetic_ohlcv(seed, bars) for seed in seeds]
+    paths = {c: np.stack([r[c] for r in rows]) for c in ("open", "high", "low", "close", "volume")}
+    paths["sentiment"] = synthetic_sentiment(bars)
+    return paths
+
+
+def _sharpe(equity: np.ndarray) -> float:
+    """Annualised Sharpe ratio of per-bar equity changes."""
+    diff = np.diff(equity)
+    return float(np.mean(diff) / (np.std(diff) + 1e-9) * np.sqrt(252 * 24 * 12))
+
+
+def _by_code(values: Sequence[Any], lead: Tuple[int, ...]) -> np.ndarray:
+    """Per-strategy ``values`` laid out by code (0 unused) along the last axis."""
+    table = np.stack(np.broadcast_arrays(0.0, *values), axis=-1)
+    # Batched configs carry (sets, 1) columns; drop their bar axis.
+    table = table.reshape(table.shape[: max(0, table.ndim - 2)] + table.shape[-1:])
+    return np.broadcast_to(table, lead + table.shape[-1:])
+
+
+def _ignore_event(kind: str, **data: Any) -> None:
+    """Default ``run_full`` progress sink."""
+
+
+def _expand_grid(
+    grid: Union[Mapping[str, Sequence[Any]], Sequence[Mapping[str, Any]]]
+) -> pd.DataFrame:
+    """Return one row per parameter set with every tuning parameter filled."""
+    if isinstance(grid, Mapping):
+        names = list(grid)
+        rows = [dict(zip(names, combo)) for combo in itertools.product(*grid.values())]
+    else:
+        rows = [dict(r) for r in grid]
+    unknown = {k for r in rows for k in r} - set(PARAM_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown sweep parameters: {sorted(unknown)}")
+    defaults = {key: cls() for key, cls in CONFIG_TYPES.items()}
+    table = pd.DataFrame(rows, columns=list(PARAM_FIELDS))
+    for name, (key, field) in PARAM_FIELDS.items():
+        table[name] = table[name].fillna(getattr(defaults[key], field))
+    return table.astype({"atra_n": int})
+
+
+def _stage_bounds(n: int, stages: int) -> List[Tuple[int, int]]:
+    """Split ``n`` bars into ``stages`` contiguous ``(start, stop)`` ranges."""
+    edges = np.linspace(0, n, stages + 1).round().astype(int).tolist()
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _make_pruner(name: str) -> optuna.pruners.BasePruner:
+    """Return the Optuna pruner selected by ``RunConfig.pruner``."""
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    if name == "median":
+        return optuna.pruners.MedianPruner()
+    if name == "halving":
+        return optuna.pruners.SuccessiveHalvingPruner()
+    raise ValueError(f"unknown pruner {name!r}; expected none, median or halving")
+
+
+def _init_worker(engine: BacktestEngine, spec: SharedFrameSpec) -> None:
+    """Attach a tuning worker to the shared OHLCV frame."""
+    df, shm = attach_frame(spec)
+    _WORKER.update(engine=engine, df=df, shm=shm)
+
+
+def _advance_job(
+    job: Tuple[int, Dict[str, Any], PositionState, int, int, bool]
+) -> PositionState:
+    """Advance one trial over a bar segment inside a tuning worker.
+
+    The trial's signals are kept between its segments and dropped after
+    its ``last`` one.
+    """
+    engine = _WORKER["engine"]
+    number, params, state, start, stop, last = job
+    held = _WORKER.get("signals")
+    if held is None or held[0] != number:
+        held = (number, engine._signals(_WORKER["df"], params))
+    _WORKER["signals"] = None if last else held
+    return run_positions(*held[1], engine.sizing, state, start, stop, dyn=engine._widening())[1]
+
+
+def _drop_signals() -> None:
+    """Release the signals of a pruned trial inside a tuning worker."""
+    _WORKER["signals"] = None
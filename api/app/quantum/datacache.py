@@ -0,0 +1,222 @@
+"""Columnar, memory-mapped cache of CSV inputs for the backtester.
+
+The first load of a CSV writes one ``.npy`` file per column plus a
+``meta.json`` sidecar recording the source size, mtime and content hash.
+The CSV is parsed ``BUILD_CHUNK_ROWS`` rows at a time, so building the
+cache of a file larger than memory stays bounded by the chunk size.
+Later loads validate the sidecar against ``stat()`` and memory-map the
+columns instead of re-parsing the CSV; callers that need the content hash
+to be exact also re-hash the source. Concurrent builders each write a
+private directory; the first to finish publishes it and later ones reuse
+that entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+CACHE_DIR = Path(os.getenv("QUANTUM_DATA_CACHE", "out/datacache"))
+BUILD_CHUNK_ROWS = int(os.getenv("QUANTUM_DATA_CHUNK_ROWS", "1000000"))
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _entry_dir(source: Path, cache_dir: Path) -> Path:
+    key = hashlib.sha1(str(source.resolve()).encode()).hexdigest()[:16]
+    return cache_dir / f"{source.stem}-{key}"
+
+
+def _read_meta(entry: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((entry / "meta.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(meta: Optional[Dict[str, Any]], source: Path) -> bool:
+    if meta is None:
+        return False
+    st = source.stat()
+    return meta.get("size") == st.st_size and meta.get("mtime_ns") == st.st_mtime_ns
+
+
+def _column_array(col: pd.Series) -> np.ndarray:
+    """Return a memory-mappable array for ``col``.
+
+    Numeric columns keep their dtype, timestamp text becomes
+    ``datetime64[ns]`` and anything else is stored as fixed-width text.
+    """
+    if pd.api.types.is_numeric_dtype(col):
+        return col.to_numpy()
+    try:
+        return pd.to_datetime(col, format="ISO8601").to_numpy(dtype="datetime64[ns]")
+    except (ValueError, TypeError):
+        return col.astype(str).to_numpy(str)
+
+
+def _merged_dtype(parts: List[np.ndarray]) -> Optional[np.dtype]:
+    """Dtype the whole column would have parsed as, or ``None`` for text.
+
+    Chunks may infer different types: integer and float chunks merge as
+    float, and chunks that are entirely missing take the other chunks'
+    type. Any other mix means the full column is text.
+    """
+    typed = [a for a in parts if not (a.dtype.kind == "f" and np.isnan(a).all())]
+    kinds = {a.dtype.kind for a in typed}
+    if not typed or kinds <= set("iuf"):
+        return np.result_type(*parts)
+    if len(kinds) > 1 or (kinds == {"b"} and len(typed) < len(parts)):
+        return None
+    dtype = np.result_type(*typed)
+    if kinds == {"U"} and len(typed) < len(parts):
+        # Missing chunks are stored as the text "nan".
+        dtype = np.result_type(dtype, np.dtype("<U3"))
+    return dtype
+
+
+def _text_parts(source: Path, column: int, tmp: Path, chunk_rows: int) -> List[Path]:
+    """Re-read column ``column`` of ``source`` as text, one part per chunk."""
+    parts = []
+    with pd.read_csv(source, usecols=[column], dtype=str, chunksize=chunk_rows) as reader:
+        for n, chunk in enumerate(reader):
+            part = tmp / f"{column}.{n}.text.npy"
+            np.save(part, chunk.iloc[:, 0].astype(str).to_numpy(str))
+            parts.append(part)
+    return parts
+
+
+def _concat(parts: List[Path], path: Path, rows: int, dtype: np.dtype) -> None:
+    """Write the chunk files ``parts`` as one ``.npy`` column at ``path``."""
+    out = open_memmap(path, mode="w+", dtype=dtype, shape=(rows,))
+    pos = 0
+    for part in parts:
+        a = np.load(part, mmap_mode="r")
+        out[pos : pos + len(a)] = a.astype(dtype, copy=False)
+        pos += len(a)
+        del a
+        part.unlink()
+    out.flush()
+    del out
+
+
+def _publish(tmp: Path, entry: Path, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename ``tmp`` to ``entry`` unless a concurrent build already did.
+
+    Returns the sidecar of the entry in place afterwards. A stale entry is
+    moved aside before it is deleted, so processes that mapped its columns
+    keep reading them.
+    """
+    current = _read_meta(entry)
+    if current == meta:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return current
+    aside = entry.with_name(f".{entry.name}-{uuid.uuid4().hex[:8]}.old")
+    try:
+        os.rename(entry, aside)
+    except FileNotFoundError:
+        aside = None
+    try:
+        os.replace(tmp, entry)
+    except OSError:
+        # Another builder published between the two renames.
+        shutil.rmtree(tmp, ignore_errors=True)
+        meta = _read_meta(entry) or meta
+    if aside is not None:
+        shutil.rmtree(aside, ignore_errors=True)
+    return meta
+
+
+def _build(source: Path, entry: Path, chunk_rows: Optional[int] = None) -> Dict[str, Any]:
+    """Parse ``source`` chunk by chunk and write its columnar layout to ``entry``.
+
+    Each chunk's columns are saved as part files, which are then
+    concatenated into one ``.npy`` per column; ``meta.json`` is written
+    last.
+    """
+    chunk_rows = chunk_rows or BUILD_CHUNK_ROWS
+    st = source.stat()
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=entry.name, dir=entry.parent))
+    try:
+        names: List[str] = []
+        parts: List[List[Path]] = []
+        rows = 0
+        with pd.read_csv(source, chunksize=chunk_rows) as reader:
+            for n, chunk in enumerate(reader):
+                if not names:
+                    names = [c.lower() for c in chunk.columns]
+                    parts = [[] for _ in names]
+                for i in range(len(names)):
+                    part = tmp / f"{i}.{n}.npy"
+                    np.save(part, _column_array(chunk.iloc[:, i]))
+                    parts[i].append(part)
+                rows += len(chunk)
+        columns = {}
+        for i, name in enumerate(names):
+            dtype = _merged_dtype([np.load(p, mmap_mode="r") for p in parts[i]])
+            if dtype is None:
+                for part in parts[i]:
+                    part.unlink()
+                parts[i] = _text_parts(source, i, tmp, chunk_rows)
+                dtype = _merged_dtype([np.load(p, mmap_mode="r") for p in parts[i]])
+            _concat(parts[i], tmp / f"{i}.npy", rows, dtype)
+            columns[name] = f"{i}.npy"
+        meta = {
+            "source": str(source.resolve()),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": _file_digest(source),
+            "rows": rows,
+            "columns": columns,
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return _publish(tmp, entry, meta)
+
+
+def cached_meta(
+    path: str, cache_dir: Optional[Path] = None, verify: bool = False
+) -> Dict[str, Any]:
+    """Return the sidecar for ``path``, building the cache if it is stale.
+
+    With ``verify`` the source is re-hashed and the cache rebuilt when its
+    ``sha256`` differs, which catches edits that kept size and mtime.
+    """
+    source = Path(path)
+    entry = _entry_dir(source, cache_dir or CACHE_DIR)
+    meta = _read_meta(entry)
+    if _is_fresh(meta, source) and (not verify or meta["sha256"] == _file_digest(source)):
+        return meta
+    return _build(source, entry)
+
+
+def load_columns(path: str, cache_dir: Optional[Path] = None) -> pd.DataFrame:
+    """Return the CSV at ``path`` as a frame of memory-mapped columns.
+
+    Column names are lower-cased. Numeric and timestamp columns are
+    read-only memory maps; other text columns are materialised.
+    """
+    source = Path(path)
+    entry = _entry_dir(source, cache_dir or CACHE_DIR)
+    meta = cached_meta(path, cache_dir)
+    data = {name: np.load(entry / fname, mmap_mode="r") for name, fname in meta["columns"].items()}
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,81 @@
+"""Indicator cache shared by every simulation over one loaded DataFrame."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+
+def _nbytes(value: Any) -> int:
+    """Return the array payload size of ``value`` (arrays or tuples of arrays)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class FeatureCache:
+    """Memoise indicator arrays keyed by ``(indicator, input, *params)``.
+
+    Entries are evicted least-recently-used once their combined size
+    exceeds ``max_bytes``; values larger than the bound are returned but
+    never stored.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._store: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it on a miss."""
+        if key in self._store:
+            self.hits += 1
+            self._store.move_to_end(key)
+            return self._store[key]
+        self.misses += 1
+        value = compute()
+        size = _nbytes(value)
+        if size <= self.max_bytes:
+            while self._store and self.nbytes + size > self.max_bytes:
+                _, old = self._store.popitem(last=False)
+                self.nbytes -= _nbytes(old)
+            self._store[key] = value
+            self.nbytes += size
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current footprint."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._store),
+            "nbytes": self.nbytes,
+        }
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FeatureCache":
+        # pandas deep-copies ``attrs`` onto derived frames and columns; those
+        # may hold different data, so they start with an empty cache.
+        return FeatureCache(self.max_bytes)
+
+
+def feature_cache(df: pd.DataFrame, max_bytes: int = DEFAULT_MAX_BYTES) -> FeatureCache:
+    """Return the cache attached to ``df``, attaching a new one if needed."""
+    cache = df.attrs.get("features")
+    if not isinstance(cache, FeatureCache):
+        cache = FeatureCache(max_bytes)
+        df.attrs["features"] = cache
+    return cache
+
+
+def cached(cache: Optional[FeatureCache], key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Look ``key`` up in ``cache`` or compute directly when no cache is given."""
+    return compute() if cache is None else cache.get(key, compute)
@@ -0,0 +1,290 @@
+"""GARCH(1,1) volatility fitted by maximum likelihood.
+
+The conditional variance ``h[t] = omega + alpha * r[t-1]**2 + beta * h[t-1]``
+is a first-order linear filter, evaluated with
+:func:`.indicators.linear_recurrence` instead of a Python loop. Fits run on
+a batch of return series (symbols or rolling windows) at once: every row
+follows its own BFGS iteration on the Gaussian likelihood, and the
+gradient comes from the same filters. ``h[0]`` is the sample variance of
+the row, as in :func:`app.models.garch.garch_forecast`.
+
+:func:`walk_forward_vol` refits on trailing windows, so the volatility of
+a bar depends on earlier returns only; backtests size trades with it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .indicators import linear_recurrence
+
+# Upper bound on ``alpha + beta``, keeping every fit stationary.
+MAX_PERSISTENCE = 0.9999
+FIT_ITERATIONS = 100
+FIT_TOLERANCE = 1e-7
+# Returns each walk-forward fit sees, and bars between refits.
+FIT_WINDOW = 1000
+REFIT_EVERY = 250
+
+# Starting point of every fit: persistence 0.95 split 0.05 / 0.90.
+_START = (0.05, 0.90)
+
+
+@dataclass
+class GarchParams:
+    """Fitted parameters with one entry per series.
+
+    ``loglik`` is the Gaussian log-likelihood of each series; ``converged``
+    is ``False`` for fits stopped by the iteration limit or by a line
+    search that found no descent.
+    """
+
+    omega: np.ndarray
+    alpha: np.ndarray
+    beta: np.ndarray
+    loglik: np.ndarray
+    converged: np.ndarray
+
+
+def _rows(ret: np.ndarray) -> np.ndarray:
+    data = np.asarray(ret, dtype=np.float64)
+    if data.shape[-1] < 2:
+        raise ValueError("GARCH needs at least two returns per series")
+    if np.isnan(data).any():
+        raise ValueError("returns must not contain NaN")
+    return data.reshape(-1, data.shape[-1])
+
+
+def _start_variance(r: np.ndarray) -> np.ndarray:
+    return np.maximum(np.var(r, axis=1, ddof=1), np.finfo(np.float64).tiny)
+
+
+def _lagged(first: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """``first`` followed by ``x`` without its last bar, per row."""
+    return np.concatenate((first[:, None], x[:, :-1]), axis=1)
+
+
+def _filter(
+    r2: np.ndarray, v: np.ndarray, omega: np.ndarray, alpha: np.ndarray, beta: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``h``, ``dh/domega`` and ``dh/dalpha`` for every bar.
+
+    ``F[t] = sum(beta**(t-1-j) * r2[j] for j < t)`` is the only filtered
+    term: ``h = beta**t * v + omega * (1 - beta**t) / (1 - beta) + alpha * F``.
+    """
+    size = r2.shape[1]
+    zeros = np.zeros(len(r2))
+    f = linear_recurrence(_lagged(zeros, r2), beta, zeros)
+    decay = np.power(beta[:, None], np.arange(size))
+    d_omega = (1 - decay) / (1 - beta[:, None])
+    h = decay * v[:, None] + omega[:, None] * d_omega + alpha[:, None] * f
+    return h, d_omega, f
+
+
+def garch_variance(
+    ret: np.ndarray, params: GarchParams, start: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Conditional variance of every bar given the returns before it.
+
+    Returns an array one bar longer than ``ret`` along time: the last bar
+    is the next-period forecast. ``start`` is ``h[0]`` per series and
+    defaults to the sample variance of the series.
+    """
+    r = _rows(ret)
+    omega, alpha, beta = (np.broadcast_to(p, r.shape[:1]) for p in _params(params))
+    r2 = np.concatenate((r * r, np.zeros((len(r), 1))), axis=1)
+    v = _start_variance(r) if start is None else np.broadcast_to(start, r.shape[:1])
+    h = _filter(r2, v, omega, alpha, beta)[0]
+    return h.reshape(np.shape(ret)[:-1] + (r.shape[1] + 1,))
+
+
+def conditional_vol(ret: np.ndarray, params: "GarchParams | None" = None) -> np.ndarray:
+    """Conditional volatility per bar of ``ret``; fits ``params`` if omitted.
+
+    ``vol[t]`` only uses returns before ``t``. Fitted parameters and the
+    starting variance do see the whole series; see :func:`walk_forward_vol`
+    for a volatility free of look-ahead.
+    """
+    params = garch_fit(ret) if params is None else params
+    return np.sqrt(garch_variance(ret, params)[..., :-1])
+
+
+def walk_forward_vol(
+    ret: np.ndarray, window: int = FIT_WINDOW, refit: int = REFIT_EVERY
+) -> np.ndarray:
+    """Conditional volatility per bar of ``ret`` using only earlier returns.
+
+    Bars ``[s, s + refit)`` use parameters fitted on the ``window`` returns
+    before ``s``; their variance is filtered from the start of that window,
+    starting at its sample variance. Bars before the first full window are
+    NaN. Leading axes are independent series, fitted together.
+    """
+    if window < 2 or refit < 1:
+        raise ValueError("window must be at least 2 and refit at least 1")
+    data = np.asarray(ret, dtype=np.float64)
+    size = data.shape[-1]
+    out = np.full(data.shape, np.nan)
+    if size <= window:
+        return out
+    starts = np.arange(window, size, refit)
+    # Zero padding only follows the bars that are kept, so it is never seen.
+    pad = np.zeros(data.shape[:-1] + (starts[-1] + refit - size,))
+    padded = np.concatenate((data, pad), axis=-1)
+    rows = sliding_window_view(padded, window + refit, axis=-1)[..., starts - window, :]
+    rows = rows.reshape(-1, window + refit)
+    history = rows[:, :window]
+    h = garch_variance(rows, garch_fit(history), start=_start_variance(history))
+    vol = np.sqrt(h[:, window:-1]).reshape(data.shape[:-1] + (-1,))
+    out[..., window:] = vol[..., : size - window]
+    return out
+
+
+def garch_forecast(ret: np.ndarray, params: "GarchParams | None" = None) -> np.ndarray:
+    """Next-period variance of each series; fits ``params`` if omitted."""
+    params = garch_fit(ret) if params is None else params
+    return garch_variance(ret, params)[..., -1]
+
+
+def _params(params: GarchParams) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return tuple(np.ravel(np.asarray(p, dtype=np.float64)) for p in (params.omega, params.alpha, params.beta))
+
+
+def _unpack(u: np.ndarray, v: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Map unconstrained ``u`` to ``omega``, ``alpha``, ``beta`` and the
+    Jacobian rows needed by the chain rule."""
+    s1 = 1 / (1 + np.exp(-u[:, 1]))
+    s2 = 1 / (1 + np.exp(-u[:, 2]))
+    omega = np.exp(u[:, 0]) * v
+    persist = MAX_PERSISTENCE * s1
+    alpha = persist * s2
+    beta = persist - alpha
+    d_persist = persist * (1 - s1)
+    d_split = persist * s2 * (1 - s2)
+    return omega, alpha, beta, s2, d_persist, d_split
+
+
+def _objective(u: np.ndarray, r2: np.ndarray, v: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean negative log-likelihood (without constants) and its gradient in ``u``."""
+    omega, alpha, beta, s2, d_persist, d_split = _unpack(u, v)
+    h, d_omega, d_alpha = _filter(r2, v, omega, alpha, beta)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        nll = 0.5 * np.mean(np.log(h) + r2 / h, axis=1)
+        w = 0.5 * (1 / h - r2 / (h * h)) / r2.shape[1]
+    zeros = np.zeros(len(r2))
+    d_beta = linear_recurrence(_lagged(zeros, h), beta, zeros)
+    g_omega = np.sum(w * d_omega, axis=1)
+    g_alpha = np.sum(w * d_alpha, axis=1)
+    g_beta = np.sum(w * d_beta, axis=1)
+    grad = np.stack(
+        (
+            g_omega * omega,
+            (s2 * g_alpha + (1 - s2) * g_beta) * d_persist,
+            (g_alpha - g_beta) * d_split,
+        ),
+        axis=1,
+    )
+    nll = np.where(np.isfinite(nll), nll, np.inf)
+    return nll, np.nan_to_num(grad)
+
+
+def garch_fit(
+    ret: np.ndarray, max_iter: int = FIT_ITERATIONS, tol: float = FIT_TOLERANCE
+) -> GarchParams:
+    """Fit GARCH(1,1) to each row of ``ret`` by maximum likelihood.
+
+    Args:
+        ret: Returns of shape ``(..., time)``; leading axes are independent
+            series fitted together.
+        max_iter: BFGS iterations per series.
+        tol: Stop a series once its gradient or its objective change falls
+            below this.
+
+    Returns:
+        Parameters shaped like the leading axes of ``ret``.
+    """
+    r = _rows(ret)
+    r2 = r * r
+    v = _start_variance(r)
+    m = len(r)
+    a0, b0 = _START
+    p0 = (a0 + b0) / MAX_PERSISTENCE
+    u = np.tile([np.log(1 - a0 - b0), np.log(p0 / (1 - p0)), np.log(a0 / b0)], (m, 1))
+    f, g = _objective(u, r2, v)
+    hess = np.tile(np.eye(3), (m, 1, 1))
+    active = np.ones(m, dtype=bool)
+    converged = np.zeros(m, dtype=bool)
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if not len(idx):
+            break
+        d = -np.einsum("mij,mj->mi", hess[idx], g[idx])
+        slope = np.sum(d * g[idx], axis=1)
+        uphill = slope >= 0
+        if uphill.any():
+            d[uphill] = -g[idx][uphill]
+            hess[idx[uphill]] = np.eye(3)
+            slope = np.sum(d * g[idx], axis=1)
+
+        # Backtracking line search with the Armijo condition, per series.
+        step = np.ones(len(idx))
+        new_f, new_g = f[idx].copy(), g[idx].copy()
+        moved = np.zeros(len(idx), dtype=bool)
+        todo = np.arange(len(idx))
+        for _ in range(40):
+            trial = u[idx[todo]] + step[todo, None] * d[todo]
+            tf, tg = _objective(trial, r2[idx[todo]], v[idx[todo]])
+            ok = tf <= f[idx[todo]] + 1e-4 * step[todo] * slope[todo]
+            new_f[todo[ok]], new_g[todo[ok]] = tf[ok], tg[ok]
+            moved[todo[ok]] = True
+            todo = todo[~ok]
+            if not len(todo):
+                break
+            step[todo] *= 0.5
+
+        s = step[:, None] * d
+        s[~moved] = 0.0
+        y = new_g - g[idx]
+        sy = np.sum(s * y, axis=1)
+        upd = moved & (sy > 1e-12)
+        if upd.any():
+            rho = 1 / sy[upd]
+            eye = np.eye(3)
+            left = eye - rho[:, None, None] * s[upd, :, None] * y[upd, None, :]
+            hess[idx[upd]] = (
+                left @ hess[idx[upd]] @ left.transpose(0, 2, 1)
+                + rho[:, None, None] * s[upd, :, None] * s[upd, None, :]
+            )
+        change = f[idx] - new_f
+        u[idx] += s
+        f[idx], g[idx] = new_f, new_g
+        ok = (np.max(np.abs(new_g), axis=1) < tol) | (moved & (change < tol * 1e-3))
+        converged[idx[ok]] = True
+        # A failed line search stops the series without converging it.
+        active[idx[ok | ~moved]] = False
+
+    omega, alpha, beta, *_ = _unpack(u, v)
+    size = r.shape[1]
+    loglik = -size * (f + 0.5 * np.log(2 * np.pi))
+    lead = np.shape(ret)[:-1]
+    return GarchParams(
+        omega.reshape(lead),
+        alpha.reshape(lead),
+        beta.reshape(lead),
+        loglik.reshape(lead),
+        converged.reshape(lead),
+    )
+
+
+def fit_rolling(ret: np.ndarray, window: int, step: int = 1) -> GarchParams:
+    """Fit every ``window``-bar window of 1-D ``ret``, ``step`` bars apart.
+
+    Entry ``i`` is fitted on ``ret[i * step : i * step + window]``.
+    """
+    if window < 2 or step < 1:
+        raise ValueError("window must be at least 2 and step at least 1")
+    windows = sliding_window_view(np.asarray(ret, dtype=np.float64), window)[::step]
+    return garch_fit(windows)
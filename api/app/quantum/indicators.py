@@ -1,51 +1,306 @@
 """Lightweight technical indicators for backtests.
 
 All functions operate on numpy arrays and return numpy arrays with
-naïve implementations suitable for vectorized backtests.
+naïve implementations suitable for vectorized backtests. Series are 1-D
+or ``(symbols, time)`` matrices computed along the time axis in one call.
+Rows of a matrix may be ragged: leading ``NaN`` bars are skipped, so each
+row gets exactly the values of the 1-D call on its history, and the
+skipped bars stay ``NaN``.
+
+``float32`` inputs give ``float32`` results; recurrences and rolling sums
+are still accumulated in ``float64``. Any other input is computed in
+``float64``.
 """
 
 from __future__ import annotations
 
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
 import numpy as np
 
 
-def ema(x: np.ndarray, n: int) -> np.ndarray:
-    """Return the exponential moving average of ``x`` with window ``n``."""
-    k = 2 / (n + 1)
-    out = np.empty_like(x)
-    out[:] = np.nan
-    s = 0.0
-    for i, v in enumerate(x):
-        s = v if i == 0 else (k * v + (1 - k) * s)
-        out[i] = s
+def _floating(x: np.ndarray) -> np.ndarray:
+    """``x`` as an array, keeping ``float32`` and converting anything else to ``float64``."""
+    x = np.asarray(x)
+    return x if x.dtype == np.float32 else x.astype(np.float64, copy=False)
+
+
+def _align(*series: np.ndarray) -> Tuple[Tuple[np.ndarray, ...], Optional[np.ndarray]]:
+    """Shift each row of 2-D ``series`` left to its first bar without NaNs.
+
+    Returns the shifted series, padded with NaN at the end, and the start
+    of every row; the start is ``None`` when no row needed shifting.
+    """
+    if series[0].ndim < 2 or series[0].shape[-1] == 0:
+        return series, None
+    if not any(np.isnan(x[:, 0]).any() for x in series):
+        return series, None
+    valid = ~np.isnan(series[0])
+    for x in series[1:]:
+        valid &= ~np.isnan(x)
+    size = valid.shape[1]
+    start = np.where(valid.any(axis=1), valid.argmax(axis=1), size)
+    shifted = tuple(np.array(x) for x in series)
+    for i in np.flatnonzero(start):
+        for x in shifted:
+            x[i, : size - start[i]] = x[i, start[i] :]
+            x[i, size - start[i] :] = np.nan
+    return shifted, start
+
+
+def _restore(out: np.ndarray, start: Optional[np.ndarray]) -> np.ndarray:
+    """Undo :func:`_align` on a result, filling the skipped bars with NaN."""
+    if start is None:
+        return out
+    size = out.shape[-1]
+    for i in np.flatnonzero(start):
+        out[i, start[i] :] = out[i, : size - start[i]].copy()
+        out[i, : start[i]] = np.nan
     return out
 
 
+# Values per slice of rows when computing a matrix; keeps the temporaries
+# of one slice in cache, which is about twice as fast as whole matrices.
+ROW_CHUNK = 1 << 16
+
+
+def _row_slices(rows: int, size: int) -> Iterator[slice]:
+    step = max(1, ROW_CHUNK // max(1, size))
+    return (slice(i, i + step) for i in range(0, rows, step))
+
+
+# Bars per block of the closed-form EMA. ``(1/a)**EMA_BLOCK`` must stay
+# finite; for the smallest EMA decay (``a = 1/3`` at ``n = 2``) it is ~1e122.
+EMA_BLOCK = 256
+
+
+def ema_tables(a: float, block: int = EMA_BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``a**r`` for ``r <= block`` and ``a**-r`` for ``r < block``."""
+    r = np.arange(block + 1, dtype=np.float64)
+    return np.power(a, r), np.power(a, -r[:-1])
+
+
+def _block_sizes(a: np.ndarray) -> np.ndarray:
+    """Largest power-of-two block up to ``EMA_BLOCK`` whose tables stay finite."""
+    with np.errstate(divide="ignore"):
+        limit = 600.0 / -np.log(np.clip(a, 0.0, 1.0))
+    limit = np.clip(np.nan_to_num(limit, nan=EMA_BLOCK, posinf=EMA_BLOCK), 1, EMA_BLOCK)
+    return (2 ** np.floor(np.log2(limit))).astype(np.int64)
+
+
+def linear_recurrence(b: np.ndarray, a: np.ndarray, carry: np.ndarray) -> np.ndarray:
+    """Solve ``s[:, i] = a * s[:, i - 1] + b[:, i]`` from ``s[:, -1] = carry``.
+
+    ``a`` holds one coefficient in ``[0, 1]`` per row. Within a block of
+    ``B`` bars starting after carry ``c``,
+    ``s[r] = a**(r+1) * c + a**r * cumsum(b * a**-i)[r]``, which is
+    evaluated for all blocks at once; only the carries between blocks are
+    stepped. ``B`` is ``EMA_BLOCK`` unless ``a`` is so small that
+    ``a**-B`` would overflow.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    carry = np.asarray(carry, dtype=np.float64)
+    sizes = _block_sizes(a)
+    if (sizes == EMA_BLOCK).all():
+        return _recurrence_blocks(b, a, carry, EMA_BLOCK)
+    out = np.empty(b.shape)
+    for block in np.unique(sizes):
+        rows = sizes == block
+        out[rows] = _recurrence_blocks(b[rows], a[rows], carry[rows], int(block))
+    return out
+
+
+def _recurrence_blocks(b: np.ndarray, a: np.ndarray, carry: np.ndarray, block: int) -> np.ndarray:
+    rows, size = b.shape
+    if size == 0:
+        return b.copy()
+    if rows * size > ROW_CHUNK and rows > 1:
+        return np.concatenate(
+            [_recurrence_blocks(b[i], a[i], carry[i], block) for i in _row_slices(rows, size)]
+        )
+    nb = -(-size // block)
+    padded = np.zeros((rows, nb * block))
+    padded[:, :size] = b
+    decay, which = np.unique(a, return_inverse=True)
+    tables = [ema_tables(d, block) if d > 0 else (np.zeros(block + 1),) * 2 for d in decay]
+    pw = np.array([t[0] for t in tables])[which]
+    inv = np.array([t[1][:block] for t in tables])[which]
+    part = np.cumsum(padded.reshape(rows, nb, block) * inv[:, None, :], axis=2)
+    carries = np.empty((rows, nb))
+    c = carry
+    for j in range(nb):
+        carries[:, j] = c
+        c = pw[:, block] * c + pw[:, block - 1] * part[:, j, -1]
+    out = pw[:, None, 1:] * carries[:, :, None] + pw[:, None, :-1] * part
+    out = out.reshape(rows, -1)[:, :size]
+    flat = a == 0
+    out[flat] = b[flat]
+    return out
+
+
+def ema_batch(
+    x: np.ndarray, windows: Union[int, Sequence[int]], s0: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """Return EMAs for several windows or series in one pass.
+
+    ``x`` is ``(n,)`` or ``(rows, n)``; ``windows`` holds one window per
+    row, or a single window for every row. A 1-D ``x`` is shared by all
+    windows. Each row is seeded with its first value, or continues from
+    ``s0[row]`` when given.
+    """
+    win = np.atleast_1d(np.asarray(windows, dtype=np.float64))
+    (data,), start = _align(_floating(x))
+    rows = np.broadcast_to(data, (len(win),) + data.shape[-1:]) if data.ndim == 1 else data
+    k = np.broadcast_to(2 / (win + 1), (len(rows),))[:, None]
+    b = k * rows
+    if s0 is None:
+        # Seed with the first value itself: s[0] = 1 * (x[0] * 1).
+        b[:, :1] = rows[:, :1]
+        carry = np.zeros(len(rows))
+    else:
+        carry = np.broadcast_to(np.asarray(s0, dtype=np.float64), (len(rows),))
+    out = linear_recurrence(b, 1 - k[:, 0], carry).astype(data.dtype, copy=False)
+    return _restore(out, start)
+
+
+def ema(x: np.ndarray, n: int, s0: Optional[float] = None) -> np.ndarray:
+    """Return the exponential moving average of ``x`` with window ``n``.
+
+    The average is seeded with ``x[0]``, or continues from the previous
+    value ``s0`` when resuming a series; for a matrix ``s0`` holds one
+    value per row.
+    """
+    data = _floating(x)
+    if data.ndim > 1:
+        return ema_batch(data, n, s0)
+    return ema_batch(data, n, None if s0 is None else (s0,))[0]
+
+
 def rsi(close: np.ndarray, n: int = 14) -> np.ndarray:
     """Compute a simple relative strength index."""
-    d = np.diff(close, prepend=close[0])
+    close = _floating(close)
+    if close.ndim > 1 and close.size > ROW_CHUNK:
+        return np.concatenate([rsi(close[i], n) for i in _row_slices(*close.shape)])
+    (close,), start = _align(close)
+    d = np.diff(close, prepend=close[..., :1])
     up = np.clip(d, 0, None)
     dn = np.clip(-d, 0, None)
-    ru = ema(up, n)
-    rd = ema(dn, n)
+    rows = len(np.atleast_2d(d))
+    both = ema_batch(np.concatenate((np.atleast_2d(up), np.atleast_2d(dn))), n)
+    ru, rd = both[:rows].reshape(d.shape), both[rows:].reshape(d.shape)
     rs = np.divide(ru, rd, out=np.zeros_like(ru), where=rd > 1e-12)
-    return 100 - (100 / (1 + rs))
+    return _restore(100 - (100 / (1 + rs)), start)
 
 
 def macd(close: np.ndarray, fast: int = 12, slow: int = 26, sig: int = 9):
     """Return MACD line, signal and histogram."""
-    ema_f = ema(close, fast)
-    ema_s = ema(close, slow)
+    close = _floating(close)
+    rows = np.atleast_2d(close)
+    both = ema_batch(np.concatenate((rows, rows)), np.repeat((fast, slow), len(rows)))
+    ema_f = both[: len(rows)].reshape(close.shape)
+    ema_s = both[len(rows) :].reshape(close.shape)
     line = ema_f - ema_s
     signal = ema(line, sig)
     hist = line - signal
     return line, signal, hist
 
 
+def sma(x: np.ndarray, n: int = 20) -> np.ndarray:
+    """Centred ``n``-bar mean, zero-padded at both ends of the history."""
+    data = _floating(x)
+    kernel = np.ones(n) / n
+    if data.ndim < 2:
+        return np.convolve(data, kernel, mode="same").astype(data.dtype, copy=False)
+    out = np.full(data.shape, np.nan, dtype=data.dtype)
+    valid = ~np.isnan(data)
+    for i in np.flatnonzero(valid.any(axis=1)):
+        # The window looks ahead, so each row is cut to its whole history.
+        a = valid[i].argmax()
+        b = len(valid[i]) - valid[i][::-1].argmax()
+        # Slicing the full convolution equals ``mode="same"`` and keeps the
+        # row length for histories shorter than the window.
+        lag = (n - 1) // 2
+        out[i, a:b] = np.convolve(data[i, a:b], kernel)[lag : lag + b - a]
+    return out
+
+
+def rolling_moments(x: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean and population std over the trailing ``n`` values.
+
+    The first ``n - 1`` bars use the expanding window. Runs in O(len(x)):
+    ``x`` is cut into blocks of ``n`` aligned to ``x[0]`` and every window
+    is the suffix of one block merged with the prefix of the next (Chan et
+    al.). Prefix sums are shifted by the block's first value and suffix
+    sums by its last, so both stay close to the window. A window's result
+    depends only on its two blocks, so any extract starting at a multiple
+    of ``n`` reproduces the same values bit for bit.
+    """
+    data = _floating(x)
+    (rows,), start = _align(np.atleast_2d(data))
+    count, size = rows.shape
+    if size == 0:
+        return np.empty(data.shape, data.dtype), np.empty(data.shape, data.dtype)
+    parts = [_moments(rows[i], n) for i in _row_slices(count, size)]
+    mean = np.concatenate([p[0] for p in parts]).astype(data.dtype, copy=False)
+    std = np.concatenate([p[1] for p in parts]).astype(data.dtype, copy=False)
+    return _restore(mean, start).reshape(data.shape), _restore(std, start).reshape(data.shape)
+
+
+def _moments(rows: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """:func:`rolling_moments` of the non-empty rows of a matrix."""
+    count, size = rows.shape
+    nb = -(-size // n)
+    blocks = np.zeros((count, nb * n))
+    blocks[:, :size] = rows
+    blocks = blocks.reshape(count, nb, n)
+    first, last = blocks[..., 0], blocks[..., -1]
+    dev = blocks - first[..., None]
+    head1, head2 = np.cumsum(dev, axis=2), np.cumsum(dev * dev, axis=2)
+    dev = blocks[..., ::-1] - last[..., None]
+    tail1 = np.cumsum(dev, axis=2)[..., ::-1]
+    tail2 = np.cumsum(dev * dev, axis=2)[..., ::-1]
+
+    def per_bar(a: np.ndarray, lag: int = 0) -> np.ndarray:
+        # Block-shaped ``a`` flattened to bars and delayed by ``lag`` bars.
+        flat = a.reshape(count, -1)
+        out = np.zeros((count, size))
+        out[:, lag:] = flat[:, : max(0, size - lag)]
+        return out
+
+    off = np.arange(size) % n
+    m_h = off + 1.0
+    s1, s2 = per_bar(head1), per_bar(head2)
+    first_b = per_bar(np.repeat(first, n, axis=1))
+    mean_h = first_b + s1 / m_h
+    m2_h = s2 - s1 * s1 / m_h
+
+    # The rest of the window is the end of the previous block after ``off``,
+    # whose suffix sums sit ``n - 1`` bars earlier.
+    has_tail = (np.arange(size) >= n) & (off < n - 1)
+    m_t = np.where(has_tail, n - 1 - off, 0).astype(np.float64)
+    t1, t2 = per_bar(tail1, n - 1), per_bar(tail2, n - 1)
+    last_b = per_bar(np.repeat(last, n, axis=1), n)
+    mt_safe = np.maximum(m_t, 1.0)
+    mean_t = last_b + t1 / mt_safe
+    m2_t = t2 - t1 * t1 / mt_safe
+
+    m = m_h + m_t
+    # Difference the means relative to their anchors to avoid cancellation.
+    delta = (first_b - last_b) + (s1 / m_h - t1 / mt_safe)
+    mean = np.where(has_tail, mean_t + delta * (m_h / m), mean_h)
+    m2 = np.where(has_tail, m2_t + m2_h + delta * delta * (m_t * m_h / m), m2_h)
+    return mean, np.sqrt(np.maximum(m2, 0.0) / m)
+
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    """Population std over the trailing ``n`` values (expanding at the start)."""
+    return rolling_moments(x, n)[1]
+
+
 def bollinger(close: np.ndarray, n: int = 20, k: float = 2.0):
     """Return moving average and upper/lower Bollinger Bands."""
     ma = ema(close, n)
-    std = np.array([np.std(close[max(0, i - n + 1) : i + 1]) for i in range(len(close))])
+    std = rolling_std(close, n)
     upper = ma + k * std
     lower = ma - k * std
     return ma, upper, lower
@@ -53,31 +308,72 @@ def bollinger(close: np.ndarray, n: int = 20, k: float = 2.0):
 
 def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 14) -> np.ndarray:
     """Average true range over ``n`` periods."""
-    prev_close = np.roll(close, 1)
-    prev_close[0] = close[0]
+    (high, low, close), start = _align(
+        *(_floating(c) for c in (high, low, close))
+    )
+    prev_close = np.roll(close, 1, axis=-1)
+    prev_close[..., 0] = close[..., 0]
     tr = np.maximum(
         high - low,
         np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)),
     )
-    return ema(tr, n)
+    return _restore(ema(tr, n), start)
+
+
+def atr_delta(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 14) -> np.ndarray:
+    """Relative one-bar change of the ``n``-period ATR."""
+    a = atr(high, low, close, n)
+    delta = np.diff(a, prepend=a[..., :1])
+    # The first bar of a ragged row has no previous ATR to differ from.
+    delta[np.isnan(delta) & ~np.isnan(a)] = 0.0
+    return delta / np.maximum(1e-9, a)
+
+
+def momentum(close: np.ndarray, n: int = 7) -> np.ndarray:
+    """Return over the last ``n`` bars; the first ``n`` bars wrap around
+    to the end of each row's history."""
+    (rows,), start = _align(_floating(close))
+    lag = np.roll(rows, n, axis=-1)
+    if start is not None:
+        size = rows.shape[-1]
+        for i in np.flatnonzero(start):
+            lag[i, : size - start[i]] = np.roll(rows[i, : size - start[i]], n)
+    return _restore(rows / lag - 1.0, start)
 
 
 def zscore(x: np.ndarray, n: int = 20) -> np.ndarray:
     """Rolling z-score over window ``n``."""
-    res = np.full_like(x, np.nan)
-    for i in range(len(x)):
-        win = x[max(0, i - n + 1) : i + 1]
-        mu = np.mean(win)
-        sd = np.std(win) if np.std(win) > 1e-12 else 1.0
-        res[i] = (x[i] - mu) / sd
-    return res
+    mu, sd = rolling_moments(x, n)
+    return (x - mu) / np.where(sd > 1e-12, sd, 1.0)
+
+
+def realized_vol(ret: np.ndarray, n: int = 20):
+    """Realized volatility over ``n`` returns; per row of a matrix, ignoring NaNs."""
+    ret = np.asarray(ret, dtype=np.float64)
+    if ret.ndim < 2:
+        return float(np.std(ret[-n:]))
+    return np.nanstd(ret[..., -n:], axis=-1)
+
+
+# Fewest returns a GARCH proxy is fitted on; shorter input uses their std.
+GARCH_MIN_RETURNS = 30
 
 
-def realized_vol(ret: np.ndarray, n: int = 20) -> float:
-    """Realized volatility over ``n`` returns."""
-    return float(np.std(ret[-n:]))
+def garch_proxy(ret: np.ndarray, n: int = 200):
+    """Next-bar GARCH(1,1) volatility fitted on the last ``n`` returns; one
+    value per row of a matrix.
 
+    Rows with fewer than ``GARCH_MIN_RETURNS`` returns, with NaNs or with
+    no variation fall back to the standard deviation of those returns.
+    """
+    # Imported here: the GARCH filter is built on this module.
+    from .garch import garch_forecast
 
-def garch_proxy(ret: np.ndarray, n: int = 200) -> float:
-    """A light-weight volatility proxy; replace with real GARCH if desired."""
-    return float(np.sqrt(np.var(ret[-n:])))
+    window = np.asarray(ret, dtype=np.float64)[..., -n:]
+    rows = window.reshape(-1, window.shape[-1])
+    vol = np.sqrt(np.nanvar(rows, axis=-1)) if rows.size else np.zeros(len(rows))
+    fit = np.isfinite(rows).all(axis=-1) & (vol > 0)
+    if rows.shape[-1] >= GARCH_MIN_RETURNS and fit.any():
+        vol[fit] = np.sqrt(garch_forecast(rows[fit]))
+    vol = vol.reshape(window.shape[:-1])
+    return float(vol) if np.ndim(vol) == 0 else vol
@@ -0,0 +1,347 @@
+"""Process-backed job queue for long-running backtests.
+
+Each job runs in its own spawned process so CPU-bound tuning never blocks
+the API event loop. At most ``max_jobs`` run at once; the rest wait in
+submission order. Each job reports progress and its result over its own
+pipe, which a background thread drains into :class:`Job` records. A job's
+process keeps its slot until it exits, but is reaped without blocking
+callers, so work it finishes after its result never stalls the API.
+
+Progress is rate-limited at the source: frequent events are coalesced to
+the latest one per ``EVENT_INTERVAL`` seconds, and each job keeps only the
+last ``EVENT_BUFFER`` events for streaming clients.
+
+Finished jobs are forgotten ``JOB_TTL`` seconds after they end, and beyond
+the newest ``MAX_FINISHED`` of them, so their results do not accumulate in
+a long-running process.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+MAX_JOBS = int(os.getenv("QUANTUM_MAX_JOBS", "2"))
+EVENT_INTERVAL = 0.25
+EVENT_BUFFER = 256
+JOB_TTL = float(os.getenv("QUANTUM_JOB_TTL", str(3600)))
+MAX_FINISHED = int(os.getenv("QUANTUM_MAX_FINISHED_JOBS", "1000"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """State of one submitted job."""
+
+    id: str
+    status: str = QUEUED
+    progress: float = 0.0
+    detail: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    events: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=EVENT_BUFFER))
+    seq: int = 0
+
+    def record(self, kind: str, data: Dict[str, Any]) -> None:
+        """Append an event with the next sequence number."""
+        self.seq += 1
+        self.events.append({"seq": self.seq, "event": kind, "time": time.time(), **data})
+
+    def events_since(self, seq: int) -> List[Dict[str, Any]]:
+        """Return buffered events newer than ``seq``."""
+        return [e for e in list(self.events) if e["seq"] > seq]
+
+    def info(self) -> Dict[str, Any]:
+        """Return the job status without its result."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "detail": self.detail,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class ThrottledEmitter:
+    """Forward events to ``send``, coalescing frequent kinds.
+
+    Events whose kind is in ``coalesce`` are sent at most once per
+    ``interval`` seconds; in between only the latest is kept. Any other
+    event first flushes the held one, so milestones are never reordered.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, Dict[str, Any]], None],
+        interval: float = EVENT_INTERVAL,
+        coalesce: Tuple[str, ...] = ("trial",),
+    ) -> None:
+        self.send = send
+        self.interval = interval
+        self.coalesce = coalesce
+        self._held: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._last = float("-inf")
+
+    def __call__(self, kind: str, **data: Any) -> None:
+        if kind in self.coalesce:
+            now = time.monotonic()
+            if now - self._last < self.interval:
+                self._held = (kind, data)
+                return
+            self._last = now
+        else:
+            self.flush()
+        self._held = None
+        self.send(kind, data)
+
+    def flush(self) -> None:
+        """Send the held event, if any."""
+        if self._held is not None:
+            held, self._held = self._held, None
+            self.send(*held)
+
+
+def _run_child(target: Callable[..., Any], args: Tuple[Any, ...], conn: Connection) -> None:
+    """Job process entry point: run ``target`` and send its outcome."""
+    if hasattr(os, "setsid"):
+        # Own process group, so cancelling also stops any pool the job starts.
+        os.setsid()
+
+    emit = ThrottledEmitter(lambda kind, data: conn.send((kind, data)))
+    try:
+        result = target(*args, emit=emit)
+    except BaseException:
+        emit.flush()
+        conn.send((FAILED, {"error": traceback.format_exc(limit=5)}))
+    else:
+        emit.flush()
+        conn.send((DONE, {"result": result}))
+    finally:
+        conn.close()
+
+
+class JobQueue:
+    """Run callables in worker processes with a concurrency limit.
+
+    ``target(*args, emit=emit)`` must be importable by spawned processes.
+    ``emit(kind, **data)`` updates :attr:`Job.detail`; events carrying
+    ``n`` and ``total`` also update :attr:`Job.progress`.
+    """
+
+    def __init__(
+        self, max_jobs: int = MAX_JOBS, ttl: float = JOB_TTL, max_finished: int = MAX_FINISHED
+    ) -> None:
+        if max_jobs < 1:
+            raise ValueError("max_jobs must be at least 1")
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._calls: Dict[str, Tuple[Callable[..., Any], Tuple[Any, ...]]] = {}
+        self._pending: Deque[str] = deque()
+        self._procs: Dict[str, Tuple[Any, Connection]] = {}
+        # Processes whose pipe is closed but which may still be running
+        # (e.g. finishing deferred plots); reaped once their sentinel fires.
+        self._exiting: Dict[str, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def submit(self, target: Callable[..., Any], *args: Any) -> Job:
+        """Queue ``target(*args)`` and return its job record."""
+        job = Job(id=uuid.uuid4().hex[:12])
+        with self._lock:
+            self._start()
+            self._evict()
+            self._jobs[job.id] = job
+            self._calls[job.id] = (target, args)
+            self._pending.append(job.id)
+            self._launch()
+        return job
+
+    def add_result(self, result: Any) -> Job:
+        """Record an already available ``result`` as a finished job."""
+        job = Job(id=uuid.uuid4().hex[:12], result=result, progress=1.0, started=time.time())
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+            self._finish(job, DONE)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """Return the job ``job_id``; raises ``KeyError`` if unknown or evicted."""
+        with self._lock:
+            self._evict()
+            return self._jobs[job_id]
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued or running job; finished jobs are left as is."""
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status == QUEUED:
+                self._pending.remove(job_id)
+                self._calls.pop(job_id, None)
+            elif job.status == RUNNING:
+                if job_id in self._procs:
+                    self._release(job_id)
+                self._kill(self._exiting[job_id])
+            else:
+                return job
+            self._finish(job, CANCELLED)
+            self._launch()
+        return job
+
+    def close(self) -> None:
+        """Stop the dispatcher and kill running jobs."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            for job_id in list(self._procs):
+                self._release(job_id)
+            for job_id, proc in self._exiting.items():
+                job = self._jobs.get(job_id)
+                if job is not None and job.status == RUNNING:
+                    self._kill(proc)
+                    self._finish(job, CANCELLED)
+            procs, self._exiting = list(self._exiting.values()), {}
+        for proc in procs:
+            proc.join()
+
+    def _evict(self) -> None:
+        """Forget finished jobs past ``ttl`` or beyond the newest ``max_finished``."""
+        now = time.time()
+        finished = sorted(
+            (job.finished, job_id)
+            for job_id, job in self._jobs.items()
+            if job.status in FINAL_STATES
+        )
+        excess = len(finished) - self.max_finished
+        for i, (ended, job_id) in enumerate(finished):
+            if i < excess or now - ended > self.ttl:
+                del self._jobs[job_id]
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._pump, name="job-queue", daemon=True)
+            self._thread.start()
+
+    def _launch(self) -> None:
+        while self._pending and len(self._procs) + len(self._exiting) < self.max_jobs:
+            job_id = self._pending.popleft()
+            target, args = self._calls.pop(job_id)
+            reader, writer = self._ctx.Pipe(duplex=False)
+            proc = self._ctx.Process(
+                target=_run_child, args=(target, args, writer), name=f"job-{job_id}"
+            )
+            proc.start()
+            writer.close()
+            self._procs[job_id] = (proc, reader)
+            job = self._jobs[job_id]
+            job.status, job.started = RUNNING, time.time()
+
+    @staticmethod
+    def _kill(proc: Any) -> None:
+        """Signal ``proc`` to stop; :meth:`_pump` reaps it once it exits."""
+        if proc.pid is not None and hasattr(os, "killpg"):
+            try:
+                os.killpg(proc.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                # The job has not reached ``setsid`` yet.
+                proc.terminate()
+        else:
+            proc.terminate()
+
+    def _release(self, job_id: str) -> None:
+        """Close the job's pipe and leave its process to be reaped."""
+        proc, conn = self._procs.pop(job_id)
+        conn.close()
+        self._exiting[job_id] = proc
+
+    def _pump(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                conns = {conn: job_id for job_id, (_, conn) in self._procs.items()}
+                sentinels = {proc.sentinel: job_id for job_id, proc in self._exiting.items()}
+            if not conns and not sentinels:
+                self._stop.wait(0.1)
+                continue
+            try:
+                ready = wait([*conns, *sentinels], timeout=0.1)
+            except (OSError, ValueError):
+                # A pipe was closed by ``cancel`` while waiting on it.
+                continue
+            exited = []
+            with self._lock:
+                for obj in ready:
+                    if obj in sentinels:
+                        job_id = sentinels[obj]
+                        exited.append((job_id, self._exiting.pop(job_id)))
+                        continue
+                    job_id = conns[obj]
+                    if job_id not in self._procs:
+                        continue
+                    try:
+                        kind, data = obj.recv()
+                    except (EOFError, OSError):
+                        self._release(job_id)
+                        continue
+                    self._handle(job_id, kind, data)
+            # Joining exited processes only reaps them, but keep it outside
+            # the lock so API calls never wait on a child.
+            for _, proc in exited:
+                proc.join()
+            with self._lock:
+                for job_id, proc in exited:
+                    self._exited(job_id, proc)
+                self._launch()
+
+    def _handle(self, job_id: str, kind: str, data: Dict[str, Any]) -> None:
+        job = self._jobs[job_id]
+        if kind == DONE:
+            job.result, job.progress = data["result"], 1.0
+            self._finish(job, DONE)
+        elif kind == FAILED:
+            job.error = data["error"]
+            self._finish(job, FAILED)
+        else:
+            job.detail = {"event": kind, **data}
+            job.record(kind, data)
+            if data.get("total"):
+                job.progress = min(1.0, data["n"] / data["total"])
+            return
+        self._release(job_id)
+
+    def _exited(self, job_id: str, proc: Any) -> None:
+        """Fail the job of a reaped process if it never sent a result."""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status == RUNNING:
+            job.error = f"worker exited with code {proc.exitcode}"
+            self._finish(job, FAILED)
+
+    @staticmethod
+    def _finish(job: Job, status: str) -> None:
+        # Record the terminal event before the status so streams that see a
+        # final status have already been able to read it.
+        job.record(status, {"error": job.error} if job.error else {})
+        job.finished = time.time()
+        job.status = status
@@ -0,0 +1,179 @@
+"""Incremental indicators for live feeds.
+
+Each class keeps the state of one indicator and returns its latest value
+from ``update`` in constant (amortized) time per bar. The updates replay
+the floating-point operations of the batch functions in
+:mod:`.indicators`, so feeding a series bar by bar yields exactly the
+values of the batch call over the same series.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .indicators import EMA_BLOCK, ema_tables
+
+
+class EMA:
+    """Exponential moving average; see :func:`.indicators.ema`."""
+
+    def __init__(self, n: int, s0: Optional[float] = None) -> None:
+        self.k = 2 / (n + 1.0)
+        a = 1 - self.k
+        self._pw: Optional[List[float]] = None
+        if a > 0:
+            pw, inv = ema_tables(a)
+            self._pw, self._inv = pw.tolist(), inv.tolist()
+        self._seeded = s0 is not None
+        self._carry = 0.0 if s0 is None else float(s0)
+        self._part = 0.0
+        self._r = 0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        """Add one value and return the average."""
+        x = float(x)
+        b = self.k * x if self._seeded else x
+        self._seeded = True
+        if self._pw is None:
+            self.value = b
+            return b
+        # Same block recurrence as ``linear_recurrence``: partial sums of
+        # ``b * a**-r`` restart every ``EMA_BLOCK`` bars from a carry.
+        r = self._r
+        term = b * self._inv[r]
+        self._part = term if r == 0 else self._part + term
+        s = self._pw[r + 1] * self._carry + self._pw[r] * self._part
+        if r == EMA_BLOCK - 1:
+            self._carry, self._r = s, 0
+        else:
+            self._r = r + 1
+        self.value = s
+        return s
+
+
+class RollingMoments:
+    """Trailing ``n``-bar mean and population std; see
+    :func:`.indicators.rolling_moments`.
+
+    Bars are grouped in blocks of ``n`` like the batch function; the suffix
+    sums of a block are computed once when it completes.
+    """
+
+    def __init__(self, n: int) -> None:
+        if n < 1:
+            raise ValueError("window must be at least 1")
+        self.n = n
+        self._block: List[float] = []
+        self._first = 0.0
+        self._s1 = self._s2 = 0.0
+        self._last: Optional[float] = None
+        self._tail1: List[float] = []
+        self._tail2: List[float] = []
+
+    def update(self, x: float) -> Tuple[float, float]:
+        """Add one value and return ``(mean, std)`` of the window."""
+        x = float(x)
+        n, off = self.n, len(self._block)
+        if off == 0:
+            self._first = x
+        dev = x - self._first
+        self._s1 = dev if off == 0 else self._s1 + dev
+        self._s2 = dev * dev if off == 0 else self._s2 + dev * dev
+        self._block.append(x)
+        m_h = off + 1.0
+        s1, s2 = self._s1, self._s2
+        mean = self._first + s1 / m_h
+        m2 = s2 - s1 * s1 / m_h
+        m = m_h
+        if self._last is not None and off < n - 1:
+            m_t = float(n - 1 - off)
+            t1, t2 = self._tail1[off + 1], self._tail2[off + 1]
+            mean_t = self._last + t1 / m_t
+            m2_t = t2 - t1 * t1 / m_t
+            m = m_h + m_t
+            delta = (self._first - self._last) + (s1 / m_h - t1 / m_t)
+            mean = mean_t + delta * (m_h / m)
+            m2 = m2_t + m2 + delta * delta * (m_t * m_h / m)
+        if off == n - 1:
+            self._close_block()
+        return mean, math.sqrt(max(m2, 0.0) / m)
+
+    def _close_block(self) -> None:
+        block = np.array(self._block)
+        self._last = float(block[-1])
+        dev = block[::-1] - block[-1]
+        self._tail1 = np.cumsum(dev)[::-1].tolist()
+        self._tail2 = np.cumsum(dev * dev)[::-1].tolist()
+        self._block = []
+
+
+class RSI:
+    """Relative strength index; see :func:`.indicators.rsi`."""
+
+    def __init__(self, n: int = 14) -> None:
+        self._up, self._dn = EMA(n), EMA(n)
+        self._prev: Optional[float] = None
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        d = 0.0 if self._prev is None else close - self._prev
+        self._prev = close
+        ru = self._up.update(max(d, 0.0))
+        rd = self._dn.update(max(-d, 0.0))
+        rs = ru / rd if rd > 1e-12 else 0.0
+        return 100 - (100 / (1 + rs))
+
+
+class MACD:
+    """MACD line, signal and histogram; see :func:`.indicators.macd`."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, sig: int = 9) -> None:
+        self._fast, self._slow, self._signal = EMA(fast), EMA(slow), EMA(sig)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        line = self._fast.update(close) - self._slow.update(close)
+        signal = self._signal.update(line)
+        return line, signal, line - signal
+
+
+class Bollinger:
+    """Moving average and bands; see :func:`.indicators.bollinger`."""
+
+    def __init__(self, n: int = 20, k: float = 2.0) -> None:
+        self.k = k
+        self._ma, self._moments = EMA(n), RollingMoments(n)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        ma = self._ma.update(close)
+        std = self._moments.update(close)[1]
+        return ma, ma + self.k * std, ma - self.k * std
+
+
+class ATR:
+    """Average true range; see :func:`.indicators.atr`."""
+
+    def __init__(self, n: int = 14) -> None:
+        self._ema = EMA(n)
+        self._prev: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> float:
+        high, low, close = float(high), float(low), float(close)
+        prev = close if self._prev is None else self._prev
+        self._prev = close
+        tr = max(high - low, max(abs(high - prev), abs(low - prev)))
+        return self._ema.update(tr)
+
+
+class ZScore:
+    """Rolling z-score; see :func:`.indicators.zscore`."""
+
+    def __init__(self, n: int = 20) -> None:
+        self._moments = RollingMoments(n)
+
+    def update(self, x: float) -> float:
+        mu, sd = self._moments.update(x)
+        return (float(x) - mu) / (sd if sd > 1e-12 else 1.0)
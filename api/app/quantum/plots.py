@@ -0,0 +1,88 @@
+"""Downsampled PNG plots of backtest curves.
+
+Curves are reduced to a few thousand points with largest-triangle-three-
+buckets (LTTB), which keeps the visually significant peaks and troughs
+that plain striding drops. matplotlib is imported on the first render,
+and figures are drawn through the object API rather than ``pyplot``, so
+rendering can run on a background thread.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Mapping, NamedTuple
+
+import numpy as np
+
+PLOT_POINTS = 2000
+
+
+class Curve(NamedTuple):
+    """A plot of ``y`` against bar index with its figure height in inches."""
+
+    title: str
+    y: np.ndarray
+    height: float = 3.0
+
+
+def lttb(y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of ``points`` bars of ``y`` chosen by largest-triangle-three-buckets.
+
+    The first and last bars are always kept; every other bucket of bars
+    contributes the one forming the largest triangle with the previously
+    kept bar and the mean of the next bucket.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    size = len(y)
+    if points < 3:
+        raise ValueError("LTTB needs at least 3 points")
+    if size <= points:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)
+    # Bucket means for the look-ahead vertex; the final bucket is the last bar.
+    sums = np.add.reduceat(y, edges[:-1])
+    counts = np.diff(edges)
+    mean_y = np.append(sums / counts, y[-1])
+    mean_x = np.append((edges[:-1] + edges[1:] - 1) / 2.0, size - 1)
+    out = np.empty(points, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - mean_x[i + 1]) * (y[lo:hi] - y[a]) - (a - xs) * (mean_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def render_curves(outdir: Path, curves: Mapping[str, Curve], points: int = PLOT_POINTS) -> None:
+    """Write each curve to ``outdir/<name>.png`` after LTTB downsampling."""
+    from matplotlib.figure import Figure
+
+    outdir.mkdir(parents=True, exist_ok=True)
+    for name, curve in curves.items():
+        idx = lttb(curve.y, points)
+        fig = Figure(figsize=(10, curve.height))
+        ax = fig.subplots()
+        ax.plot(idx, np.asarray(curve.y)[idx])
+        ax.set_title(curve.title)
+        fig.tight_layout()
+        fig.savefig(outdir / f"{name}.png")
+
+
+def render_in_background(
+    outdir: Path, curves: Mapping[str, Curve], points: int = PLOT_POINTS
+) -> threading.Thread:
+    """Start :func:`render_curves` on a thread and return it.
+
+    The thread is not a daemon, so a finishing process still writes its
+    plots before exiting.
+    """
+    thread = threading.Thread(
+        target=render_curves, args=(outdir, dict(curves), points), name="render-plots"
+    )
+    thread.start()
+    return thread
+
@@ -0,0 +1,190 @@
+"""Multi-symbol portfolio backtest on one shared equity curve.
+
+Each symbol's data is loaded and its signals resolved in a worker process,
+which returns only its trade legs. The legs are merged in timestamp order
+and compounded on a single equity path, so every symbol is sized from the
+portfolio drawdown rather than its own.
+"""
+
+from __future__ import annotations
+
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .adaptive import apply_dynamic_thresholds
+from .backtester import CONFIG_TYPES, BacktestEngine
+from .engine import STRATEGIES, compound_trades, trade_fees
+
+
+@dataclass(frozen=True)
+class SymbolSource:
+    """Data source for one portfolio symbol; ``None`` paths synthesise data."""
+
+    symbol: str
+    csv_ohlcv_path: Optional[str] = None
+    csv_sentiment_path: Optional[str] = None
+
+
+@dataclass
+class PortfolioResult:
+    """Merged trades and metrics of a portfolio run.
+
+    ``ts``, ``symbol`` and ``equity`` hold one entry per trade in execution
+    order; ``symbol`` indexes into ``symbols``.
+    """
+
+    symbols: Tuple[str, ...]
+    ts: np.ndarray
+    symbol: np.ndarray
+    equity: np.ndarray
+    drawdown: np.ndarray
+    summary: Dict[str, float]
+    per_symbol: Dict[str, Dict[str, float]]
+
+    def report(self) -> Dict[str, Any]:
+        """Return the JSON-serialisable portfolio report."""
+        return {"summary": self.summary, "per_symbol": self.per_symbol}
+
+
+def _timestamps(df: pd.DataFrame) -> np.ndarray:
+    if "ts" not in df:
+        return np.arange(len(df), dtype=np.int64)
+    ts = df["ts"].to_numpy()
+    if np.issubdtype(ts.dtype, np.datetime64):
+        return ts.astype("datetime64[ns]").view(np.int64)
+    return ts.astype(np.int64)
+
+
+def symbol_legs(engine: BacktestEngine, params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Return the trade legs of one symbol before fees and drawdown sizing.
+
+    Legs carry the bar timestamp, strategy code, the return clipped to the
+    take-profit/stop-loss (widened on volatile bars when sizing by GARCH) and
+    the volatility-scaled base fraction.
+    """
+    df = engine.load_data()
+    close, rv, signal, tps, sls, _ = engine._signals(df, params)
+    idx = np.flatnonzero(signal)
+    code = signal[idx]
+    prev = close[idx - 1].astype(np.float64)
+    raw = (close[idx] - prev) / prev
+    vol = rv[idx].astype(np.float64)
+    tp, sl = tps[code], sls[code]
+    dyn = engine._widening()
+    if dyn is not None:
+        tp, sl, _, _ = apply_dynamic_thresholds(tp, sl, 0.0, 0.0, vol, dyn)
+    sizing = engine.sizing
+    return {
+        "ts": _timestamps(df)[idx],
+        "code": code,
+        "gross": np.where(raw > tp, tp, np.where(raw < -sl, -sl, raw)),
+        "scale": sizing.base_risk * (sizing.target_vol / np.maximum(1e-6, vol)),
+    }
+
+
+def _symbol_engine(template: BacktestEngine, source: SymbolSource, i: int) -> BacktestEngine:
+    engine = copy.copy(template)
+    engine.symbol = source.symbol
+    engine.csv = source.csv_ohlcv_path
+    engine.csv_sent = source.csv_sentiment_path
+    # Offset synthetic seeds so generated symbols do not share a price path.
+    engine.seed = template.seed + i
+    return engine
+
+
+def _legs_job(job: Tuple[BacktestEngine, Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    return symbol_legs(*job)
+
+
+def run_portfolio(
+    template: BacktestEngine,
+    sources: Sequence[SymbolSource],
+    params: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+) -> PortfolioResult:
+    """Backtest ``sources`` as one portfolio.
+
+    Args:
+        template: Engine supplying fees, venues and sizing for every symbol.
+        sources: Symbols and their data sources.
+        params: Strategy configs keyed like :data:`CONFIG_TYPES`; defaults
+            to the default configs with the template's ``run.confirm_tf``.
+        workers: Signal-generation processes; defaults to ``run.workers``.
+
+    Returns:
+        The merged equity curve with total and per-symbol metrics.
+    """
+    if not sources:
+        raise ValueError("portfolio needs at least one symbol")
+    symbols = tuple(s.symbol for s in sources)
+    if len(set(symbols)) != len(symbols):
+        raise ValueError("portfolio symbols must be unique")
+    params = params or template._confirmed({key: cls() for key, cls in CONFIG_TYPES.items()})
+    jobs = [(_symbol_engine(template, s, i), params) for i, s in enumerate(sources)]
+    workers = min(len(jobs), template.run.workers if workers is None else workers)
+    if workers <= 1:
+        legs: List[Dict[str, np.ndarray]] = [_legs_job(job) for job in jobs]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+            legs = list(pool.map(_legs_job, jobs))
+    return merge_legs(symbols, legs, template)
+
+
+def merge_legs(
+    symbols: Sequence[str], legs: Sequence[Dict[str, np.ndarray]], engine: BacktestEngine
+) -> PortfolioResult:
+    """Compound per-symbol legs in time order on one equity curve.
+
+    Trades sharing a timestamp execute in ``symbols`` order. Venues rotate
+    across the whole portfolio, and each trade is sized from its symbol's
+    volatility and the portfolio drawdown.
+    """
+    sym = np.concatenate([np.full(len(l["ts"]), i, dtype=np.int32) for i, l in enumerate(legs)])
+    ts = np.concatenate([l["ts"] for l in legs])
+    order = np.lexsort((sym, ts))
+    sym, ts = sym[order], ts[order]
+    code = np.concatenate([l["code"] for l in legs])[order]
+    scale = np.concatenate([l["scale"] for l in legs])[order]
+    pnl = np.concatenate([l["gross"] for l in legs])[order]
+    pnl = pnl - trade_fees(engine._fee_cycle(), len(pnl))
+
+    step, *_ = compound_trades(scale, pnl, engine.sizing)
+    equity = np.cumprod(step)
+    before = np.concatenate(([1.0], equity[:-1]))
+    running = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+    drawdown = 1 - equity / running
+    win = pnl > 0
+    trades = len(pnl)
+    wins = int(np.count_nonzero(win))
+    summary = {
+        "equity": float(equity[-1]) if trades else 1.0,
+        "pnl": float(equity[-1] - 1.0) if trades else 0.0,
+        "max_dd": float(np.max(drawdown)) if trades else 0.0,
+        "trades": trades,
+        "wins": wins,
+        "wr": wins / max(1, trades),
+    }
+
+    n = len(symbols)
+    counts = np.bincount(sym, minlength=n)
+    won = np.bincount(sym, weights=win, minlength=n)
+    contribution = np.bincount(sym, weights=before * (step - 1), minlength=n)
+    per_symbol = {}
+    for i, name in enumerate(symbols):
+        mine = sym == i
+        by_strategy = np.bincount(code[mine], minlength=len(STRATEGIES) + 1)[1:]
+        per_symbol[name] = {
+            "trades": int(counts[i]),
+            "wins": int(won[i]),
+            "wr": float(won[i] / max(1, counts[i])),
+            "contribution": float(contribution[i]),
+            "trades_by_strategy": dict(zip(STRATEGIES, by_strategy.tolist())),
+        }
+    return PortfolioResult(tuple(symbols), ts, sym, equity, drawdown, summary, per_symbol)
@@ -0,0 +1,187 @@
+"""Content-addressed cache of finished backtest runs.
+
+A run is keyed by a hash of its engine configuration, the SHA-256 of its
+input CSVs and the source of this package, so re-submitting an identical
+request returns the stored ``report.json`` and artifacts. Runs are written
+to a staging directory and renamed into place when complete, replacing an
+older entry for the same key. Entries are
+evicted by age and by total size, together with the timestamped run
+directories older versions wrote next to the cache.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .datacache import cached_meta
+
+RESULTS_DIR = Path(os.getenv("QUANTUM_RESULTS_DIR", "out/results"))
+MAX_BYTES = int(os.getenv("QUANTUM_RESULTS_MAX_BYTES", str(2 << 30)))
+MAX_AGE = float(os.getenv("QUANTUM_RESULTS_MAX_AGE", str(14 * 86400)))
+
+# ``out/<stamp>-<uuid>`` directories written before runs were cached.
+_LEGACY_RUN = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{6}$")
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the backtester package sources and of the API router,
+    which builds the stored report."""
+    package = Path(__file__).parent
+    h = hashlib.sha256()
+    for path in sorted(package.glob("*.py")) + [package.parent / "routers" / "quantum.py"]:
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def data_fingerprint(path: Optional[str]) -> Optional[str]:
+    """SHA-256 of the CSV at ``path``; ``None`` when the engine synthesises it.
+
+    The hash is the one recorded in the column cache when it was built, so
+    the file is only re-hashed after its size or mtime changed.
+    """
+    if not path or not Path(path).exists():
+        return None
+    return cached_meta(path)["sha256"]
+
+
+def run_key(engine: Any, kind: str) -> str:
+    """Return the cache key of running ``engine`` for caller ``kind``.
+
+    ``kind`` separates callers that store different reports for the same
+    run, such as the API and the command-line tool.
+    """
+    spec = {
+        "kind": kind,
+        "code": code_version(),
+        "symbol": engine.symbol,
+        "ohlcv": data_fingerprint(engine.csv),
+        "sentiment": data_fingerprint(engine.csv_sent),
+        "fees": asdict(engine.fees),
+        "venue_costs": {name: asdict(v) for name, v in engine.venues.items()},
+        "sizing": asdict(engine.sizing),
+        "dyn": asdict(engine.dyn),
+        # The worker count changes how a run is computed, not its result.
+        "run": {k: v for k, v in asdict(engine.run).items() if k != "workers"},
+        "seed": engine.seed,
+    }
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class ResultCache:
+    """Finished runs stored under ``root`` by key."""
+
+    def __init__(
+        self, root: Optional[Path] = None, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE
+    ) -> None:
+        self.root = Path(root or RESULTS_DIR)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def entry(self, key: str) -> Path:
+        """Directory holding the run stored under ``key``."""
+        return self.root / key
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the entry for ``key`` if it holds a report, marking it used."""
+        entry = self.entry(key)
+        if not (entry / "report.json").is_file():
+            return None
+        os.utime(entry)
+        return entry
+
+    def report(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored ``report.json`` for ``key``, if any."""
+        entry = self.lookup(key)
+        return json.loads((entry / "report.json").read_text()) if entry else None
+
+    def staging(self, key: str) -> Path:
+        """Create a private directory to write a run for ``key`` into."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        # The start time lets ``commit`` tell concurrent runs from older entries.
+        prefix = f".{key[:16]}-{time.time_ns():x}-"
+        return Path(tempfile.mkdtemp(prefix=prefix, dir=self.root))
+
+    def commit(self, key: str, staging: Path) -> bool:
+        """Publish ``staging`` as the entry for ``key`` and evict old entries.
+
+        An entry stored before ``staging`` was created is replaced. If a
+        concurrent identical run published the key first, its entry is kept
+        and ``staging`` is discarded. Returns whether ``staging`` was published.
+        """
+        entry = self.entry(key)
+        try:
+            started = int(staging.name.split("-")[1], 16)
+        except (IndexError, ValueError):
+            started = None
+        try:
+            stored = (entry / "report.json").stat().st_mtime_ns
+        except OSError:
+            stored = None
+        if started is not None and stored is not None and stored >= started:
+            published = False
+            shutil.rmtree(staging, ignore_errors=True)
+        else:
+            aside = self.root / f".{key[:16]}-{uuid.uuid4().hex[:8]}.old"
+            try:
+                os.rename(entry, aside)
+            except FileNotFoundError:
+                aside = None
+            try:
+                os.replace(staging, entry)
+                published = True
+            except OSError:
+                # Another run published between the two renames.
+                published = False
+                shutil.rmtree(staging, ignore_errors=True)
+            if aside is not None:
+                shutil.rmtree(aside, ignore_errors=True)
+        self.evict()
+        return published
+
+    def _candidates(self) -> Iterator[Path]:
+        if self.root.is_dir():
+            yield from (p for p in self.root.iterdir() if p.is_dir())
+        parent = self.root.parent
+        if parent.is_dir():
+            yield from (p for p in parent.iterdir() if p.is_dir() and _LEGACY_RUN.match(p.name))
+
+    def evict(self, now: Optional[float] = None) -> List[Path]:
+        """Remove entries past ``max_age``, then the least recently used
+        until the total fits ``max_bytes``. Returns the removed paths."""
+        now = time.time() if now is None else now
+        removed: List[Path] = []
+        live: List[Tuple[float, int, Path]] = []
+        for path in self._candidates():
+            mtime = path.stat().st_mtime
+            if now - mtime > self.max_age:
+                removed.append(path)
+            elif not path.name.startswith("."):
+                # Staging directories of running jobs are only aged out.
+                live.append((mtime, _dir_size(path), path))
+        total = sum(size for _, size, _ in live)
+        for _, size, path in sorted(live, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            removed.append(path)
+            total -= size
+        for path in removed:
+            shutil.rmtree(path, ignore_errors=True)
+        return removed
@@ -0,0 +1,113 @@
+"""Block-bootstrap scenarios resampled from a real OHLCV history.
+
+Bars are resampled in blocks so that volatility clustering and the
+intrabar shape survive. Each scenario compounds the sampled close-to-close
+log returns from the first close of the history; open, high and low are
+rebuilt from their sampled ratios to the close, and volume and sentiment
+are taken from the same sampled bars. Histories wrap around, so every bar
+is equally likely to be drawn.
+
+Two schemes are supported: ``"moving"`` blocks of fixed length and the
+``"stationary"`` bootstrap of Politis and Romano, whose block lengths are
+geometric with the given mean. Scenario ``k`` of a seed only depends on
+``k``, so any range of scenarios can be generated on its own and matches
+the same rows of a larger batch.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Mapping
+
+import numpy as np
+
+METHODS = ("stationary", "moving")
+# Columns of a scenario batch, as produced by :func:`bootstrap_paths`.
+COLUMNS = ("open", "high", "low", "close", "volume", "sentiment")
+
+
+def _uniforms(seed: int, start: int, count: int, per_path: int) -> np.ndarray:
+    """``(count, per_path)`` uniforms; row ``k`` is path ``start + k`` of ``seed``.
+
+    Every path consumes exactly ``per_path`` draws, so skipping to a path is
+    a single ``advance`` of the generator.
+    """
+    bitgen = np.random.PCG64(seed)
+    bitgen.advance(start * per_path)
+    return np.random.Generator(bitgen).random((count, per_path))
+
+
+def bootstrap_indices(
+    size: int,
+    count: int,
+    block: int,
+    method: str = "stationary",
+    seed: int = 0,
+    start: int = 0,
+) -> np.ndarray:
+    """Bar indices of scenarios ``start .. start + count`` as ``(count, size)``.
+
+    Args:
+        size: Bars of the history and of every scenario.
+        count: Number of scenarios.
+        block: Block length, or the mean block length for ``"stationary"``.
+        method: ``"stationary"`` or ``"moving"``.
+        seed: Seed of the scenario sequence.
+        start: Index of the first scenario in the sequence.
+    """
+    if size < 1 or count < 0:
+        raise ValueError("size must be positive and count non-negative")
+    if block < 1:
+        raise ValueError("block length must be at least 1")
+    if method == "moving":
+        blocks = -(-size // block)
+        starts = (_uniforms(seed, start, count, blocks) * size).astype(np.int64)
+        offsets = np.arange(blocks * block) % block
+        idx = np.repeat(starts, block, axis=1) + offsets
+        return idx[:, :size] % size
+    if method == "stationary":
+        u = _uniforms(seed, start, count, 2 * size)
+        fresh = u[:, :size] < 1.0 / block
+        fresh[:, 0] = True
+        # Every bar continues the block opened at the last fresh bar.
+        bars = np.arange(size)
+        opened = np.maximum.accumulate(np.where(fresh, bars, 0), axis=1)
+        first = (u[:, size:] * size).astype(np.int64)
+        rows = np.arange(count)[:, None]
+        return (first[rows, opened] + bars - opened) % size
+    raise ValueError(f"unknown bootstrap method {method!r}; expected stationary or moving")
+
+
+def bootstrap_paths(
+    history: Mapping[str, np.ndarray],
+    count: int,
+    block: int = 50,
+    method: str = "stationary",
+    seed: int = 0,
+    start: int = 0,
+) -> Dict[str, np.ndarray]:
+    """Resample ``history`` into ``count`` scenarios of ``(count, bars)`` columns.
+
+    ``history`` holds 1-D open, high, low, close and volume columns and,
+    optionally, sentiment (zero when missing). The result can be passed
+    to :meth:`~.backtester.BacktestEngine.simulate_paths`.
+    """
+    close = np.asarray(history["close"], dtype=np.float64)
+    size = len(close)
+    prev = np.concatenate((close[:1], close[:-1]))
+    log_ret = np.log(close / prev)
+    idx = bootstrap_indices(size, count, block, method, seed, start)
+
+    path = close[0] * np.exp(np.cumsum(log_ret[idx], axis=1))
+    path_prev = np.concatenate((np.full((count, 1), close[0]), path[:, :-1]), axis=1)
+    out = {
+        "open": path_prev * (np.asarray(history["open"]) / prev)[idx],
+        "high": path * (np.asarray(history["high"]) / close)[idx],
+        "low": path * (np.asarray(history["low"]) / close)[idx],
+        "close": path,
+        "volume": np.asarray(history["volume"], dtype=np.float64)[idx],
+    }
+    sentiment = history.get("sentiment")
+    out["sentiment"] = (
+        np.zeros((count, size)) if sentiment is None else np.asarray(sentiment, dtype=np.float64)[idx]
+    )
+    return out
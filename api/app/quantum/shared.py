@@ -0,0 +1,88 @@
+"""Publish a loaded DataFrame to worker processes through shared memory."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Byte alignment of each column inside the shared block.
+ALIGN = 64
+
+
+@dataclass(frozen=True)
+class SharedFrameSpec:
+    """Picklable handle workers use to attach to a :class:`SharedFrame`."""
+
+    name: str
+    columns: Tuple[str, ...]
+    # NumPy dtype string of each column, e.g. "<f4" or "<M8[ns]".
+    dtypes: Tuple[str, ...]
+    # Byte offset of each column within the block.
+    offsets: Tuple[int, ...]
+    length: int
+
+
+def _column(df: pd.DataFrame, name: str) -> np.ndarray:
+    """Return column ``name`` as an array of fixed-size items."""
+    col = df[name]
+    values = col.to_numpy()
+    if values.dtype != object:
+        return values
+    if pd.api.types.infer_dtype(col, skipna=False) == "string":
+        return values.astype(str)
+    raise ValueError(f"column {name!r} of dtype {col.dtype} cannot be shared")
+
+
+def _views(shm: SharedMemory, spec: SharedFrameSpec) -> Dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(spec.length, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        for name, dtype, offset in zip(spec.columns, spec.dtypes, spec.offsets)
+    }
+
+
+class SharedFrame:
+    """Owner of a shared-memory copy of the columns of ``df``.
+
+    Each column is stored contiguously with its own dtype, so attached
+    frames are zero-copy and keep float32 prices, datetime timestamps and
+    text columns as they were loaded.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        arrays = [_column(df, c) for c in df.columns]
+        offsets, size = [], 0
+        for a in arrays:
+            offsets.append(size)
+            size += -(-a.nbytes // ALIGN) * ALIGN
+        self._shm = SharedMemory(create=True, size=max(1, size))
+        self.spec = SharedFrameSpec(
+            self._shm.name,
+            tuple(df.columns),
+            tuple(a.dtype.str for a in arrays),
+            tuple(offsets),
+            len(df),
+        )
+        for view, a in zip(_views(self._shm, self.spec).values(), arrays):
+            view[:] = a
+
+    def close(self) -> None:
+        """Release and unlink the shared block."""
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def attach_frame(spec: SharedFrameSpec) -> Tuple[pd.DataFrame, SharedMemory]:
+    """Return a DataFrame viewing the shared block and the handle keeping it alive."""
+    shm = SharedMemory(name=spec.name)
+    df = pd.DataFrame(_views(shm, spec), copy=False)
+    return df, shm
@@ -0,0 +1,335 @@
+"""Strategy signals as expression graphs over named indicators.
+
+Strategies are written with :func:`col`, :func:`feature`, :func:`param`
+and the usual operators; the result is a graph of :class:`Node` objects
+instead of arrays. :func:`compile_signals` merges the graphs of several
+outputs, so a node shared by many strategies (``rsi`` of ``close``, a
+MACD crossover) exists once, and orders the unique nodes for evaluation.
+
+Indicators are looked up in the dataset's :class:`~.features.FeatureCache`
+under the same ``(indicator, input, *params)`` keys the strategies have
+always used. Subexpressions that depend on no strategy parameter, such as
+``line > signal``, are the same for every trial on a dataset; a memoizing
+program stores them in the cache too, so a tuning trial only recomputes
+the comparisons against its own thresholds.
+
+Graphs compare with ``<``, ``<=``, ``>``, ``>=`` and combine with ``&``,
+``|`` and ``~``. ``==`` compares graphs structurally rather than
+building a node.
+"""
+
+from __future__ import annotations
+
+import functools
+import operator
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .features import FeatureCache, cached
+from .indicators import atr_delta, ema, macd, momentum, rolling_std, rsi, sma, zscore
+
+# Indicator kernels by name; ``feature(name, source, *args)`` calls
+# ``FEATURES[name](*inputs, *args)``.
+FEATURES: Dict[str, Callable[..., Any]] = {
+    "atr_delta": atr_delta,
+    "ema": ema,
+    "macd": macd,
+    "momentum": momentum,
+    "rolling_std": rolling_std,
+    "rsi": rsi,
+    "sma": sma,
+    "zscore": zscore,
+}
+
+# Feature sources that stand for several input columns.
+SOURCES: Dict[str, Tuple[str, ...]] = {"hlc": ("high", "low", "close")}
+
+# First element of the cache keys of memoized subexpressions.
+SIGNAL_KEY = "signal"
+
+_OPS: Dict[str, Callable[..., Any]] = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+    "neg": np.negative,
+    "lt": np.less,
+    "le": np.less_equal,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+    "max": np.maximum,
+    "not": np.logical_not,
+    "and": lambda *xs: functools.reduce(operator.and_, xs),
+    "or": lambda *xs: functools.reduce(operator.or_, xs),
+}
+
+# Nodes whose value changes with the strategy parameters.
+_DYNAMIC = ("param", "confirm")
+
+
+class Node:
+    """One operation of a signal graph; equal nodes compute equal values."""
+
+    __slots__ = ("op", "args", "_hash")
+
+    def __init__(self, op: str, args: Tuple[Any, ...]) -> None:
+        self.op = op
+        self.args = args
+        self._hash = hash((op, args))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Node) or self._hash != other._hash:
+            return False
+        return self.op == other.op and self.args == other.args
+
+    def __repr__(self) -> str:
+        return f"{self.op}{self.args!r}"
+
+    def __add__(self, other: Any) -> "Node":
+        return Node("add", (self, other))
+
+    def __radd__(self, other: Any) -> "Node":
+        return Node("add", (other, self))
+
+    def __sub__(self, other: Any) -> "Node":
+        return Node("sub", (self, other))
+
+    def __rsub__(self, other: Any) -> "Node":
+        return Node("sub", (other, self))
+
+    def __mul__(self, other: Any) -> "Node":
+        return Node("mul", (self, other))
+
+    def __rmul__(self, other: Any) -> "Node":
+        return Node("mul", (other, self))
+
+    def __truediv__(self, other: Any) -> "Node":
+        return Node("div", (self, other))
+
+    def __rtruediv__(self, other: Any) -> "Node":
+        return Node("div", (other, self))
+
+    def __neg__(self) -> "Node":
+        return Node("neg", (self,))
+
+    def __lt__(self, other: Any) -> "Node":
+        return Node("lt", (self, other))
+
+    def __le__(self, other: Any) -> "Node":
+        return Node("le", (self, other))
+
+    def __gt__(self, other: Any) -> "Node":
+        return Node("gt", (self, other))
+
+    def __ge__(self, other: Any) -> "Node":
+        return Node("ge", (self, other))
+
+    def __and__(self, other: Any) -> "Node":
+        return Node("and", (self, other))
+
+    def __rand__(self, other: Any) -> "Node":
+        return Node("and", (other, self))
+
+    def __or__(self, other: Any) -> "Node":
+        return Node("or", (self, other))
+
+    def __ror__(self, other: Any) -> "Node":
+        return Node("or", (other, self))
+
+    def __invert__(self) -> "Node":
+        return Node("not", (self,))
+
+    def __getitem__(self, i: int) -> "Node":
+        return Node("item", (self, i))
+
+
+def col(name: str) -> Node:
+    """Input column ``name`` (``close``, ``high``, ``low``, ``volume``, ``sentiment``)."""
+    return Node("col", (name,))
+
+
+def param(strategy: str, field: str) -> Node:
+    """Field ``field`` of the config passed for ``strategy``."""
+    return Node("param", (strategy, field))
+
+
+def feature(name: str, source: str, *args: Any) -> Node:
+    """Indicator ``name`` of column ``source``; ``args`` may be :func:`param` nodes."""
+    if name not in FEATURES:
+        raise ValueError(f"unknown feature {name!r}")
+    return Node("feature", (name, source) + args)
+
+
+def confirm(mask: Callable[[Any, str], np.ndarray], tf: Any) -> Node:
+    """``mask(frames, tf)`` for a higher-timeframe filter, or ``True`` when ``tf`` is ``None``."""
+    return Node("confirm", (mask, tf))
+
+
+def maximum(a: Any, b: Any) -> Node:
+    """Element-wise maximum of two expressions."""
+    return Node("max", (a, b))
+
+
+class Config:
+    """Stand-in for a strategy config whose fields read as :func:`param` nodes."""
+
+    def __init__(self, strategy: str) -> None:
+        self._strategy = strategy
+
+    def __getattr__(self, field: str) -> Node:
+        if field.startswith("_"):
+            raise AttributeError(field)
+        return param(self._strategy, field)
+
+
+def _is_static(node: Node, static: Dict[Node, bool]) -> bool:
+    return node.op not in _DYNAMIC and all(
+        static[a] for a in node.args if isinstance(a, Node)
+    )
+
+
+def _normalize(node: Node, memo: Dict[Node, Node], static: Dict[Node, bool]) -> Node:
+    """Rebuild ``node`` bottom-up, putting parameter-free terms of ``&``/``|``
+    chains first so they form one memoizable subexpression."""
+    if node in memo:
+        return memo[node]
+    args = tuple(_normalize(a, memo, static) if isinstance(a, Node) else a for a in node.args)
+    if node.op in ("and", "or"):
+        flat: List[Any] = []
+        for a in args:
+            flat.extend(a.args if isinstance(a, Node) and a.op == node.op else (a,))
+        fixed = [a for a in flat if not isinstance(a, Node) or static[a]]
+        moving = [a for a in flat if isinstance(a, Node) and not static[a]]
+        if len(fixed) > 1 and moving:
+            head = Node(node.op, tuple(fixed))
+            static[head] = _is_static(head, static)
+            fixed = [head]
+        args = tuple(fixed + moving)
+    out = Node(node.op, args)
+    static[out] = _is_static(out, static)
+    memo[node] = out
+    return out
+
+
+class SignalProgram:
+    """Unique nodes of a set of signal graphs in evaluation order."""
+
+    def __init__(self, outputs: Mapping[Hashable, Node], memoize: bool = True) -> None:
+        static: Dict[Node, bool] = {}
+        memo: Dict[Node, Node] = {}
+        roots = {name: _normalize(node, memo, static) for name, node in outputs.items()}
+        index: Dict[Node, int] = {}
+        order: List[Node] = []
+
+        def visit(node: Node) -> int:
+            # Post-order walk; ``index`` doubles as the visited set, which
+            # is what merges nodes shared between strategies.
+            if node not in index:
+                for a in node.args:
+                    if isinstance(a, Node):
+                        visit(a)
+                index[node] = len(order)
+                order.append(node)
+            return index[node]
+
+        self.outputs = {name: visit(node) for name, node in roots.items()}
+        self.nodes: Tuple[Node, ...] = tuple(order)
+        self.memoize = memoize
+        self._static = [static[n] for n in order]
+        self._args = [
+            tuple((True, index[a]) if isinstance(a, Node) else (False, a) for a in n.args)
+            for n in order
+        ]
+        # Release intermediate values after their last consumer.
+        last = {i: i for i in range(len(order))}
+        for i, args in enumerate(self._args):
+            for is_node, j in args:
+                if is_node:
+                    last[j] = i
+        keep = set(self.outputs.values())
+        self._release: List[List[int]] = [[] for _ in order]
+        for j, i in last.items():
+            if j not in keep and i != j:
+                self._release[i].append(j)
+
+    def features(self) -> List[Node]:
+        """Distinct indicator nodes; each is evaluated once per call."""
+        return [n for n in self.nodes if n.op == "feature"]
+
+    def evaluate(
+        self,
+        columns: Mapping[str, np.ndarray],
+        params: Mapping[str, Any],
+        cache: Optional[FeatureCache] = None,
+        frames: Any = None,
+    ) -> Dict[Hashable, Any]:
+        """Evaluate every output for ``columns`` and the configs in ``params``.
+
+        ``frames`` is the :class:`~.timeframes.Timeframes` of the full
+        history, needed once a config enables a higher-timeframe filter.
+        """
+        values: List[Any] = [None] * len(self.nodes)
+        for i, node in enumerate(self.nodes):
+            if self.memoize and self._static[i] and node.op in _OPS:
+                values[i] = cached(
+                    cache, (SIGNAL_KEY, node), functools.partial(self._apply, i, values)
+                )
+            else:
+                values[i] = self._node(i, node, values, columns, params, cache, frames)
+            for j in self._release[i]:
+                values[j] = None
+        return {name: values[i] for name, i in self.outputs.items()}
+
+    def _resolve(self, i: int, values: Sequence[Any]) -> List[Any]:
+        return [values[a] if is_node else a for is_node, a in self._args[i]]
+
+    def _apply(self, i: int, values: Sequence[Any]) -> Any:
+        return _OPS[self.nodes[i].op](*self._resolve(i, values))
+
+    def _node(
+        self,
+        i: int,
+        node: Node,
+        values: Sequence[Any],
+        columns: Mapping[str, np.ndarray],
+        params: Mapping[str, Any],
+        cache: Optional[FeatureCache],
+        frames: Any,
+    ) -> Any:
+        if node.op in _OPS:
+            return self._apply(i, values)
+        if node.op == "col":
+            return columns[node.args[0]]
+        if node.op == "param":
+            strategy, field = node.args
+            return getattr(params[strategy], field)
+        if node.op == "item":
+            seq, k = self._resolve(i, values)
+            return seq[k]
+        if node.op == "feature":
+            name, source, *args = self._resolve(i, values)
+            inputs = [columns[c] for c in SOURCES.get(source, (source,))]
+            return cached(cache, (name, source, *args), lambda: FEATURES[name](*inputs, *args))
+        if node.op == "confirm":
+            mask, tf = self._resolve(i, values)
+            if tf is None:
+                return True
+            if frames is None:
+                raise ValueError("higher-timeframe confirmation needs the full frame")
+            return mask(frames, tf)
+        raise ValueError(f"unknown signal op {node.op!r}")
+
+
+def compile_signals(outputs: Mapping[Hashable, Node], memoize: bool = True) -> SignalProgram:
+    """Compile named output graphs into one :class:`SignalProgram`.
+
+    With ``memoize``, parameter-free subexpressions are stored in the
+    feature cache next to the indicators they are computed from.
+    """
+    return SignalProgram(outputs, memoize)
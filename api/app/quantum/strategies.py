@@ -1,11 +1,26 @@
-"""Trading strategies combining price and sentiment signals."""
+"""Trading strategies combining price and sentiment signals.
+
+Each strategy is declared once as a signal graph (see :mod:`.signals`);
+:data:`SIGNALS` compiles all of them into one program that evaluates
+shared indicators once. The per-strategy functions evaluate a single
+graph.
+
+Inputs are 1-D series or ``(symbols, time)`` matrices, which may hold
+ragged histories padded with NaN; the returned entry and exit masks have
+the input's shape and are ``False`` wherever an indicator is undefined.
+"""
 
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
 import numpy as np
 
-from .indicators import rsi, macd, zscore, bollinger, atr
+from .features import FeatureCache
+from .indicators import macd
+from .signals import Config, Node, SignalProgram, col, compile_signals, confirm, feature, maximum
+from .timeframes import Timeframes
 
 
 @dataclass
@@ -16,6 +31,8 @@ class QBX3Config:
     sentiment_buy: float = 0.70
     tp_pct: float = 0.020
     sl_pct: float = 0.010
+    # Higher timeframe (e.g. "15m") whose MACD must be bullish; None disables.
+    confirm_tf: Optional[str] = None
 
 
 @dataclass
@@ -44,47 +61,152 @@ class MomentumStacker7Config:
     rsi_high: float = 60.0
     tp_pct: float = 0.020
     sl_pct: float = 0.010
+    # Higher timeframe (e.g. "1h") whose last bar must have risen; None disables.
+    confirm_tf: Optional[str] = None
 
 
-def quantumboost_x3(close: np.ndarray, volume: np.ndarray, sentiment: np.ndarray, cfg: QBX3Config):
-    """Signal logic for QuantumBoost X3."""
-    r = rsi(close)
-    m_line, m_sig, _ = macd(close)
-    v_ma = np.convolve(volume, np.ones(20) / 20, mode="same")
+def _qbx3(cfg: Any) -> Tuple[Node, Node]:
+    r = feature("rsi", "close", 14)
+    m = feature("macd", "close", 12, 26, 9)
+    volume = col("volume")
     entries = (
         (r < cfg.rsi_buy_low)
-        & (m_line > m_sig)
-        & (volume > v_ma)
-        & (sentiment > cfg.sentiment_buy)
+        & (m[0] > m[1])
+        & (volume > feature("sma", "volume", 20))
+        & (col("sentiment") > cfg.sentiment_buy)
     )
-    exits = (r > cfg.rsi_sell_high) | (m_line < m_sig)
+    exits = (r > cfg.rsi_sell_high) | (m[0] < m[1])
+    return entries, exits
+
+
+def _ssv2(cfg: Any) -> Tuple[Node, Node]:
+    m = feature("macd", "close", 12, 26, 9)
+    sentiment = col("sentiment")
+    sent_gate = maximum(0.75, cfg.sentiment_buy + 0.05)
+    entries = (m[0] > m[1]) & (sentiment > sent_gate) & (feature("zscore", "volume", 20) > 1.5)
+    exits = (sentiment < 0.5) | (m[0] < m[1])
+    return entries, exits
+
+
+def _atra(cfg: Any) -> Tuple[Node, Node]:
+    close = col("close")
+    ma = feature("ema", "close", cfg.bb_n)
+    sd = feature("rolling_std", "close", cfg.bb_n)
+    up = ma + cfg.bb_k * sd
+    lo = ma - cfg.bb_k * sd
+    entries = (close > up) & (feature("atr_delta", "hlc", 14) > cfg.atr_delta)
+    exits = close < lo
+    return entries, exits
+
+
+def _ms7(cfg: Any) -> Tuple[Node, Node]:
+    mom = feature("momentum", "close", 7)
+    r = feature("rsi", "close", 14)
+    entries = (mom > cfg.mom_thresh) & (r >= cfg.rsi_low) & (r <= cfg.rsi_high)
+    exits = (mom < 0.0) | (r > 70.0)
+    return entries, exits
+
+
+def trend_confirmation(frames: Timeframes, tf: str) -> np.ndarray:
+    """Base-bar mask of a bullish MACD (line above signal) on ``tf`` bars."""
+    line, sig, _ = frames.feature(tf, ("macd", "close", 12, 26, 9), lambda b: macd(b.close))
+    return frames.align(tf, line > sig, fill=False)
+
+
+def momentum_confirmation(frames: Timeframes, tf: str) -> np.ndarray:
+    """Base-bar mask of a ``tf`` bar closing above its predecessor."""
+    rising = frames.feature(
+        tf, ("rising", "close"), lambda b: np.diff(b.close, prepend=np.inf) > 0
+    )
+    return frames.align(tf, rising, fill=False)
+
+
+# Signal graph builders in priority order, with the higher-timeframe filter
+# each strategy's ``confirm_tf`` selects.
+GRAPHS: Dict[str, Tuple[Callable[[Any], Tuple[Node, Node]], Optional[Callable[..., np.ndarray]]]] = {
+    "qbx3": (_qbx3, trend_confirmation),
+    "ssv2": (_ssv2, None),
+    "atra": (_atra, None),
+    "ms7": (_ms7, momentum_confirmation),
+}
+
+
+def signal_graphs(confirmations: bool = True) -> Dict[Tuple[str, str], Node]:
+    """Entry and exit graphs keyed by ``(strategy, "entries" | "exits")``."""
+    out = {}
+    for key, (build, mask) in GRAPHS.items():
+        cfg = Config(key)
+        entries, exits = build(cfg)
+        if confirmations and mask is not None:
+            entries = entries & confirm(mask, cfg.confirm_tf)
+        out[key, "entries"], out[key, "exits"] = entries, exits
+    return out
+
+
+# Every strategy in one program; parameter-free subexpressions are cached.
+SIGNALS: SignalProgram = compile_signals(signal_graphs())
+
+# Programs behind the per-strategy functions, which apply ``confirm`` masks
+# themselves and leave the cache to indicators.
+_SINGLE = {
+    key: compile_signals({k: v for k, v in signal_graphs(False).items() if k[0] == key}, False)
+    for key in GRAPHS
+}
+
+
+def _evaluate(
+    key: str,
+    cfg: Any,
+    cache: Optional[FeatureCache],
+    confirm_mask: Optional[np.ndarray],
+    **columns: np.ndarray,
+):
+    masks = _SINGLE[key].evaluate(columns, {key: cfg}, cache)
+    entries, exits = masks[key, "entries"], masks[key, "exits"]
+    if confirm_mask is not None:
+        entries = entries & confirm_mask
     return entries, exits, cfg.tp_pct, cfg.sl_pct
 
 
-def sentimentsurge_v2(close: np.ndarray, volume: np.ndarray, sentiment: np.ndarray, cfg: SSv2Config):
+def quantumboost_x3(
+    close: np.ndarray,
+    volume: np.ndarray,
+    sentiment: np.ndarray,
+    cfg: QBX3Config,
+    cache: Optional[FeatureCache] = None,
+    confirm: Optional[np.ndarray] = None,
+):
+    """Signal logic for QuantumBoost X3; entries also need ``confirm`` if given."""
+    return _evaluate("qbx3", cfg, cache, confirm, close=close, volume=volume, sentiment=sentiment)
+
+
+def sentimentsurge_v2(
+    close: np.ndarray,
+    volume: np.ndarray,
+    sentiment: np.ndarray,
+    cfg: SSv2Config,
+    cache: Optional[FeatureCache] = None,
+):
     """Signal logic for SentimentSurge v2."""
-    m_line, m_sig, _ = macd(close)
-    v_z = zscore(volume, 20)
-    sent_gate = np.maximum(0.75, cfg.sentiment_buy + 0.05)
-    entries = (m_line > m_sig) & (sentiment > sent_gate) & (v_z > 1.5)
-    exits = (sentiment < 0.5) | (m_line < m_sig)
-    return entries, exits, cfg.tp_pct, cfg.sl_pct
+    return _evaluate("ssv2", cfg, cache, None, close=close, volume=volume, sentiment=sentiment)
 
 
-def atr_trend_arb(close: np.ndarray, high: np.ndarray, low: np.ndarray, cfg: ATRTrendArbConfig):
+def atr_trend_arb(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    cfg: ATRTrendArbConfig,
+    cache: Optional[FeatureCache] = None,
+):
     """Signal logic for ATR-based trend arbitrage."""
-    _, up, lo = bollinger(close, cfg.bb_n, cfg.bb_k)
-    a = atr(high, low, close)
-    a_delta = np.concatenate([[0], np.diff(a)]) / np.maximum(1e-9, a)
-    entries = (close > up) & (a_delta > cfg.atr_delta)
-    exits = close < lo
-    return entries, exits, cfg.tp_pct, cfg.sl_pct
+    return _evaluate("atra", cfg, cache, None, close=close, high=high, low=low)
 
 
-def momentum_stacker_7(close: np.ndarray, cfg: MomentumStacker7Config):
-    """Signal logic for MomentumStacker7."""
-    mom = close / np.roll(close, 7) - 1.0
-    r = rsi(close)
-    entries = (mom > cfg.mom_thresh) & (r >= cfg.rsi_low) & (r <= cfg.rsi_high)
-    exits = (mom < 0.0) | (r > 70.0)
-    return entries, exits, cfg.tp_pct, cfg.sl_pct
+def momentum_stacker_7(
+    close: np.ndarray,
+    cfg: MomentumStacker7Config,
+    cache: Optional[FeatureCache] = None,
+    confirm: Optional[np.ndarray] = None,
+):
+    """Signal logic for MomentumStacker7; entries also need ``confirm`` if given."""
+    return _evaluate("ms7", cfg, cache, confirm, close=close)
@@ -0,0 +1,149 @@
+"""Chunked feature computation for histories larger than memory.
+
+:class:`FeatureStream` produces the strategy features for consecutive
+``[a, b)`` bar ranges of full-length (typically memory-mapped) columns.
+EMA-based indicators carry their last value across chunk boundaries;
+windowed indicators re-read a short overlap around the chunk. Rolling
+moments are block-aligned, so their overlap starts on a multiple of the
+window. Every chunk matches the corresponding slice of the in-memory
+features exactly.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from .engine import rolling_vol
+from .features import FeatureCache
+from .indicators import ema, rolling_std, zscore
+from .signals import SIGNAL_KEY
+
+
+def _block_start(a: int, n: int) -> int:
+    """First bar of the ``n``-aligned block holding bar ``a - n + 1``."""
+    return max(0, (a - n + 1) // n * n)
+
+
+class ChunkFeatures(FeatureCache):
+    """Pre-computed features for one chunk.
+
+    Strategies look features up through the usual cache interface; a key
+    without a streaming kernel raises instead of silently computing the
+    indicator over the chunk alone. Signal subexpressions are derived
+    from the chunk's features and are computed on demand.
+    """
+
+    def __init__(self, values: Dict[Hashable, Any]) -> None:
+        super().__init__()
+        self._store.update(values)
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key not in self._store and not (isinstance(key, tuple) and key[0] == SIGNAL_KEY):
+            raise KeyError(f"feature {key!r} has no streaming kernel")
+        return super().get(key, compute)
+
+
+class FeatureStream:
+    """Strategy features over consecutive chunks of full-length columns."""
+
+    def __init__(
+        self,
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        volume: np.ndarray,
+        bb_n: int,
+    ) -> None:
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self.bb_n = bb_n
+        self._carry: Dict[str, float] = {}
+        self._next = 0
+
+    def _ema(self, name: str, x: np.ndarray, n: int) -> np.ndarray:
+        out = ema(x, n, s0=self._carry.get(name))
+        if len(out):
+            self._carry[name] = float(out[-1])
+        return out
+
+    def _floored_volume(self, a: int, b: int) -> np.ndarray:
+        return np.maximum(1.0, self.volume[a:b])
+
+    def chunk(self, a: int, b: int) -> Tuple[Dict[str, np.ndarray], ChunkFeatures]:
+        """Return the column slices and features for bars ``[a, b)``.
+
+        Chunks must be requested in order without gaps.
+        """
+        if a != self._next:
+            raise ValueError(f"expected chunk starting at {self._next}, got {a}")
+        self._next = b
+        n_bars = len(self.close)
+        px = np.array(self.close[a:b])
+        hi = np.array(self.high[a:b])
+        lo = np.array(self.low[a:b])
+        prev = self.close[a - 1] if a else px[0]
+
+        # Returns and realized vol need the 20 bars before the chunk.
+        r0 = max(0, a - 20)
+        px_ext = np.array(self.close[r0:b])
+        ret_ext = np.diff(px_ext, prepend=self.close[r0 - 1] if r0 else px_ext[0]) / px_ext
+        rv = rolling_vol(ret_ext, 20)[a - r0 :]
+
+        vol = self._floored_volume(a, b)
+        z0 = _block_start(a, 20)
+        v_z = zscore(self._floored_volume(z0, b), 20)[a - z0 :]
+        # The volume average is a centred 20-bar window: 10 bars back, 9 ahead.
+        s0, s1 = max(0, a - 10), min(n_bars, b + 9)
+        v_ma = np.convolve(self._floored_volume(s0, s1), np.ones(20) / 20, mode="same")
+        v_ma = v_ma[a - s0 : b - s0]
+
+        d = np.diff(px, prepend=prev)
+        ru = self._ema("rsi_up", np.clip(d, 0, None), 14)
+        rd = self._ema("rsi_dn", np.clip(-d, 0, None), 14)
+        rs = np.divide(ru, rd, out=np.zeros_like(ru), where=rd > 1e-12)
+        r = 100 - (100 / (1 + rs))
+
+        line = self._ema("macd_fast", px, 12) - self._ema("macd_slow", px, 26)
+        signal = self._ema("macd_signal", line, 9)
+
+        n = self.bb_n
+        b0 = _block_start(a, n)
+        ma = self._ema("bb_ma", px, n)
+        sd = rolling_std(np.array(self.close[b0:b]), n)[a - b0 :]
+
+        prev_close = np.concatenate(([prev], px[:-1]))
+        tr = np.maximum(hi - lo, np.maximum(np.abs(hi - prev_close), np.abs(lo - prev_close)))
+        last_atr: Optional[float] = self._carry.get("atr")
+        atr = self._ema("atr", tr, 14)
+        delta = np.diff(atr, prepend=atr[:1] if last_atr is None else last_atr)
+        a_delta = delta / np.maximum(1e-9, atr)
+
+        lag = np.arange(a, b) - 7
+        lag[lag < 0] += n_bars
+        mom = px / self.close[lag] - 1.0
+
+        arrays = {
+            "close": px,
+            "high": hi,
+            "low": lo,
+            "volume": vol,
+            "ret": ret_ext[a - r0 :],
+            "rv": rv,
+        }
+        feats = ChunkFeatures(
+            {
+                ("rsi", "close", 14): r,
+                ("macd", "close", 12, 26, 9): (line, signal, line - signal),
+                ("sma", "volume", 20): v_ma,
+                ("zscore", "volume", 20): v_z,
+                ("ema", "close", n): ma,
+                ("rolling_std", "close", n): sd,
+                ("atr_delta", "hlc", 14): a_delta,
+                ("momentum", "close", 7): mom,
+            }
+        )
+        return arrays, feats
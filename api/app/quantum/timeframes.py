@@ -0,0 +1,140 @@
+"""Higher-timeframe bars built from the base frame.
+
+Bars are grouped into buckets of the target period and aggregated with
+``reduceat`` (first open, max high, min low, last close, summed volume).
+Resampled bars, their indicators and the index that maps them back to the
+base bars live in the frame's :class:`~.features.FeatureCache`.
+
+A higher-timeframe value becomes visible on the base bar that completes
+its bucket. When the data has a gap there, so the bucket cannot be known
+complete yet, it becomes visible on the next base bar instead. The last,
+partial bucket is never visible.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Hashable, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .features import FeatureCache, cached, feature_cache
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_TIMEFRAME = re.compile(r"^(\d+)([smhd])$")
+
+
+def timeframe_seconds(tf: str) -> int:
+    """Length of timeframe ``tf`` (e.g. ``"5m"``, ``"1h"``) in seconds."""
+    match = _TIMEFRAME.match(tf)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"invalid timeframe {tf!r}")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+class Bars(NamedTuple):
+    """Resampled OHLCV; ``end`` is the last base bar of each bucket."""
+
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    end: np.ndarray
+
+
+def bar_seconds(df: pd.DataFrame, base: str) -> np.ndarray:
+    """Start of every base bar in seconds.
+
+    Datetime ``ts`` columns are used as is; numeric ones, like those of
+    synthesised frames, count bars of timeframe ``base``.
+    """
+    step = timeframe_seconds(base)
+    if "ts" not in df:
+        return np.arange(len(df), dtype=np.int64) * step
+    ts = df["ts"].to_numpy()
+    if np.issubdtype(ts.dtype, np.datetime64):
+        return ts.astype("datetime64[s]").view(np.int64)
+    return ts.astype(np.int64) * step
+
+
+def resample(
+    secs: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    period: int,
+) -> Bars:
+    """Aggregate base bars starting at ``secs`` into ``period``-second bars."""
+    if len(secs) == 0:
+        empty = np.empty(0)
+        return Bars(np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty, np.empty(0, np.int64))
+    bucket = secs // period
+    start = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    end = np.append(start[1:], len(secs)) - 1
+    return Bars(
+        bucket[start] * period,
+        np.asarray(open_)[start],
+        np.maximum.reduceat(high, start),
+        np.minimum.reduceat(low, start),
+        np.asarray(close)[end],
+        np.add.reduceat(volume, start),
+        end,
+    )
+
+
+def visible_index(secs: np.ndarray, bars: Bars, period: int, base: int) -> np.ndarray:
+    """Index of the latest completed bar of ``bars`` at every base bar; -1 before the first."""
+    complete = (secs[bars.end] + base) % period == 0
+    visible = np.where(complete, bars.end, bars.end + 1)
+    return np.searchsorted(visible, np.arange(len(secs)), side="right") - 1
+
+
+class Timeframes:
+    """Higher-timeframe bars and features of one loaded frame."""
+
+    def __init__(self, df: pd.DataFrame, base: str = "1m") -> None:
+        self.df = df
+        self.base = base
+        self.cache: FeatureCache = feature_cache(df)
+
+    def _secs(self) -> np.ndarray:
+        return cached(self.cache, ("bar_seconds", self.base), lambda: bar_seconds(self.df, self.base))
+
+    def bars(self, tf: str) -> Bars:
+        """OHLCV bars of timeframe ``tf``."""
+
+        def build() -> Bars:
+            df = self.df
+            cols = (df[c].to_numpy() for c in ("open", "high", "low", "close", "volume"))
+            return resample(self._secs(), *cols, timeframe_seconds(tf))
+
+        return cached(self.cache, ("bars", tf, self.base), build)
+
+    def index(self, tf: str) -> np.ndarray:
+        """Latest visible ``tf`` bar at every base bar (see :func:`visible_index`)."""
+        period = timeframe_seconds(tf)
+        if period % timeframe_seconds(self.base):
+            raise ValueError(f"timeframe {tf!r} is not a multiple of {self.base!r}")
+        return cached(
+            self.cache,
+            ("tf_index", tf, self.base),
+            lambda: visible_index(self._secs(), self.bars(tf), period, timeframe_seconds(self.base)),
+        )
+
+    def feature(self, tf: str, key: Tuple[Hashable, ...], compute: Callable[[Bars], Any]) -> Any:
+        """Cached ``compute(bars)`` on ``tf`` bars, keyed like base features."""
+        return cached(self.cache, ("tf", tf, self.base) + key, lambda: compute(self.bars(tf)))
+
+    def align(self, tf: str, values: np.ndarray, fill: Any = np.nan) -> np.ndarray:
+        """Spread per-``tf``-bar ``values`` over the base bars without look-ahead.
+
+        Base bars before the first visible ``tf`` bar get ``fill``.
+        """
+        idx = self.index(tf)
+        out = np.asarray(values)[np.maximum(idx, 0)] if len(values) else np.empty(len(idx))
+        return np.where(idx >= 0, out, fill)
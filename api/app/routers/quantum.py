@@ -2,20 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-import time
-import uuid
+import shutil
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from ..quantum.backtester import BacktestEngine, FeesConfig, RunConfig, SizingParams, VenueCosts
 from ..quantum.ensemble import MetaGovernor, PromotionGates
 from ..quantum.adaptive import DynamicThresholdsConfig
+from ..quantum.jobs import DONE, FINAL_STATES, Job, JobQueue
+from ..quantum.results import ResultCache, run_key
 
 router = APIRouter()
+jobs = JobQueue()
+results = ResultCache()
+
+# Seconds between checks for new events on an open stream.
+STREAM_POLL = 0.2
 
 
 class BacktestReq(BaseModel):
@@ -32,16 +40,11 @@ class BacktestReq(BaseModel):
     run: RunConfig = RunConfig()
     dyn: DynamicThresholdsConfig = DynamicThresholdsConfig()
     seed: int = 42
+    use_cache: bool = True
 
 
-@router.post("/quantum/backtest")
-async def run_backtest(req: BacktestReq = Body(...)) -> Dict[str, Any]:
-    """Execute a full backtest and return summary results."""
-    stamp = time.strftime("%Y%m%d-%H%M%S")
-    outdir = Path(f"out/{stamp}-{uuid.uuid4().hex[:6]}")
-    outdir.mkdir(parents=True, exist_ok=True)
-
-    engine = BacktestEngine(
+def _engine(req: BacktestReq, outdir: Path) -> BacktestEngine:
+    return BacktestEngine(
         symbol=req.symbol,
         csv_ohlcv_path=req.csv_ohlcv_path,
         csv_sentiment_path=req.csv_sentiment_path,
@@ -53,25 +56,124 @@ async def run_backtest(req: BacktestReq = Body(...)) -> Dict[str, Any]:
         seed=req.seed,
         outdir=outdir,
     )
-    report = engine.run_full()
-
-    gates = PromotionGates(
-        hit_rate=0.58,
-        sharpe_10d=2.2,
-        max_dd_10d=0.025,
-        route_p95_us=300,
-        slip_error_pct=0.10,
-        days=10,
-    )
-    mgov = MetaGovernor(gates=gates)
-    mgov.update_weights(report.get("perf_by_strategy", {}))
 
-    payload = {
+
+def execute_backtest(
+    req: BacktestReq, cache: ResultCache, key: str, emit: Optional[Callable[..., None]] = None
+) -> Dict[str, Any]:
+    """Run a full backtest for ``req`` and store it in ``cache`` under ``key``."""
+    staging = cache.staging(key)
+    engine = _engine(req, staging)
+    try:
+        report = engine.run_full(emit)
+
+        gates = PromotionGates(
+            hit_rate=0.58,
+            sharpe_10d=2.2,
+            max_dd_10d=0.025,
+            route_p95_us=300,
+            slip_error_pct=0.10,
+            days=10,
+        )
+        mgov = MetaGovernor(gates=gates)
+        mgov.update_weights(report.get("perf_by_strategy", {}))
+
+        payload = {
+            "ok": True,
+            "outdir": str(cache.entry(key)),
+            "summary": report.get("summary", {}),
+            "best_params": report.get("best_params", {}),
+            "weights": mgov.weights,
+        }
+        (staging / "report.json").write_text(json.dumps(payload, indent=2))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    # Plots deferred by ``run.background_plots`` go straight into the
+    # published entry; the job process finishes them before it exits.
+    if cache.commit(key, staging):
+        engine.render_plots(cache.entry(key), background=True)
+    else:
+        engine.pending_plots = {}
+    return payload
+
+
+def _job(job_id: str) -> Job:
+    try:
+        return jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown job") from None
+
+
+@router.post("/quantum/backtest", status_code=202)
+async def run_backtest(response: Response, req: BacktestReq = Body(...)) -> Dict[str, Any]:
+    """Queue a full backtest and return its job id.
+
+    An identical earlier run is served from the result cache as an already
+    finished job.
+    """
+    # Fingerprinting reads the input CSVs, so keep it off the event loop.
+    key = await asyncio.to_thread(run_key, _engine(req, Path()), "api")
+    report = results.report(key) if req.use_cache else None
+    if report is not None:
+        job = jobs.add_result(report)
+        response.status_code = 200
+    else:
+        job = jobs.submit(execute_backtest, req, results, key)
+    return {
         "ok": True,
-        "outdir": str(outdir),
-        "summary": report.get("summary", {}),
-        "best_params": report.get("best_params", {}),
-        "weights": mgov.weights,
+        "job_id": job.id,
+        "status": job.status,
+        "cached": report is not None,
+        "outdir": str(results.entry(key)),
     }
-    (outdir / "report.json").write_text(json.dumps(payload, indent=2))
-    return payload
+
+
+@router.get("/quantum/backtest/{job_id}")
+async def backtest_status(job_id: str) -> Dict[str, Any]:
+    """Return the status and progress of a backtest job."""
+    return _job(job_id).info()
+
+
+@router.get("/quantum/backtest/{job_id}/report")
+async def backtest_report(job_id: str) -> Dict[str, Any]:
+    """Return the report of a finished backtest job."""
+    job = _job(job_id)
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return job.result
+
+
+@router.get("/quantum/backtest/{job_id}/events")
+async def backtest_events(job_id: str, request: Request) -> StreamingResponse:
+    """Stream a job's progress events as Server-Sent Events.
+
+    The stream ends after the job's terminal event. Reconnecting clients
+    resume after ``Last-Event-ID``; events older than the job's buffer are
+    not replayed.
+    """
+    job = _job(job_id)
+    last = request.headers.get("last-event-id", "")
+    cursor = int(last) if last.isdigit() else 0
+
+    async def stream() -> AsyncIterator[str]:
+        seq = cursor
+        while True:
+            final = job.status in FINAL_STATES
+            for event in job.events_since(seq):
+                seq = event["seq"]
+                yield f"id: {seq}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            if final or await request.is_disconnected():
+                return
+            await asyncio.sleep(STREAM_POLL)
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.delete("/quantum/backtest/{job_id}")
+async def cancel_backtest(job_id: str) -> Dict[str, Any]:
+    """Cancel a queued or running backtest job."""
+    _job(job_id)
+    return jobs.cancel(job_id).info()
@@ -29,8 +29,8 @@ def garch_forecast(returns: Iterable[float], omega: float, alpha: float, beta: f
     if data.size == 0:
         raise ValueError("returns must not be empty")
 
-    # Initialize variance with sample variance
+    # Initialize variance with sample variance, then unroll the recursion:
+    # var_T = beta**T * var_0 + sum(beta**(T-1-t) * (omega + alpha * r_t**2)).
     var = np.var(data, ddof=1)
-    for r in data:
-        var = omega + alpha * r ** 2 + beta * var
-    return float(var)
+    weights = beta ** np.arange(data.size)[::-1]
+    return float(beta ** data.size * var + omega * weights.sum() + alpha * weights @ data ** 2)
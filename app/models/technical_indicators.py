@@ -12,6 +12,31 @@ def _validate_window(window: int) -> None:
         raise ValueError("window must be positive")
 
 
+def _first_order_filter(inputs: np.ndarray, decay: float) -> np.ndarray:
+    """Evaluate ``y[i] = decay * y[i - 1] + inputs[i]`` without a Python loop.
+
+    Each pass doubles the span of history folded into every element; it
+    stops once the weight of the unfolded history is negligible.
+
+    Args:
+        inputs: Input sequence; ``y[0] = inputs[0]``.
+        decay: Feedback coefficient in ``[0, 1)``.
+
+    Returns:
+        NumPy array of filter outputs with the same length as ``inputs``.
+    """
+
+    out = inputs.copy()
+    weight = np.full_like(out, decay)
+    weight[0] = 0.0
+    span = 1
+    while span < out.size and weight[span:].max() >= np.finfo(float).eps ** 2:
+        out[span:] += weight[span:] * out[:-span]
+        weight[span:] *= weight[:-span]
+        span *= 2
+    return out
+
+
 def sma(prices: Iterable[float], window: int) -> np.ndarray:
     """Return the simple moving average of ``prices`` over ``window``.
 
@@ -46,9 +71,7 @@ def ema(prices: Iterable[float], window: int) -> np.ndarray:
     data = np.asarray(list(prices), dtype=float)
     if data.size < window:
         raise ValueError("prices length must be at least as large as window")
-    ema_values = np.empty_like(data)
     alpha = 2 / (window + 1)
-    ema_values[0] = data[0]
-    for i in range(1, len(data)):
-        ema_values[i] = alpha * data[i] + (1 - alpha) * ema_values[i - 1]
-    return ema_values
+    weighted = alpha * data
+    weighted[0] = data[0]
+    return _first_order_filter(weighted, 1 - alpha)
@@ -2,4 +2,4 @@
 
 from __future__ import annotations
 
-__all__ = ["runner", "selector"]
+__all__ = ["runner", "selector", "store"]
@@ -1,10 +1,38 @@
-"""Run backtests for multiple configs with Monte Carlo simulation."""
+"""Run backtests for multiple configs with Monte Carlo simulation.
+
+Each config is simulated on ``MC_RUNS`` synthetic histories (seeds
+``run.seed`` onwards) or, with a ``scenarios`` section, on block-bootstrap
+resamples of a real OHLCV history::
+
+    scenarios:
+      ohlcv: data/btc_1m.csv
+      sentiment: data/btc_sentiment.csv  # optional
+      method: stationary                 # or moving
+      block: 60                          # (mean) block length in bars
+
+Scenario ``k`` of a bootstrap config is resample ``k`` of seed
+``run.seed``. The runs of a config are split into blocks, and every
+(config, block) pair runs in a worker process, which builds the block's
+paths as one ``(runs, bars)`` matrix and computes its indicators in a
+single pass. Results hold the mean pnl and max drawdown of each
+config, as read by :mod:`evaluation.selector`, and their distributions.
+
+Results are kept in a :class:`~evaluation.store.ResultStore` under a
+fingerprint of everything that determines them, so only new or changed
+configs are simulated.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
 
 import numpy as np
 import yaml
@@ -16,17 +44,24 @@ from api.app.quantum.adaptive import (
     SizingParams,
     VenueCosts,
 )
-from api.app.quantum.backtester import BacktestEngine
+from api.app.quantum.backtester import BacktestEngine, synthetic_paths
+from api.app.quantum.results import code_version, data_fingerprint
+from api.app.quantum.scenarios import COLUMNS, bootstrap_paths
 from api.app.quantum.strategies import (
     ATRTrendArbConfig,
     MomentumStacker7Config,
     QBX3Config,
     SSv2Config,
 )
+from evaluation.store import ResultStore
 
 CONFIG_DIR = Path("config/eval")
 OUT_FILE = Path("out/eval_results.json")
 MC_RUNS = 10
+WORKERS = int(os.getenv("EVAL_WORKERS", str(os.cpu_count() or 1)))
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+Job = Tuple[str, Dict[str, Any], List[int]]
 
 
 def _load_config(path: Path) -> Dict[str, object]:
@@ -42,53 +77,155 @@ def _load_config(path: Path) -> Dict[str, object]:
         "run": run,
         "fees": fees,
         "dyn": dyn,
+        "scenarios": data.get("scenarios"),
     }
 
 
-def _simulate(cfg: Dict[str, object]) -> Dict[str, float]:
-    results: List[Dict[str, float]] = []
-    for i in range(MC_RUNS):
-        seed = cfg["run"].seed + i
-        engine = BacktestEngine(
-            symbol="BTC/USDT",
-            csv_ohlcv_path=None,
-            csv_sentiment_path=None,
-            fees=cfg["fees"],
-            venue_costs=VenueCosts.defaults(),
-            sizing=cfg["sizing"],
-            dyn=cfg["dyn"],
-            run=RunConfig(seed=seed),
-            seed=seed,
-            outdir=Path("out") / f"tmp_{seed}",
-        )
+def _simulate_block(job: Job) -> Tuple[str, Dict[str, np.ndarray]]:
+    """Simulate one block of seeds of a config on a ``(runs, bars)`` matrix."""
+    key, cfg, seeds = job
+    scenarios = cfg.get("scenarios") or {}
+    engine = BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=scenarios.get("ohlcv"),
+        csv_sentiment_path=scenarios.get("sentiment"),
+        fees=cfg["fees"],
+        venue_costs=VenueCosts.defaults(),
+        sizing=cfg["sizing"],
+        dyn=cfg["dyn"],
+        run=replace(cfg["run"], seed=seeds[0]),
+        seed=seeds[0],
+        outdir=Path("out") / f"tmp_{seeds[0]}",
+    )
+    params = {
+        "qbx3": QBX3Config(),
+        "ssv2": SSv2Config(),
+        "atra": ATRTrendArbConfig(),
+        "ms7": MomentumStacker7Config(),
+    }
+    if scenarios:
         df = engine.load_data()
-        params = {
-            "qbx3": QBX3Config(),
-            "ssv2": SSv2Config(),
-            "atra": ATRTrendArbConfig(),
-            "ms7": MomentumStacker7Config(),
+        first = cfg["run"].seed
+        paths = bootstrap_paths(
+            {c: df[c].to_numpy() for c in COLUMNS},
+            len(seeds),
+            block=int(scenarios.get("block", 50)),
+            method=scenarios.get("method", "stationary"),
+            seed=first,
+            start=seeds[0] - first,
+        )
+    else:
+        paths = synthetic_paths(seeds)
+    metrics = engine.simulate_paths(paths, params)
+    return key, {"pnl": metrics["pnl"], "max_dd": metrics["max_dd"]}
+
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+    stats = {"mean": float(np.mean(values)), "std": float(np.std(values))}
+    for q, v in zip(QUANTILES, np.quantile(values, QUANTILES)):
+        stats[f"q{round(q * 100):02d}"] = float(v)
+    return stats
+
+
+def _jobs(configs: Mapping[str, Dict[str, Any]], runs: int, workers: int) -> List[Job]:
+    """Split each config's seeds so that every worker gets a block."""
+    blocks = max(1, min(runs, -(-workers // max(1, len(configs)))))
+    jobs = []
+    for key, cfg in configs.items():
+        seeds = np.arange(runs) + cfg["run"].seed
+        jobs += [(key, cfg, block.tolist()) for block in np.array_split(seeds, blocks)]
+    return jobs
+
+
+def evaluate(
+    configs: Mapping[str, Dict[str, Any]], runs: int = MC_RUNS, workers: int = WORKERS
+) -> Dict[str, Dict[str, Any]]:
+    """Monte Carlo results of ``configs`` keyed like ``configs``.
+
+    Each result has the config name, the mean ``pnl`` and ``max_dd`` over
+    ``runs`` seeds, and their mean, std and :data:`QUANTILES` under
+    ``distribution``.
+    """
+    jobs = _jobs(configs, runs, workers)
+    workers = min(len(jobs), workers)
+    if workers <= 1:
+        done = [_simulate_block(job) for job in jobs]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+            done = list(pool.map(_simulate_block, jobs))
+    parts: Dict[str, List[Dict[str, np.ndarray]]] = {key: [] for key in configs}
+    for key, metrics in done:
+        parts[key].append(metrics)
+    results = {}
+    for key, cfg in configs.items():
+        pnl = np.concatenate([m["pnl"] for m in parts[key]])
+        dd = np.concatenate([m["max_dd"] for m in parts[key]])
+        results[key] = {
+            "name": cfg["name"],
+            "pnl": float(np.mean(pnl)),
+            "max_dd": float(np.mean(dd)),
+            "runs": len(pnl),
+            "distribution": {"pnl": _distribution(pnl), "max_dd": _distribution(dd)},
         }
-        res = engine.simulate(df, params)
-        results.append({"pnl": res.pnl, "max_dd": res.max_dd})
-    pnl = float(np.mean([r["pnl"] for r in results]))
-    dd = float(np.mean([r["max_dd"] for r in results]))
-    return {"pnl": pnl, "max_dd": dd}
+    return results
+
+
+def _config_paths(paths: Sequence[Path]) -> Dict[str, Dict[str, Any]]:
+    return {path.as_posix(): _load_config(path) for path in paths}
+
+
+def fingerprint(path: Path, cfg: Dict[str, Any], runs: int = MC_RUNS) -> str:
+    """Hash of the inputs that determine the result of config ``path``.
+
+    Covers the YAML bytes, the seed range, the number of runs, the
+    contents of scenario input CSVs and the sources of the backtester
+    package and of this runner.
+    """
+    scenarios = cfg.get("scenarios") or {}
+    spec = {
+        "data": [data_fingerprint(scenarios.get(k)) for k in ("ohlcv", "sentiment")],
+        "config": hashlib.sha256(path.read_bytes()).hexdigest(),
+        "seeds": [cfg["run"].seed, cfg["run"].seed + runs],
+        "runs": runs,
+        "code": code_version(),
+        "runner": hashlib.sha256(Path(__file__).read_bytes()).hexdigest(),
+    }
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def evaluate_incremental(
+    paths: Sequence[Path],
+    store: ResultStore,
+    runs: int = MC_RUNS,
+    workers: int = WORKERS,
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Evaluate the configs at ``paths``, reusing results in ``store``.
+
+    Returns the results of every config and the keys of those that were
+    simulated. The store's index is updated to exactly these configs.
+    """
+    configs = _config_paths(paths)
+    prints = {key: fingerprint(Path(key), cfg, runs) for key, cfg in configs.items()}
+    results = {key: store.get(fp) for key, fp in prints.items()}
+    stale = {key: configs[key] for key, result in results.items() if result is None}
+    if stale:
+        for key, result in evaluate(stale, runs, workers).items():
+            store.put(prints[key], result)
+            results[key] = result
+    store.set_index(prints)
+    return results, list(stale)
 
 
 def main() -> None:
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    all_results = {}
-    for path in sorted(CONFIG_DIR.glob("*.yaml")):
-        cfg = _load_config(path)
-        stats = _simulate(cfg)
-        all_results[path.as_posix()] = {
-            "name": cfg["name"],
-            "pnl": stats["pnl"],
-            "max_dd": stats["max_dd"],
-        }
+    paths = sorted(CONFIG_DIR.glob("*.yaml"))
+    all_results, simulated = evaluate_incremental(paths, ResultStore())
     OUT_FILE.write_text(json.dumps(all_results, indent=2))
     print(json.dumps(all_results, indent=2))
+    print(f"simulated {len(simulated)} of {len(paths)} configs", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -2,11 +2,9 @@
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from typing import Dict
 
-RESULT_FILE = Path("out/eval_results.json")
+from evaluation.store import ResultStore
 
 
 def choose_config(results: Dict[str, Dict[str, float]]) -> str:
@@ -17,7 +15,10 @@ def choose_config(results: Dict[str, Dict[str, float]]) -> str:
 
 
 def main() -> None:
-    data = json.loads(RESULT_FILE.read_text())
+    store = ResultStore()
+    data = store.results()
+    if not data:
+        raise SystemExit(f"No evaluation results in {store.root}; run evaluation/runner.py first.")
     best_path = choose_config(data)
     best = data[best_path]
     report_lines = ["Config evaluation results:"]
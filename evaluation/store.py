@@ -0,0 +1,67 @@
+"""Local store of per-config evaluation results.
+
+Results are kept in one JSON file per config fingerprint, so an unchanged
+config is never simulated twice. ``index.json`` maps each config of the
+latest evaluation to its fingerprint; the selector reads those results.
+Results the index no longer references are deleted when it is written.
+Files are written to a temporary name and renamed into place.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+STORE_DIR = Path(os.getenv("EVAL_STORE_DIR", "out/eval_store"))
+
+
+def _write_json(path: Path, data: Any) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp, path)
+
+
+class ResultStore:
+    """Evaluation results under ``root`` keyed by config fingerprint."""
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = Path(root or STORE_DIR)
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the result stored for ``fingerprint``, if any."""
+        try:
+            return json.loads((self.root / f"{fingerprint}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, fingerprint: str, result: Mapping[str, Any]) -> None:
+        """Store ``result`` under ``fingerprint``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_json(self.root / f"{fingerprint}.json", dict(result))
+
+    def set_index(self, fingerprints: Mapping[str, str]) -> None:
+        """Record the fingerprint of every config of the latest evaluation
+        and delete the results of any other fingerprint."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_json(self.root / "index.json", dict(fingerprints))
+        keep = set(fingerprints.values()) | {"index"}
+        for path in self.root.glob("*.json"):
+            if path.stem not in keep:
+                path.unlink(missing_ok=True)
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """Results of the latest evaluation keyed by config path."""
+        try:
+            index = json.loads((self.root / "index.json").read_text())
+        except (OSError, ValueError):
+            return {}
+        out = {}
+        for path, fingerprint in index.items():
+            result = self.get(fingerprint)
+            if result is not None:
+                out[path] = result
+        return out
@@ -5,12 +5,31 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 import time
 import uuid
 from pathlib import Path
+from typing import Tuple
 
 from api.app.quantum.adaptive import DynamicThresholdsConfig, SizingParams
 from api.app.quantum.backtester import BacktestEngine, FeesConfig, RunConfig, VenueCosts
+from api.app.quantum.portfolio import SymbolSource, run_portfolio
+from api.app.quantum.results import ResultCache, run_key
+
+
+def _symbol_source(spec: str) -> SymbolSource:
+    """Parse ``SYMBOL[=OHLCV[,SENTIMENT]]`` into a portfolio source."""
+    symbol, _, paths = spec.partition("=")
+    ohlcv, _, sentiment = paths.partition(",")
+    return SymbolSource(symbol, ohlcv or None, sentiment or None)
+
+
+def _confirmation(spec: str) -> Tuple[str, str]:
+    """Parse ``STRATEGY=TIMEFRAME`` into a higher-timeframe confirmation."""
+    key, sep, tf = spec.partition("=")
+    if not sep or not key or not tf:
+        raise argparse.ArgumentTypeError(f"expected STRATEGY=TIMEFRAME, got {spec!r}")
+    return key, tf
 
 
 def main() -> None:
@@ -18,6 +37,39 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Run ANGEL.AI quantum backtests")
     parser.add_argument("--ohlcv", dest="ohlcv", help="OHLCV CSV path", default=None)
     parser.add_argument("--sentiment", dest="sentiment", help="Sentiment CSV path", default=None)
+    parser.add_argument(
+        "--workers", dest="workers", type=int, default=1, help="Parallel tuning processes"
+    )
+    parser.add_argument(
+        "--pruner",
+        dest="pruner",
+        choices=("none", "median", "halving"),
+        default="median",
+        help="Optuna pruner for early-stopping losing trials",
+    )
+    parser.add_argument(
+        "--confirm-tf",
+        dest="confirm_tf",
+        action="append",
+        type=_confirmation,
+        default=[],
+        metavar="STRATEGY=TIMEFRAME",
+        help="Confirm a strategy's entries on a higher timeframe, e.g. qbx3=15m or ms7=1h",
+    )
+    parser.add_argument(
+        "--portfolio",
+        dest="portfolio",
+        nargs="+",
+        type=_symbol_source,
+        metavar="SYMBOL[=OHLCV[,SENTIMENT]]",
+        help="Backtest these symbols as one portfolio with default strategy configs",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Re-run even if an identical run is in the result cache",
+    )
     args = parser.parse_args()
 
     stamp = time.strftime("%Y%m%d-%H%M%S")
@@ -30,14 +82,30 @@ def main() -> None:
         venue_costs=VenueCosts.defaults(),
         sizing=SizingParams(),
         dyn=DynamicThresholdsConfig(),
-        run=RunConfig(),
+        run=RunConfig(workers=args.workers, pruner=args.pruner, confirm_tf=dict(args.confirm_tf)),
         seed=42,
         outdir=outdir,
     )
-    report = engine.run_full()
-    outdir.mkdir(parents=True, exist_ok=True)
-    (outdir / "report.json").write_text(json.dumps(report, indent=2))
+    if args.portfolio:
+        report = run_portfolio(engine, args.portfolio).report()
+        outdir.mkdir(parents=True, exist_ok=True)
+        (outdir / "report.json").write_text(json.dumps(report, indent=2))
+        print(json.dumps(report, indent=2))
+        return
+
+    cache = ResultCache()
+    key = run_key(engine, "cli")
+    report = cache.report(key) if args.use_cache else None
+    if report is None:
+        engine.outdir = cache.staging(key)
+        report = engine.run_full()
+        (engine.outdir / "report.json").write_text(json.dumps(report, indent=2))
+        if cache.commit(key, engine.outdir):
+            engine.render_plots(cache.entry(key), background=True)
+        else:
+            engine.pending_plots = {}
     print(json.dumps(report, indent=2))
+    print(f"outputs: {cache.entry(key)}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,24 @@
-"""Tests for evaluation selector."""
+"""Tests for the evaluation runner and selector."""
 
 from __future__ import annotations
 
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.app.quantum import datacache
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import CONFIG_TYPES, BacktestEngine
+from evaluation import runner, selector
+from evaluation import store as store_module
 from evaluation.selector import choose_config
+from evaluation.store import ResultStore
 
 
 def test_choose_config_picks_highest_pnl_lowest_dd() -> None:
@@ -12,3 +28,86 @@ def test_choose_config_picks_highest_pnl_lowest_dd() -> None:
         "c": {"pnl": 0.6, "max_dd": 0.15},
     }
     assert choose_config(results) == "c"
+
+
+def test_runner_distributions_match_per_seed_backtests(tmp_path) -> None:
+    path = tmp_path / "cfg.yaml"
+    path.write_text("name: cfg\nsizing:\n  base_risk: 0.02\nrun:\n  seed: 7\n")
+    configs = runner._config_paths([path])
+    serial = runner.evaluate(configs, runs=4, workers=1)
+    parallel = runner.evaluate(configs, runs=4, workers=2)
+    assert serial == parallel
+    stats = serial[path.as_posix()]
+    pnl = []
+    for seed in range(7, 11):
+        engine = BacktestEngine(
+            symbol="BTC/USDT",
+            csv_ohlcv_path=None,
+            csv_sentiment_path=None,
+            fees=FeesConfig(),
+            venue_costs=VenueCosts.defaults(),
+            sizing=SizingParams(base_risk=0.02),
+            dyn=DynamicThresholdsConfig(),
+            run=RunConfig(seed=seed),
+            seed=seed,
+            outdir=tmp_path,
+        )
+        params = {key: cls() for key, cls in CONFIG_TYPES.items()}
+        pnl.append(engine.simulate(engine.load_data(), params).pnl)
+    assert stats["runs"] == 4
+    assert stats["pnl"] == np.mean(pnl)
+    dist = stats["distribution"]["pnl"]
+    assert dist["q05"] <= dist["q50"] <= dist["q95"]
+    assert np.isclose(dist["std"], np.std(pnl))
+
+
+def test_runner_only_simulates_changed_configs(tmp_path) -> None:
+    paths = []
+    for name, seed in (("a", 1), ("b", 2)):
+        path = tmp_path / f"{name}.yaml"
+        path.write_text(f"name: {name}\nrun:\n  seed: {seed}\n")
+        paths.append(path)
+    store = ResultStore(tmp_path / "store")
+    first, simulated = runner.evaluate_incremental(paths, store, runs=2, workers=1)
+    assert len(simulated) == 2
+    again, simulated = runner.evaluate_incremental(paths, store, runs=2, workers=1)
+    assert simulated == [] and again == first
+    paths[1].write_text("name: b\nsizing:\n  base_risk: 0.03\nrun:\n  seed: 2\n")
+    _, simulated = runner.evaluate_incremental(paths, store, runs=2, workers=1)
+    assert simulated == [paths[1].as_posix()]
+    _, simulated = runner.evaluate_incremental(paths, store, runs=3, workers=1)
+    assert len(simulated) == 2
+    assert set(store.results()) == {p.as_posix() for p in paths}
+    # Results of superseded fingerprints are removed with the old index.
+    assert len(list(store.root.glob("*.json"))) == len(paths) + 1
+
+
+def test_selector_requires_an_evaluation(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(store_module, "STORE_DIR", tmp_path / "missing")
+    with pytest.raises(SystemExit, match="run evaluation/runner.py first"):
+        selector.main()
+
+
+def test_runner_bootstraps_scenarios_from_history(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("QUANTUM_DATA_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setattr(datacache, "CACHE_DIR", tmp_path / "cache")
+    rng = np.random.default_rng(8)
+    close = 100 * np.exp(rng.normal(0, 0.004, 3000).cumsum())
+    pd.DataFrame(
+        {
+            "ts": np.arange(3000),
+            "open": close,
+            "high": close * 1.003,
+            "low": close * 0.997,
+            "close": close,
+            "volume": rng.uniform(5e4, 1.5e5, 3000),
+        }
+    ).to_csv(tmp_path / "ohlcv.csv", index=False)
+    path = tmp_path / "boot.yaml"
+    path.write_text(
+        f"name: boot\nrun:\n  seed: 3\nscenarios:\n  ohlcv: {tmp_path / 'ohlcv.csv'}\n  block: 40\n"
+    )
+    configs = runner._config_paths([path])
+    serial = runner.evaluate(configs, runs=4, workers=1)
+    assert serial == runner.evaluate(configs, runs=4, workers=3)
+    assert serial[path.as_posix()]["distribution"]["pnl"]["std"] > 0
@@ -1,6 +1,9 @@
 import numpy as np
 
-from app.models.monte_carlo import kelly_fraction, monte_carlo_var
+import pytest
+
+from app.models import monte_carlo
+from app.models.monte_carlo import kelly_fraction, monte_carlo_var, simulate_var
 
 
 def test_monte_carlo_var():
@@ -13,3 +16,74 @@ def test_monte_carlo_var():
 def test_kelly_fraction():
     frac = kelly_fraction(0.01, 0.04)
     assert 0 < frac < 1
+
+
+def _normal_var(returns, horizon):
+    # 1.6448536 is the 95% standard normal quantile.
+    return -(horizon * returns.mean() - 1.6448536 * np.sqrt(horizon) * returns.std(ddof=1))
+
+
+def test_simulate_var_matches_normal_quantile():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0005, 0.01, 500)
+    exact = _normal_var(returns, 20)
+    for sampling in ("plain", "antithetic", "sobol"):
+        res = simulate_var(returns, 20, 50_000, sampling=sampling, rng=np.random.default_rng(1))
+        assert res.var == pytest.approx(exact, rel=0.02)
+        assert res.es > res.var
+        assert res.var_ci[0] <= res.var <= res.var_ci[1]
+        assert res.es_ci[0] <= res.es <= res.es_ci[1]
+
+
+def test_sobol_reduces_error():
+    rng = np.random.default_rng(2)
+    returns = rng.normal(0.0, 0.01, 500)
+    exact = _normal_var(returns, 10)
+
+    def spread(sampling):
+        est = [
+            simulate_var(returns, 10, 4096, sampling=sampling, rng=np.random.default_rng(s)).var
+            for s in range(20)
+        ]
+        return np.sqrt(np.mean((np.array(est) - exact) ** 2))
+
+    assert spread("sobol") < spread("plain") / 3
+
+
+def test_chunked_bootstrap_keeps_exact_quantile(monkeypatch):
+    rng = np.random.default_rng(3)
+    returns = rng.standard_t(4, 300) * 0.01
+    full = simulate_var(returns, 30, 2000, model="bootstrap", rng=np.random.default_rng(4))
+    monkeypatch.setattr(monte_carlo, "CHUNK_CELLS", 7 * 30)
+    chunked = simulate_var(returns, 30, 2000, model="bootstrap", rng=np.random.default_rng(4))
+    assert chunked.var == pytest.approx(full.var) and chunked.es == pytest.approx(full.es)
+    assert full.var > 0 and full.es >= full.var
+
+
+def test_simulate_var_rejects_bad_input():
+    with pytest.raises(ValueError):
+        simulate_var([0.01], 5, 100, model="bootstrap", sampling="sobol")
+    with pytest.raises(ValueError):
+        simulate_var([], 5, 100)
+
+
+def test_interval_uses_t_quantile_of_batches():
+    rng = np.random.default_rng(5)
+    returns = rng.normal(0.0, 0.01, 500)
+    res = simulate_var(returns, 5, 8000, rng=np.random.default_rng(6))
+    assert res.batches == monte_carlo.MIN_BATCHES
+    assert monte_carlo._t_ppf(0.975, 7) == pytest.approx(2.3646, abs=1e-3)
+    half = (res.var_ci[1] - res.var_ci[0]) / 2
+    ref = simulate_var(returns, 5, 8000, confidence=0.5, rng=np.random.default_rng(6))
+    # The t(7) quantile ratio between 95% and 50% intervals.
+    assert half / ((ref.var_ci[1] - ref.var_ci[0]) / 2) == pytest.approx(2.3646 / 0.7111, rel=1e-2)
+
+
+def test_large_tail_switches_to_batch_means(monkeypatch):
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0.0, 0.01, 500)
+    exact = _normal_var(returns, 10)
+    monkeypatch.setattr(monte_carlo, "TAIL_LIMIT", 100)
+    res = simulate_var(returns, 10, 40_000, rng=np.random.default_rng(8))
+    assert res.var == pytest.approx(exact, rel=0.03)
+    assert res.var_ci[0] <= res.var <= res.var_ci[1] and res.es > res.var
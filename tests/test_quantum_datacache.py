@@ -0,0 +1,97 @@
+"""Tests for the columnar CSV cache."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from api.app.quantum import datacache
+from api.app.quantum.datacache import cached_meta, load_columns
+
+
+def _write_csv(path, n: int = 50) -> None:
+    pd.DataFrame(
+        {
+            "TS": pd.date_range("2024-01-01", periods=n, freq="min").astype(str),
+            "Close": np.linspace(100, 110, n),
+            "Volume": np.arange(n),
+        }
+    ).to_csv(path, index=False)
+
+
+def test_load_columns_memory_maps_lowercased_columns(tmp_path) -> None:
+    _write_csv(tmp_path / "ohlcv.csv")
+    src = pd.read_csv(tmp_path / "ohlcv.csv")
+    df = load_columns(str(tmp_path / "ohlcv.csv"), tmp_path / "cache")
+    assert list(df.columns) == ["ts", "close", "volume"]
+    assert np.array_equal(df["close"].to_numpy(), src["Close"].to_numpy())
+    assert df["ts"].iloc[1] == pd.Timestamp("2024-01-01 00:01:00")
+    base = df["close"].to_numpy()
+    while not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+
+
+def test_cache_reused_until_source_changes(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "ohlcv.csv"
+    _write_csv(path)
+    first = cached_meta(str(path), tmp_path / "cache")
+    builds = []
+    monkeypatch.setattr(datacache, "_file_digest", lambda p: builds.append(p) or "x")
+    assert cached_meta(str(path), tmp_path / "cache") == first
+    assert builds == []
+    _write_csv(path, n=60)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert cached_meta(str(path), tmp_path / "cache")["rows"] == 60
+    assert len(builds) == 1
+
+
+def test_build_reuses_entry_published_concurrently(tmp_path) -> None:
+    path = tmp_path / "ohlcv.csv"
+    _write_csv(path)
+    cache = tmp_path / "cache"
+    entry = datacache._entry_dir(path, cache)
+    # A second builder finishing after the first keeps the published entry.
+    first = datacache._build(path, entry)
+    mapped = load_columns(str(path), cache)["close"].to_numpy()
+    assert datacache._build(path, entry) == first
+    assert np.array_equal(load_columns(str(path), cache)["close"].to_numpy(), mapped)
+    assert [p.name for p in cache.iterdir()] == [entry.name]
+
+
+def test_verify_rebuilds_when_content_changes_under_same_stat(tmp_path) -> None:
+    path = tmp_path / "ohlcv.csv"
+    _write_csv(path)
+    st = path.stat()
+    first = cached_meta(str(path), tmp_path / "cache")
+    path.write_text(path.read_text().replace("100.0", "999.0", 1))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert cached_meta(str(path), tmp_path / "cache") == first
+    rebuilt = cached_meta(str(path), tmp_path / "cache", verify=True)
+    assert rebuilt["sha256"] != first["sha256"]
+    assert load_columns(str(path), tmp_path / "cache")["close"].iloc[0] == 999.0
+
+
+def test_chunked_build_matches_whole_file_parse(tmp_path) -> None:
+    path = tmp_path / "mixed.csv"
+    n = 30
+    pd.DataFrame(
+        {
+            "TS": pd.date_range("2024-01-01", periods=n, freq="min").astype(str),
+            "Close": np.linspace(100, 110, n),
+            "Count": [float("nan") if i == 25 else i for i in range(n)],
+            "Venue": [None if i < 10 else f"venue-{i}" for i in range(n)],
+            "Code": [str(i) if i < 20 else f"x{i}" for i in range(n)],
+        }
+    ).to_csv(path, index=False)
+    entry = tmp_path / "cache" / "mixed"
+    meta = datacache._build(path, entry, chunk_rows=10)
+    whole = pd.read_csv(path)
+    assert meta["rows"] == n
+    for i, name in enumerate(whole.columns):
+        col = np.load(entry / meta["columns"][name.lower()])
+        ref = datacache._column_array(whole[name])
+        assert col.dtype == ref.dtype, name
+        assert np.array_equal(col, ref, equal_nan=col.dtype.kind == "f"), name
+    assert sorted(p.name for p in entry.iterdir()) == [f"{i}.npy" for i in range(5)] + ["meta.json"]
@@ -0,0 +1,197 @@
+"""Tests for the array-based position engine."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from api.app.quantum import datacache
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+    adaptive_fraction,
+)
+from api.app.quantum.backtester import BacktestEngine
+from api.app.quantum.engine import (
+    TRADE_DTYPE,
+    PositionState,
+    TradeLedger,
+    resolve_signals,
+    rolling_vol,
+    run_positions,
+)
+from api.app.quantum.indicators import realized_vol
+from api.app.quantum.strategies import (
+    ATRTrendArbConfig,
+    MomentumStacker7Config,
+    QBX3Config,
+    SSv2Config,
+    atr_trend_arb,
+    momentum_stacker_7,
+    quantumboost_x3,
+    sentimentsurge_v2,
+)
+
+
+def _engine(seed: int = 42, precision: str = "float64") -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(seed=seed, precision=precision),
+        seed=seed,
+        outdir=Path("out") / "test",
+    )
+
+
+def _params(rsi_low: float = 30.0) -> dict:
+    return {
+        "qbx3": QBX3Config(rsi_buy_low=rsi_low, sentiment_buy=0.6),
+        "ssv2": SSv2Config(),
+        "atra": ATRTrendArbConfig(atr_delta=0.05),
+        "ms7": MomentumStacker7Config(mom_thresh=0.005),
+    }
+
+
+def _reference_loop(engine: BacktestEngine, df, params):
+    """Per-bar loop the engine replaced, kept as the equivalence oracle."""
+    px = df["close"].to_numpy()
+    hi = df["high"].to_numpy()
+    lo = df["low"].to_numpy()
+    vol = np.maximum(1.0, df["volume"].to_numpy())
+    sent = df["sentiment"].to_numpy()
+    ret = np.diff(px, prepend=px[0]) / px
+    e1, _, tp1, sl1 = quantumboost_x3(px, vol, sent, params["qbx3"])
+    e2, _, tp2, sl2 = sentimentsurge_v2(px, vol, sent, params["ssv2"])
+    e3, _, tp3, sl3 = atr_trend_arb(px, hi, lo, params["atra"])
+    e4, _, tp4, sl4 = momentum_stacker_7(px, params["ms7"])
+    entries = [(e1, tp1, sl1), (e2, tp2, sl2), (e3, tp3, sl3), (e4, tp4, sl4)]
+    cycle = ["binance", "bybit", "coinbase", "kraken"]
+    equity = np.ones_like(px)
+    peak, dd, trades, wins = 1.0, 0.0, 0, 0
+    for i in range(1, len(px)):
+        frac = adaptive_fraction(ret[:i], dd, engine.sizing)
+        hit = next(((tp, sl) for mask, tp, sl in entries if mask[i]), None)
+        if hit:
+            tp, sl = hit
+            r = (px[i] - px[i - 1]) / px[i - 1]
+            fee = engine._tx_cost(cycle[trades % 4]) + engine.fees.slippage_bp / 1e4
+            pnl = (tp if r > tp else (-sl if r < -sl else r)) - fee
+            equity[i] = equity[i - 1] * (1 + frac * pnl)
+            trades += 1
+            wins += 1 if pnl > 0 else 0
+        else:
+            equity[i] = equity[i - 1]
+        peak = max(peak, equity[i])
+        dd = max(dd, (peak - equity[i]) / peak)
+    return equity, trades, wins
+
+
+def test_resolve_signals_priority() -> None:
+    a = np.array([1, 1, 0, 0, 0], dtype=bool)
+    b = np.array([1, 1, 1, 0, 0], dtype=bool)
+    c = np.array([0, 0, 1, 0, 1], dtype=bool)
+    assert resolve_signals((a, b, c)).tolist() == [0, 1, 2, 0, 3]
+
+
+def test_float32_run_tracks_float64() -> None:
+    engine = _engine(precision="float32")
+    df = engine.load_data()
+    assert df["close"].dtype == np.float32
+    check = engine.precision_check(_params())
+    assert check["signal_agreement"] > 0.99
+    assert check["equity_rel_error"] < 1e-2
+    assert check["feature_bytes_ratio"] < 0.6
+
+
+def test_rolling_vol_matches_slices() -> None:
+    ret = np.random.default_rng(0).normal(0, 0.01, 200)
+    rv = rolling_vol(ret, 20)
+    assert all(rv[i] == realized_vol(ret[:i], 20) for i in range(1, 200))
+
+
+def test_simulate_matches_reference_loop() -> None:
+    for seed, rsi_low in ((42, 30.0), (7, 40.0)):
+        engine = _engine(seed)
+        df = engine.load_data()
+        params = _params(rsi_low)
+        res = engine.simulate(df, params)
+        equity, trades, wins = _reference_loop(engine, df, params)
+        assert trades > 0
+        assert (res.trades, res.wins) == (trades, wins)
+        assert np.array_equal(res.equity_curve, equity)
+
+
+def test_simulate_matches_reference_loop_in_high_volatility(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(datacache, "CACHE_DIR", tmp_path / "cache")
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, 5000)))
+    pd.DataFrame(
+        {
+            "ts": np.arange(5000),
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": 1e5 + rng.normal(0, 2e4, 5000),
+        }
+    ).to_csv(tmp_path / "ohlcv.csv", index=False)
+    engine = _engine()
+    engine.csv = str(tmp_path / "ohlcv.csv")
+    df = engine.load_data()
+    params = _params()
+    res = engine.simulate(df, params)
+    equity, trades, wins = _reference_loop(engine, df, params)
+    assert np.median(res.ledger["raw"] ** 2) ** 0.5 > 0.02
+    assert (res.trades, res.wins) == (trades, wins)
+    assert np.array_equal(res.equity_curve, equity)
+
+
+def test_segmented_positions_match_full_run() -> None:
+    rng = np.random.default_rng(1)
+    close = 100 + rng.normal(0, 0.5, 3000).cumsum() * 0.1
+    ret = np.diff(close, prepend=close[0]) / close
+    rv = rolling_vol(ret, 20)
+    signal = resolve_signals([rng.random(3000) < 0.1 for _ in range(4)])
+    args = (close, rv, signal, np.full(5, 0.02), np.full(5, 0.01), np.array([1e-3, 2e-3]))
+    full, final = run_positions(*args, SizingParams())
+    parts, state = [], PositionState()
+    for start, stop in ((0, 700), (700, 701), (701, 2400), (2400, 3000)):
+        seg, state = run_positions(*args, SizingParams(), state, start, stop)
+        parts.append(seg)
+    assert np.array_equal(np.concatenate(parts), full)
+    assert state == final
+    assert final.max_dd == float(np.max(1 - full / np.maximum.accumulate(full)))
+
+
+def test_simulate_records_trade_ledger() -> None:
+    engine = _engine()
+    res = engine.simulate(engine.load_data(), _params())
+    led = res.ledger
+    assert len(led) == res.trades
+    assert np.count_nonzero(led["pnl"] > 0) == res.wins
+    assert np.all(np.diff(led["bar"]) > 0) and set(np.unique(led["strategy"])) <= {1, 2, 3, 4}
+    assert np.array_equal(led["venue"], np.arange(len(led)) % 4)
+    assert np.array_equal(led["fee"], engine._fee_cycle()[led["venue"]])
+    growth = np.cumprod(1 + led["fraction"] * led["pnl"])
+    assert growth[-1] == res.equity_curve[-1]
+    assert np.array_equal(growth, res.equity_curve[led["bar"]])
+
+
+def test_trade_ledger_grows() -> None:
+    ledger = TradeLedger(capacity=2)
+    for start in (0, 3):
+        bars = np.arange(start, start + 3)
+        ones = np.ones(3)
+        ledger.append(
+            bar=bars, strategy=bars % 4 + 1, venue=bars % 4, fraction=ones, raw=ones, fee=ones, pnl=ones
+        )
+    records = ledger.records
+    assert records.dtype == TRADE_DTYPE and records["bar"].tolist() == list(range(6))
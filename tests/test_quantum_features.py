@@ -0,0 +1,85 @@
+"""Tests for the per-DataFrame indicator cache."""
+
+import numpy as np
+import pandas as pd
+
+from api.app.quantum.features import FeatureCache, feature_cache
+from api.app.quantum.strategies import (
+    MomentumStacker7Config,
+    QBX3Config,
+    momentum_stacker_7,
+    quantumboost_x3,
+)
+
+
+def test_cache_counts_hits_and_misses() -> None:
+    cache = FeatureCache()
+    calls = []
+    compute = lambda: calls.append(1) or np.zeros(4)  # noqa: E731
+    cache.get(("x", 1), compute)
+    cache.get(("x", 1), compute)
+    cache.get(("x", 2), compute)
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_evicts_to_memory_bound() -> None:
+    cache = FeatureCache(max_bytes=100)
+    for i in range(5):
+        cache.get(i, lambda: np.zeros(5))
+    assert cache.nbytes <= 100
+    assert cache.stats()["entries"] == 2
+    cache.get("big", lambda: np.zeros(50))
+    assert "big" not in cache._store
+
+
+def test_cache_is_attached_to_frame_not_copies() -> None:
+    df = pd.DataFrame({"close": np.arange(10.0)})
+    cache = feature_cache(df)
+    assert feature_cache(df) is cache
+    assert feature_cache(df.copy()) is not cache
+
+
+def test_strategy_reuses_cached_indicators() -> None:
+    rng = np.random.default_rng(0)
+    close = 100 + rng.normal(0, 1, 500).cumsum()
+    volume = 1e5 + rng.normal(0, 2e4, 500)
+    sent = np.full(500, 0.8)
+    cache = FeatureCache()
+    plain = quantumboost_x3(close, volume, sent, QBX3Config())
+    first = quantumboost_x3(close, volume, sent, QBX3Config(), cache)
+    second = quantumboost_x3(close, volume, sent, QBX3Config(rsi_buy_low=35), cache)
+    assert np.array_equal(plain[0], first[0])
+    assert cache.misses == 3
+    assert cache.hits == 3
+    assert second[0].sum() >= first[0].sum()
+
+
+def test_strategy_masks_for_symbol_matrix() -> None:
+    rng = np.random.default_rng(4)
+    close = 100 + rng.normal(0, 1, (3, 500)).cumsum(axis=1)
+    volume = rng.uniform(1e3, 2e3, (3, 500))
+    sent = rng.uniform(0, 1, (3, 500))
+    close[2, :40] = np.nan
+    entries, exits, _, _ = quantumboost_x3(close, volume, sent, QBX3Config(rsi_buy_low=45))
+    assert entries.shape == exits.shape == close.shape
+    assert not entries[2, :40].any()
+    for i, s in enumerate((0, 0, 40)):
+        row = quantumboost_x3(close[i, s:], volume[i, s:], sent[i, s:], QBX3Config(rsi_buy_low=45))
+        assert np.array_equal(entries[i, s:], row[0])
+        assert np.array_equal(exits[i, s:], row[1])
+
+
+def test_momentum_masks_for_ragged_rows() -> None:
+    rng = np.random.default_rng(5)
+    # On a rising history the wrapped first bars have negative momentum.
+    close = 100 + np.linspace(0, 150, 300) + rng.normal(0, 0.5, (2, 300))
+    close[1, :25] = np.nan
+    cfg = MomentumStacker7Config()
+    masks = momentum_stacker_7(close, cfg)
+    for i, s in enumerate((0, 25)):
+        row = momentum_stacker_7(close[i, s:], cfg)
+        for full, single in zip(masks, row):
+            if np.ndim(full) == 2:
+                assert np.array_equal(full[i, s:], single)
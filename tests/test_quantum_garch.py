@@ -0,0 +1,148 @@
+"""Tests for the fitted GARCH(1,1) volatility model."""
+
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from api.app.quantum import garch
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+    apply_dynamic_thresholds,
+)
+from api.app.quantum.backtester import CONFIG_TYPES, BacktestEngine
+from api.app.quantum.garch import (
+    GarchParams,
+    conditional_vol,
+    garch_fit,
+    garch_variance,
+    walk_forward_vol,
+)
+from api.app.quantum.indicators import garch_proxy
+
+
+def _engine(vol_model: str = "garch") -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=replace(SizingParams(), vol_model=vol_model),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(),
+        seed=42,
+        outdir=Path("out") / "test",
+    )
+
+
+def _simulate(rows: int, size: int, omega: float, alpha: float, beta: float) -> np.ndarray:
+    z = np.random.default_rng(1).standard_normal((rows, size))
+    r = np.empty((rows, size))
+    h = np.full(rows, omega / (1 - alpha - beta))
+    for t in range(size):
+        r[:, t] = np.sqrt(h) * z[:, t]
+        h = omega + alpha * r[:, t] ** 2 + beta * h
+    return r
+
+
+def test_variance_matches_recursion() -> None:
+    r = np.random.default_rng(0).normal(0, 0.01, 500)
+    params = GarchParams(2e-6, 0.07, 0.9, 0.0, True)
+    h = np.var(r, ddof=1)
+    expected = [h]
+    for x in r:
+        h = 2e-6 + 0.07 * x * x + 0.9 * h
+        expected.append(h)
+    assert np.allclose(garch_variance(r, params), expected, rtol=1e-12)
+
+
+def test_batch_fit_recovers_parameters() -> None:
+    r = _simulate(8, 3000, 1e-6, 0.08, 0.9)
+    fit = garch_fit(r)
+    assert fit.alpha.shape == (8,) and fit.converged.all()
+    assert abs(np.median(fit.alpha) - 0.08) < 0.02
+    assert abs(np.median(fit.beta) - 0.9) < 0.03
+    single = garch_fit(r[3])
+    assert single.beta == pytest.approx(fit.beta[3], rel=1e-4)
+    vol = conditional_vol(r, fit)
+    assert vol.shape == r.shape and np.all(vol > 0)
+
+
+def test_simulate_sizes_with_garch_volatility() -> None:
+    params = {key: cls() for key, cls in CONFIG_TYPES.items()}
+    garch = _engine()
+    res = garch.simulate(garch.load_data(), params)
+    base = _engine("realized")
+    ref = base.simulate(base.load_data(), params)
+    assert res.trades == ref.trades
+    assert res.equity_curve[-1] != ref.equity_curve[-1]
+    with pytest.raises(ValueError):
+        bad = _engine("ewma")
+        bad.simulate(bad.load_data(), params)
+
+
+def test_dynamic_thresholds_follow_volatility_series() -> None:
+    sigma = np.array([0.01, 0.03])
+    tp, sl, lo, hi = apply_dynamic_thresholds(0.02, 0.01, 30, 70, sigma, DynamicThresholdsConfig())
+    assert np.allclose(tp, [0.02, 0.025]) and np.allclose(sl, [0.01, 0.0125])
+    assert list(lo) == [30, 28] and list(hi) == [70, 72]
+
+
+def test_walk_forward_vol_only_sees_earlier_returns() -> None:
+    r = _simulate(2, 1600, 1e-6, 0.08, 0.9)
+    vol = walk_forward_vol(r, window=500, refit=200)
+    assert np.isnan(vol[:, :500]).all() and np.all(vol[:, 500:] > 0)
+    shocked = r.copy()
+    shocked[:, 900:] *= 10
+    again = walk_forward_vol(shocked, window=500, refit=200)
+    assert np.array_equal(again[:, :900], vol[:, :900], equal_nan=True)
+    assert np.array_equal(walk_forward_vol(r[1], window=500, refit=200), vol[1], equal_nan=True)
+
+
+def test_failed_line_search_is_not_converged(monkeypatch) -> None:
+    objective = garch._objective
+    calls = []
+
+    def uphill(u, r2, v):
+        # Every step after the starting point makes the fit worse.
+        f, g = objective(u, r2, v)
+        calls.append(1)
+        return (f if len(calls) == 1 else np.full_like(f, np.inf)), g
+
+    monkeypatch.setattr(garch, "_objective", uphill)
+    fit = garch.garch_fit(_simulate(3, 500, 1e-6, 0.08, 0.9))
+    assert not fit.converged.any()
+
+
+def test_garch_proxy_falls_back_on_degenerate_input() -> None:
+    with np.errstate(all="raise"):
+        assert garch_proxy(np.array([0.01])) == 0.0
+        assert garch_proxy(np.zeros(300)) == 0.0
+    r = _simulate(1, 300, 1e-6, 0.08, 0.9)[0]
+    assert garch_proxy(r) > 0
+
+
+def test_garch_runs_widen_thresholds_on_volatile_bars(monkeypatch) -> None:
+    params = {key: cls() for key, cls in CONFIG_TYPES.items()}
+    engine = _engine("garch")
+    df = engine.load_data()
+
+    def high_vol(self, ret, cache):
+        return np.full(len(ret), 0.03)
+
+    monkeypatch.setattr(BacktestEngine, "_volatility", high_vol)
+    wide = engine.simulate(df, params)
+    engine.dyn = DynamicThresholdsConfig(widen_in_high_vol=False)
+    fixed = engine.simulate(df, params)
+    assert wide.trades == fixed.trades
+    assert np.abs(wide.ledger["pnl"]).max() > np.abs(fixed.ledger["pnl"]).max()
+
+    engine = _engine("realized")
+    realized = engine.simulate(df, params)
+    assert np.array_equal(realized.equity_curve, fixed.equity_curve)
@@ -1,7 +1,28 @@
 """Basic tests for quantum indicator utilities."""
 
 import numpy as np
-from api.app.quantum.indicators import ema, rsi
+from api.app.quantum.indicators import (
+    atr,
+    ema,
+    ema_batch,
+    macd,
+    momentum,
+    rolling_std,
+    rsi,
+    sma,
+    zscore,
+)
+
+
+def _ema_loop(x: np.ndarray, n: int, s0=None) -> np.ndarray:
+    k = 2 / (n + 1)
+    out = np.empty_like(x)
+    s = x[0] if s0 is None else k * x[0] + (1 - k) * s0
+    out[0] = s
+    for i in range(1, len(x)):
+        s = k * x[i] + (1 - k) * s
+        out[i] = s
+    return out
 
 
 def test_ema_increasing() -> None:
@@ -14,3 +35,58 @@ def test_rsi_bounds() -> None:
     series = np.linspace(1, 10, 10)
     out = rsi(series)
     assert np.all((0 <= out) & (out <= 100))
+
+
+def test_ema_matches_recursive_loop() -> None:
+    x = 100 + np.random.default_rng(0).normal(0, 1, 20000).cumsum() * 0.01
+    for n in (1, 2, 9, 14, 26, 200):
+        assert np.allclose(ema(x, n), _ema_loop(x, n), rtol=1e-12, atol=0)
+    assert np.allclose(ema(x[:50], 5, s0=3.0), _ema_loop(x[:50], 5, 3.0), rtol=1e-12, atol=0)
+    assert ema(x[:0], 5).shape == (0,)
+
+
+def test_ema_batch_rows_match_single_windows() -> None:
+    x = np.random.default_rng(1).normal(0, 1, (2, 3000))
+    assert np.array_equal(ema_batch(x[0], (12, 26)), np.stack([ema(x[0], 12), ema(x[0], 26)]))
+    rows = ema_batch(x, 14, s0=(0.5, -0.5))
+    assert np.array_equal(rows[1], ema(x[1], 14, s0=-0.5))
+    line, signal, hist = macd(x[0])
+    assert np.array_equal(line, ema(x[0], 12) - ema(x[0], 26))
+
+
+def test_rolling_std_and_zscore_match_window_slices() -> None:
+    rng = np.random.default_rng(2)
+    x = 30000 + rng.normal(0, 1, 3000).cumsum() * 5
+    for n in (1, 5, 20, 37):
+        wins = [x[max(0, i - n + 1) : i + 1] for i in range(len(x))]
+        sd = np.array([np.std(w) for w in wins])
+        assert np.allclose(rolling_std(x, n), sd, rtol=1e-12, atol=1e-12)
+        z = np.array([(w[-1] - np.mean(w)) / (np.std(w) if np.std(w) > 1e-12 else 1.0) for w in wins])
+        assert np.allclose(zscore(x, n), z, rtol=0, atol=1e-9)
+    assert np.array_equal(zscore(np.ones(5), 3), np.zeros(5))
+
+
+def test_matrix_rows_match_ragged_series() -> None:
+    rng = np.random.default_rng(3)
+    starts = (0, 5, 300, 580)
+    x = np.full((len(starts), 600), np.nan)
+    for i, s in enumerate(starts):
+        x[i, s:] = 100 + rng.normal(0, 1, 600 - s).cumsum()
+    hi, lo = x + 1, x - 1
+    checks = [
+        (lambda c: ema(c, 9), x),
+        (rsi, x),
+        (lambda c: macd(c)[1], x),
+        (lambda c: rolling_std(c, 7), x),
+        (lambda c: zscore(c, 7), x),
+        (lambda c: sma(c, 20), x),
+        (lambda c: momentum(c, 7), x),
+    ]
+    for fn, data in checks:
+        out = fn(data)
+        for i, s in enumerate(starts):
+            assert np.all(np.isnan(out[i, :s]))
+            assert np.array_equal(out[i, s:], fn(data[i, s:]))
+    out = atr(hi, lo, x)
+    for i, s in enumerate(starts):
+        assert np.array_equal(out[i, s:], atr(hi[i, s:], lo[i, s:], x[i, s:]))
@@ -0,0 +1,175 @@
+"""Tests for the backtest job queue and its API."""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import BacktestEngine
+from api.app.quantum.jobs import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    FINAL_STATES,
+    RUNNING,
+    JobQueue,
+    ThrottledEmitter,
+)
+from api.app.quantum.results import ResultCache
+from api.app.routers import quantum
+
+
+def _sleep(seconds: float, emit) -> float:
+    emit("tick", n=1, total=2)
+    time.sleep(seconds)
+    return seconds
+
+
+def _fail(emit) -> None:
+    raise RuntimeError("boom")
+
+
+def _linger(seconds: float, emit) -> str:
+    # Keeps the process alive after the result, like deferred plot rendering.
+    threading.Thread(target=time.sleep, args=(seconds,)).start()
+    return "done"
+
+
+def _wait(get, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = get()
+        if job.status in FINAL_STATES:
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_queue_runs_cancels_and_reports_failures() -> None:
+    queue = JobQueue(max_jobs=1)
+    try:
+        done = queue.submit(_sleep, 0.0)
+        slow = queue.submit(_sleep, 30.0)
+        queued = queue.submit(_sleep, 0.0)
+        assert _wait(lambda: queue.get(done.id)).result == 0.0
+        assert queue.cancel(queued.id).status == CANCELLED
+        while queue.get(slow.id).progress < 0.5:
+            time.sleep(0.05)
+        assert queue.get(slow.id).status == RUNNING
+        assert queue.cancel(slow.id).status == CANCELLED
+        job_id = queue.submit(_fail).id
+        failed = _wait(lambda: queue.get(job_id))
+        assert failed.status == FAILED and "boom" in failed.error
+    finally:
+        queue.close()
+
+
+def test_lingering_job_process_does_not_block_the_queue() -> None:
+    queue = JobQueue(max_jobs=1)
+    try:
+        job = queue.submit(_linger, 3.0)
+        assert _wait(lambda: queue.get(job.id)).status == DONE
+        waiting = queue.submit(_sleep, 0.0)
+        started = time.monotonic()
+        queue.get(job.id)
+        assert queue.get(waiting.id).status != RUNNING
+        assert time.monotonic() - started < 0.5
+        assert _wait(lambda: queue.get(waiting.id)).result == 0.0
+    finally:
+        queue.close()
+
+
+def test_finished_jobs_are_evicted() -> None:
+    queue = JobQueue(ttl=60.0, max_finished=2)
+    first, second, third = (queue.add_result(n) for n in range(3))
+    with pytest.raises(KeyError):
+        queue.get(first.id)
+    assert queue.get(third.id).result == 2
+    second.finished -= 120.0
+    with pytest.raises(KeyError):
+        queue.get(second.id)
+    assert queue.get(third.id).status == DONE
+
+
+def test_throttled_emitter_coalesces_trials() -> None:
+    sent = []
+    emit = ThrottledEmitter(lambda kind, data: sent.append((kind, data.get("n"))), interval=60.0)
+    for n in range(1, 6):
+        emit("trial", n=n)
+    emit("simulated")
+    emit("trial", n=6)
+    emit.flush()
+    assert sent == [("trial", 1), ("trial", 5), ("simulated", None), ("trial", 6)]
+
+
+def test_run_full_emits_progress_events(tmp_path) -> None:
+    engine = BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(trials=3, pruner="none"),
+        seed=42,
+        outdir=Path(tmp_path),
+    )
+    events = []
+    engine.run_full(lambda kind, **data: events.append((kind, data)))
+    assert [k for k, _ in events] == ["loaded", "trial", "trial", "trial", "simulated", "saved"]
+    trials = [d for k, d in events if k == "trial"]
+    assert [d["n"] for d in trials] == [1, 2, 3]
+    assert trials[-1]["best"] == max(d["value"] for d in trials)
+
+
+def test_backtest_endpoint_returns_job(monkeypatch, tmp_path) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(quantum, "jobs", JobQueue(max_jobs=1))
+    monkeypatch.setattr(quantum, "results", ResultCache(tmp_path / "results"))
+    app = FastAPI()
+    app.include_router(quantum.router, prefix="/api")
+    client = TestClient(app)
+    try:
+        body = {"run": {"trials": 2, "pruner": "none"}}
+        resp = client.post("/api/quantum/backtest", json=body)
+        assert resp.status_code == 202 and not resp.json()["cached"]
+        job_id = resp.json()["job_id"]
+        job = _wait(lambda: quantum.jobs.get(job_id))
+        assert job.status == DONE, job.error
+        status = client.get(f"/api/quantum/backtest/{job_id}").json()
+        assert status["progress"] == 1.0
+        report = client.get(f"/api/quantum/backtest/{job_id}/report").json()
+        assert set(report["summary"]) >= {"equity", "max_dd"}
+        with client.stream("GET", f"/api/quantum/backtest/{job_id}/events") as stream:
+            lines = [line for line in stream.iter_lines() if line.startswith("data: ")]
+        kinds = [json.loads(line[6:])["event"] for line in lines]
+        assert kinds[0] == "loaded" and kinds[-3:] == ["simulated", "saved", "done"]
+        again = client.post("/api/quantum/backtest", json=body)
+        assert again.status_code == 200 and again.json()["cached"]
+        cached = client.get(f"/api/quantum/backtest/{again.json()['job_id']}/report").json()
+        assert cached == report
+        # The worker count is clamped, rejected below 1 and not part of the key.
+        many = client.post("/api/quantum/backtest", json={"run": {**body["run"], "workers": 512}})
+        assert many.status_code == 200 and many.json()["cached"]
+        bad = client.post("/api/quantum/backtest", json={"run": {**body["run"], "workers": 0}})
+        assert bad.status_code == 422
+        confirmed = {"run": {**body["run"], "confirm_tf": {"qbx3": "15m"}}}
+        other = client.post("/api/quantum/backtest", json=confirmed)
+        assert other.status_code == 202 and not other.json()["cached"]
+        quantum.jobs.cancel(other.json()["job_id"])
+        assert (Path(report["outdir"]) / "equity_curve.png").exists()
+        assert client.get("/api/quantum/backtest/nope").status_code == 404
+    finally:
+        quantum.jobs.close()
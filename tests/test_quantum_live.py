@@ -0,0 +1,41 @@
+"""Tests for the incremental indicators."""
+
+import numpy as np
+import pytest
+
+from api.app.quantum.indicators import atr, bollinger, ema, macd, rolling_moments, rsi, zscore
+from api.app.quantum.live import ATR, EMA, MACD, RSI, Bollinger, RollingMoments, ZScore
+
+
+def _series(size: int = 1300, seed: int = 5) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 30000 + rng.normal(0, 40, size).cumsum()
+
+
+def _replay(indicator, *columns: np.ndarray) -> np.ndarray:
+    return np.array([indicator.update(*bar) for bar in zip(*columns)])
+
+
+@pytest.mark.parametrize("n", [1, 2, 14, 200])
+def test_ema_replay_matches_batch(n: int) -> None:
+    x = _series()
+    assert np.array_equal(_replay(EMA(n), x), ema(x, n))
+    assert np.array_equal(_replay(EMA(n, s0=x[0] - 3), x[1:]), ema(x[1:], n, s0=x[0] - 3))
+
+
+@pytest.mark.parametrize("n", [1, 7, 20])
+def test_rolling_moments_replay_matches_batch(n: int) -> None:
+    x = _series()
+    mean, std = _replay(RollingMoments(n), x).T
+    assert np.array_equal(mean, rolling_moments(x, n)[0])
+    assert np.array_equal(std, rolling_moments(x, n)[1])
+    assert np.array_equal(_replay(ZScore(n), x), zscore(x, n))
+
+
+def test_oscillator_replay_matches_batch() -> None:
+    x = _series()
+    hi, lo = x + 5, x - 5
+    assert np.array_equal(_replay(RSI(), x), rsi(x))
+    assert np.array_equal(_replay(MACD(), x).T, np.array(macd(x)))
+    assert np.array_equal(_replay(Bollinger(19), x).T, np.array(bollinger(x, 19)))
+    assert np.array_equal(_replay(ATR(), hi, lo, x), atr(hi, lo, x))
@@ -0,0 +1,89 @@
+"""Tests for run artifacts and downsampled plots."""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import BacktestEngine
+from api.app.quantum.plots import lttb
+from api.app.quantum.results import ResultCache
+from api.app.routers import quantum
+
+
+def _engine(outdir: Path, **run) -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(trials=2, pruner="none", **run),
+        seed=42,
+        outdir=outdir,
+    )
+
+
+def test_lttb_keeps_endpoints_and_extremes() -> None:
+    rng = np.random.default_rng(1)
+    y = rng.normal(size=10_000).cumsum()
+    y[4321] = 500.0
+    idx = lttb(y, 200)
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx and np.argmin(y) in idx
+    assert np.array_equal(lttb(y[:50], 200), np.arange(50))
+
+
+def test_output_policies(tmp_path) -> None:
+    _engine(tmp_path / "none", outputs="none").run_full()
+    assert not (tmp_path / "none").exists()
+    _engine(tmp_path / "metrics", outputs="metrics").run_full()
+    assert sorted(p.name for p in (tmp_path / "metrics").iterdir()) == ["metrics.csv", "trades.npy"]
+    _engine(tmp_path / "full").run_full()
+    assert (tmp_path / "full" / "equity_curve.png").exists()
+
+
+def test_background_plots_render_after_report(tmp_path) -> None:
+    engine = _engine(tmp_path / "run", background_plots=True)
+    events = []
+    engine.run_full(lambda kind, **data: events.append((kind, data)))
+    assert events[-1][1]["plots_pending"]
+    assert not (tmp_path / "run" / "drawdown.png").exists()
+    thread = engine.render_plots(tmp_path / "published", background=True)
+    thread.join()
+    assert (tmp_path / "published" / "drawdown.png").exists()
+    assert engine.render_plots() is None
+
+
+def test_matplotlib_is_imported_only_for_plots() -> None:
+    code = (
+        "import sys; from api.app.routers import quantum; "
+        "print('matplotlib' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_deferred_plots_skip_unpublished_entry(tmp_path, monkeypatch) -> None:
+    cache = ResultCache(tmp_path / "results")
+    # A concurrent identical run published the key first.
+    monkeypatch.setattr(cache, "commit", lambda key, staging: False)
+    run = RunConfig(trials=2, pruner="none", background_plots=True)
+    quantum.execute_backtest(quantum.BacktestReq(run=run), cache, "k")
+    for thread in threading.enumerate():
+        if thread.name == "render-plots":
+            thread.join()
+    assert not cache.entry("k").exists()
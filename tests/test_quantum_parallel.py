@@ -0,0 +1,69 @@
+"""Tests for shared-memory parallel tuning."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.app.quantum import adaptive
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import BacktestEngine
+from api.app.quantum.shared import SharedFrame, attach_frame
+
+
+def test_run_config_clamps_workers(monkeypatch) -> None:
+    monkeypatch.setattr(adaptive, "MAX_WORKERS", 4)
+    assert RunConfig(workers=64).workers == 4
+    with pytest.raises(ValueError):
+        RunConfig(workers=0)
+
+
+def test_shared_frame_roundtrip_is_zero_copy() -> None:
+    df = pd.DataFrame(
+        {
+            "ts": pd.date_range("2024-01-01", periods=6, freq="min"),
+            "close": np.arange(6, dtype=np.float32),
+            "volume": np.arange(6),
+            "tag": list("abcdef"),
+        }
+    )
+    with SharedFrame(df) as shared:
+        view, shm = attach_frame(shared.spec)
+        pd.testing.assert_frame_equal(view, df)
+        block = np.ndarray(shm.size, dtype=np.uint8, buffer=shm.buf)
+        assert np.shares_memory(view["close"].to_numpy(), block)
+        assert np.shares_memory(view["ts"].to_numpy(), block)
+        del view
+        shm.close()
+    with pytest.raises(ValueError):
+        SharedFrame(pd.DataFrame({"obj": [object()]}))
+
+
+@pytest.mark.parametrize("precision", ["float64", "float32"])
+def test_parallel_trials_match_in_process_simulation(monkeypatch, precision) -> None:
+    monkeypatch.setattr(adaptive, "MAX_WORKERS", 2)
+    engine = BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(trials=4, workers=2, precision=precision),
+        seed=3,
+        outdir=Path("out") / "test",
+    )
+    df = engine.load_data()
+    study = engine._tune(df)
+    assert len(study.trials) == 4
+    for trial in study.trials:
+        res = engine.simulate(df, engine._build_params(trial.params))
+        assert trial.value == engine._score(res.equity_curve[-1], res.max_dd)
@@ -0,0 +1,60 @@
+"""Tests for the multi-symbol portfolio backtest."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import CONFIG_TYPES, BacktestEngine
+from api.app.quantum.portfolio import SymbolSource, run_portfolio
+
+
+def _engine(seed: int = 42) -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(seed=seed),
+        seed=seed,
+        outdir=Path("out") / "test",
+    )
+
+
+def test_single_symbol_portfolio_matches_simulate() -> None:
+    engine = _engine()
+    params = {key: cls() for key, cls in CONFIG_TYPES.items()}
+    res = engine.simulate(engine.load_data(), params)
+    port = run_portfolio(engine, [SymbolSource("BTC/USDT")], params)
+    assert (port.summary["trades"], port.summary["wins"]) == (res.trades, res.wins)
+    assert port.summary["equity"] == res.equity_curve[-1]
+    assert port.summary["max_dd"] == res.max_dd
+
+
+def test_parallel_portfolio_matches_serial() -> None:
+    engine = _engine()
+    sources = [SymbolSource("BTC/USDT"), SymbolSource("ETH/USDT"), SymbolSource("SOL/USDT")]
+    serial = run_portfolio(engine, sources, workers=1)
+    parallel = run_portfolio(engine, sources, workers=2)
+    assert np.array_equal(serial.equity, parallel.equity)
+    assert serial.report() == parallel.report()
+    assert np.all(np.diff(serial.ts) >= 0)
+    per = serial.per_symbol
+    assert sum(p["trades"] for p in per.values()) == serial.summary["trades"]
+    total = sum(p["contribution"] for p in per.values())
+    assert total == pytest.approx(serial.summary["pnl"], abs=1e-12)
+
+
+def test_portfolio_rejects_duplicate_symbols() -> None:
+    with pytest.raises(ValueError):
+        run_portfolio(_engine(), [SymbolSource("BTC/USDT"), SymbolSource("BTC/USDT")])
@@ -0,0 +1,87 @@
+"""Tests for staged simulation and pruned tuning."""
+
+from pathlib import Path
+
+import pytest
+
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum import backtester
+from api.app.quantum.backtester import BacktestEngine, _make_pruner
+from api.app.quantum.engine import PositionState
+from api.app.quantum.strategies import (
+    ATRTrendArbConfig,
+    MomentumStacker7Config,
+    QBX3Config,
+    SSv2Config,
+)
+
+
+def _engine(run: RunConfig) -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=run,
+        seed=42,
+        outdir=Path("out") / "test",
+    )
+
+
+def _params():
+    return {
+        "qbx3": QBX3Config(),
+        "ssv2": SSv2Config(),
+        "atra": ATRTrendArbConfig(),
+        "ms7": MomentumStacker7Config(),
+    }
+
+
+def test_final_stage_matches_simulate() -> None:
+    engine = _engine(RunConfig())
+    df = engine.load_data()
+    params = _params()
+    res = engine.simulate(df, params)
+    states = list(engine.simulate_stages(df, params, 5))
+    assert len(states) == 5
+    assert states[-1].equity == res.equity_curve[-1]
+    assert states[-1].max_dd == res.max_dd
+    assert states[-1].trades == res.trades
+
+
+def test_median_pruner_stops_trials_early() -> None:
+    engine = _engine(RunConfig(trials=20, pruner="median"))
+    study = engine._tune(engine.load_data())
+    states = [t.state.name for t in study.trials]
+    assert "PRUNED" in states
+    assert states.count("COMPLETE") + states.count("PRUNED") == 20
+
+
+def test_unknown_pruner_rejected() -> None:
+    with pytest.raises(ValueError):
+        _make_pruner("bogus")
+
+
+def test_worker_computes_trial_signals_once(monkeypatch) -> None:
+    engine = _engine(RunConfig())
+    df = engine.load_data()
+    calls = []
+    signals = engine._signals
+    monkeypatch.setattr(engine, "_signals", lambda *a: calls.append(1) or signals(*a))
+    monkeypatch.setattr(backtester, "_WORKER", {"engine": engine, "df": df})
+    state = PositionState()
+    bounds = backtester._stage_bounds(len(df), 4)
+    for step, (start, stop) in enumerate(bounds):
+        job = (7, _params(), state, start, stop, step == len(bounds) - 1)
+        state = backtester._advance_job(job)
+    assert len(calls) == 1 and backtester._WORKER["signals"] is None
+    assert state.equity == engine.simulate(df, _params()).equity_curve[-1]
@@ -0,0 +1,90 @@
+"""Tests for the content-addressed result cache."""
+
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from api.app.quantum import datacache
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import BacktestEngine
+from api.app.quantum.results import ResultCache, run_key
+
+
+def _engine(csv=None, seed: int = 42) -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=csv,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(seed=seed),
+        seed=seed,
+        outdir=Path("out") / "test",
+    )
+
+
+def test_run_key_tracks_config_and_data(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(datacache, "CACHE_DIR", tmp_path / "cache")
+    csv = tmp_path / "ohlcv.csv"
+    pd.DataFrame({"close": [1.0, 2.0]}).to_csv(csv, index=False)
+    key = run_key(_engine(str(csv)), "cli")
+    hashed = []
+    digest = datacache._file_digest
+    monkeypatch.setattr(datacache, "_file_digest", lambda p: hashed.append(p) or digest(p))
+    assert key == run_key(_engine(str(csv)), "cli")
+    assert hashed == []
+    assert key != run_key(_engine(str(csv)), "api")
+    assert key != run_key(_engine(str(csv), seed=7), "cli")
+    assert key != run_key(_engine(), "cli")
+    pd.DataFrame({"close": [1.0, 3.0]}).to_csv(csv, index=False)
+    os.utime(csv, ns=(1, 1))
+    assert key != run_key(_engine(str(csv)), "cli")
+    assert len(hashed) == 1
+
+
+def test_commit_lookup_and_eviction(tmp_path) -> None:
+    cache = ResultCache(tmp_path / "results", max_bytes=1500, max_age=3600)
+    assert cache.lookup("a") is None
+    for key in ("a", "b", "c"):
+        staging = cache.staging(key)
+        (staging / "report.json").write_text("{}")
+        (staging / "blob").write_bytes(b"x" * 600)
+        cache.commit(key, staging)
+    # Oldest entries go first once the total exceeds max_bytes.
+    assert cache.lookup("a") is None
+    assert cache.report("c") == {}
+    legacy = tmp_path / "20240101-000000-abcdef"
+    legacy.mkdir()
+    old = time.time() - 7200
+    os.utime(legacy, (old, old))
+    os.utime(cache.entry("b"), (old, old))
+    removed = cache.evict()
+    assert set(removed) == {legacy, cache.entry("b")}
+    assert cache.lookup("c") is not None
+
+
+def test_commit_replaces_older_entry_but_not_concurrent_run(tmp_path) -> None:
+    cache = ResultCache(tmp_path / "results")
+    for report in ("old", "new"):
+        staging = cache.staging("k")
+        (staging / "report.json").write_text(f'"{report}"')
+        assert cache.commit("k", staging)
+    assert cache.report("k") == "new"
+    assert [p.name for p in cache.root.iterdir()] == ["k"]
+    slow = cache.staging("k")
+    fast = cache.staging("k")
+    (fast / "report.json").write_text('"fast"')
+    assert cache.commit("k", fast)
+    (slow / "report.json").write_text('"slow"')
+    assert not cache.commit("k", slow)
+    assert cache.report("k") == "fast" and not slow.exists()
@@ -0,0 +1,49 @@
+"""Tests for block-bootstrap scenarios."""
+
+import numpy as np
+import pytest
+
+from api.app.quantum.scenarios import bootstrap_indices, bootstrap_paths
+
+
+def _history(n: int = 2000) -> dict:
+    rng = np.random.default_rng(2)
+    close = 100 * np.exp(rng.normal(0, 0.01, n).cumsum())
+    return {
+        "open": close * (1 + rng.normal(0, 0.001, n)),
+        "high": close * 1.002,
+        "low": close * 0.997,
+        "close": close,
+        "volume": rng.uniform(1e3, 2e3, n),
+        "sentiment": rng.uniform(0, 1, n),
+    }
+
+
+@pytest.mark.parametrize("method", ["stationary", "moving"])
+def test_scenario_ranges_match_full_batch(method) -> None:
+    full = bootstrap_indices(500, 40, 25, method, seed=9)
+    assert full.shape == (40, 500)
+    assert full.min() >= 0 and full.max() < 500
+    assert np.array_equal(bootstrap_indices(500, 7, 25, method, seed=9, start=30), full[30:37])
+    # Bars continue their block: most steps advance by exactly one bar.
+    assert np.mean(np.diff(full, axis=1) == 1) > 0.9
+
+
+def test_paths_keep_bar_shape_and_returns() -> None:
+    h = _history()
+    paths = bootstrap_paths(h, 16, block=30, seed=1)
+    assert all(paths[c].shape == (16, 2000) for c in paths)
+    assert np.allclose(paths["high"] / paths["close"], 1.002)
+    assert np.allclose(paths["low"] / paths["close"], 0.997)
+    # Every scenario return is a return of the history.
+    log_ret = np.diff(np.log(paths["close"]), axis=1)
+    hist = np.sort(np.append(np.log(h["close"][1:] / h["close"][:-1]), 0.0))
+    pos = np.clip(np.searchsorted(hist, log_ret), 1, len(hist) - 1)
+    nearest = np.minimum(np.abs(hist[pos] - log_ret), np.abs(hist[pos - 1] - log_ret))
+    assert nearest.max() < 1e-9
+    assert np.isin(paths["sentiment"], h["sentiment"]).all()
+
+
+def test_unknown_method_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        bootstrap_indices(10, 1, 2, "circular")
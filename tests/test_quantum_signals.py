@@ -0,0 +1,88 @@
+"""Tests for the compiled strategy signal graphs."""
+
+import numpy as np
+
+from api.app.quantum import signals
+from api.app.quantum.features import FeatureCache
+from api.app.quantum.signals import col, compile_signals, feature, param
+from api.app.quantum.strategies import (
+    SIGNALS,
+    ATRTrendArbConfig,
+    MomentumStacker7Config,
+    QBX3Config,
+    SSv2Config,
+    atr_trend_arb,
+    momentum_stacker_7,
+    quantumboost_x3,
+    sentimentsurge_v2,
+)
+
+
+def _columns(n: int = 800) -> dict:
+    rng = np.random.default_rng(5)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    return {
+        "close": close,
+        "high": close + 0.5,
+        "low": close - 0.5,
+        "volume": rng.uniform(1e3, 2e3, n),
+        "sentiment": rng.uniform(0.5, 1.0, n),
+    }
+
+
+def _params(rsi_low: float = 40.0) -> dict:
+    return {
+        "qbx3": QBX3Config(rsi_buy_low=rsi_low, sentiment_buy=0.6),
+        "ssv2": SSv2Config(),
+        "atra": ATRTrendArbConfig(atr_delta=0.05),
+        "ms7": MomentumStacker7Config(mom_thresh=0.005),
+    }
+
+
+def test_shared_indicators_compile_to_one_node() -> None:
+    keys = [n.args[:2] for n in SIGNALS.features()]
+    assert len(keys) == len(set(keys))
+    assert keys.count(("rsi", "close")) == 1
+    assert keys.count(("macd", "close")) == 1
+
+
+def test_program_matches_strategy_functions() -> None:
+    c, p = _columns(), _params()
+    masks = SIGNALS.evaluate(c, p, FeatureCache())
+    expected = {
+        "qbx3": quantumboost_x3(c["close"], c["volume"], c["sentiment"], p["qbx3"]),
+        "ssv2": sentimentsurge_v2(c["close"], c["volume"], c["sentiment"], p["ssv2"]),
+        "atra": atr_trend_arb(c["close"], c["high"], c["low"], p["atra"]),
+        "ms7": momentum_stacker_7(c["close"], p["ms7"]),
+    }
+    for key, (entries, exits, _, _) in expected.items():
+        assert np.array_equal(masks[key, "entries"], entries)
+        assert np.array_equal(masks[key, "exits"], exits)
+
+
+def test_each_indicator_runs_once_per_evaluation(monkeypatch) -> None:
+    calls = []
+    for name, kernel in list(signals.FEATURES.items()):
+        counted = lambda *a, _k=kernel, _n=name: calls.append(_n) or _k(*a)  # noqa: E731
+        monkeypatch.setitem(signals.FEATURES, name, counted)
+    SIGNALS.evaluate(_columns(), _params())
+    assert sorted(calls) == sorted(set(calls))
+    assert len(calls) == len(SIGNALS.features())
+
+
+def test_parameter_free_terms_are_cached_once() -> None:
+    c, cache = _columns(), FeatureCache()
+    first = SIGNALS.evaluate(c, _params(), cache)
+    stored = cache.stats()["entries"]
+    second = SIGNALS.evaluate(c, _params(rsi_low=45.0), cache)
+    assert cache.stats()["entries"] == stored
+    assert any(k[0] == signals.SIGNAL_KEY for k in cache._store)
+    assert second["qbx3", "entries"].sum() >= first["qbx3", "entries"].sum()
+
+
+def test_graph_combines_columns_params_and_features() -> None:
+    x = col("close")
+    program = compile_signals({"up": (x > feature("ema", "close", param("s", "bb_n"))) & (x > 0)})
+    close = np.array([1.0, 2.0, 1.0, 3.0])
+    out = program.evaluate({"close": close}, {"s": ATRTrendArbConfig(bb_n=2)})["up"]
+    assert out.tolist() == [False, True, False, True]
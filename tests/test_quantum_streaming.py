@@ -0,0 +1,99 @@
+"""Tests for the chunked streaming backtest."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.app.quantum import datacache
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import BacktestEngine
+from api.app.quantum.streaming import ChunkFeatures, FeatureStream
+from api.app.quantum.strategies import (
+    ATRTrendArbConfig,
+    MomentumStacker7Config,
+    QBX3Config,
+    SSv2Config,
+)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch) -> BacktestEngine:
+    monkeypatch.setattr(datacache, "CACHE_DIR", tmp_path / "cache")
+    n = 5003
+    t = np.arange(n)
+    rng = np.random.default_rng(5)
+    close = 100 + np.sin(t / 50.0) * 2 + rng.normal(0, 0.5, size=n)
+    pd.DataFrame(
+        {
+            "ts": t,
+            "open": close,
+            "high": close + 0.5,
+            "low": close - 0.5,
+            "close": close,
+            "volume": 1e5 + rng.normal(0, 2e4, size=n),
+        }
+    ).to_csv(tmp_path / "ohlcv.csv", index=False)
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=str(tmp_path / "ohlcv.csv"),
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(),
+        seed=42,
+        outdir=tmp_path / "out",
+    )
+
+
+def test_stream_matches_in_memory_run(engine) -> None:
+    params = {
+        "qbx3": QBX3Config(sentiment_buy=0.6),
+        "ssv2": SSv2Config(),
+        "atra": ATRTrendArbConfig(bb_n=19, atr_delta=0.05),
+        "ms7": MomentumStacker7Config(mom_thresh=0.005),
+    }
+    full = engine.simulate(engine.load_data(), params)
+    for chunk in (997, 5003):
+        res = engine.simulate_stream(params, chunk_size=chunk)
+        assert (res.trades, res.wins) == (full.trades, full.wins)
+        assert np.array_equal(np.asarray(res.equity_curve), full.equity_curve)
+        assert np.array_equal(np.asarray(res.drawdown), full.drawdown)
+        assert res.max_dd == full.max_dd
+        assert np.isclose(res.sharpe, full.sharpe)
+
+
+def test_chunk_features_match_full_features() -> None:
+    rng = np.random.default_rng(9)
+    x = 100 + rng.normal(0, 0.5, 3001).cumsum() * 0.1
+    vol = 1e5 + rng.normal(0, 2e4, 3001)
+    full = FeatureStream(x, x + 0.5, x - 0.5, vol, 19).chunk(0, 3001)[1]
+    for chunk in (101, 1000):
+        stream = FeatureStream(x, x + 0.5, x - 0.5, vol, 19)
+        for a in range(0, 3001, chunk):
+            b = min(3001, a + chunk)
+            feats = stream.chunk(a, b)[1]
+            for key in (("zscore", "volume", 20), ("rolling_std", "close", 19)):
+                assert np.array_equal(feats.get(key, None), full.get(key, None)[a:b])
+
+
+def test_chunk_features_reject_unstreamed_keys() -> None:
+    feats = ChunkFeatures({("rsi", "close", 14): np.zeros(3)})
+    assert feats.get(("rsi", "close", 14), lambda: None) is not None
+    with pytest.raises(KeyError):
+        feats.get(("rsi", "close", 7), lambda: np.zeros(3))
+
+
+def test_feature_stream_requires_ordered_chunks() -> None:
+    x = np.linspace(100, 101, 50)
+    stream = FeatureStream(x, x + 1, x - 1, np.full(50, 1e5), 20)
+    stream.chunk(0, 10)
+    with pytest.raises(ValueError):
+        stream.chunk(20, 30)
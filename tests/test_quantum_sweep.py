@@ -0,0 +1,63 @@
+"""Tests for batched parameter sweeps."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import BacktestEngine
+
+
+def _engine() -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(),
+        seed=42,
+        outdir=Path("out") / "test",
+    )
+
+
+def test_sweep_matches_simulate_per_row() -> None:
+    engine = _engine()
+    df = engine.load_data()
+    grid = {
+        "qbx3_rsi_low": [25.0, 35.0],
+        "atra_n": [18, 20],
+        "atra_k": [1.8, 2.2],
+        "ms7_mom": [0.005, 0.01],
+    }
+    table = engine.sweep(df, grid, max_cells=3 * len(df))
+    assert len(table) == 16
+    for _, row in table.iterrows():
+        values = row.to_dict() | {"atra_n": int(row["atra_n"])}
+        res = engine.simulate(df, engine._build_params(values))
+        assert row["equity"] == res.equity_curve[-1]
+        assert row["max_dd"] == res.max_dd
+        assert (row["trades"], row["wins"]) == (res.trades, res.wins)
+        assert np.isclose(row["sharpe"], res.sharpe)
+
+
+def test_sweep_accepts_list_and_fills_defaults() -> None:
+    engine = _engine()
+    table = engine.sweep(engine.load_data(), [{"qbx3_tp": 0.01}, {"ms7_rsi_low": 38.0}])
+    assert table["qbx3_tp"].tolist() == [0.01, 0.02]
+    assert table["ms7_rsi_low"].tolist() == [40.0, 38.0]
+
+
+def test_sweep_rejects_unknown_parameter() -> None:
+    engine = _engine()
+    with pytest.raises(ValueError):
+        engine.sweep(engine.load_data(), {"nope": [1]})
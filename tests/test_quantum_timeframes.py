@@ -0,0 +1,114 @@
+"""Tests for higher-timeframe resampling and alignment."""
+
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.app.quantum.adaptive import (
+    DynamicThresholdsConfig,
+    FeesConfig,
+    RunConfig,
+    SizingParams,
+    VenueCosts,
+)
+from api.app.quantum.backtester import CONFIG_TYPES, BacktestEngine
+from api.app.quantum.strategies import trend_confirmation
+from api.app.quantum.timeframes import Timeframes, timeframe_seconds
+
+
+def _engine() -> BacktestEngine:
+    return BacktestEngine(
+        symbol="BTC/USDT",
+        csv_ohlcv_path=None,
+        csv_sentiment_path=None,
+        fees=FeesConfig(),
+        venue_costs=VenueCosts.defaults(),
+        sizing=SizingParams(),
+        dyn=DynamicThresholdsConfig(),
+        run=RunConfig(),
+        seed=42,
+        outdir=Path("out") / "test",
+    )
+
+
+def _frame(size: int = 600, seed: int = 2) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 0.3, size).cumsum()
+    ts = pd.date_range("2024-01-01 00:03", periods=size, freq="1min").to_numpy()
+    return pd.DataFrame(
+        {
+            "ts": ts,
+            "open": close + rng.normal(0, 0.1, size),
+            "high": close + 0.5,
+            "low": close - 0.5,
+            "close": close,
+            "volume": rng.uniform(1, 2, size),
+        }
+    )
+
+
+def test_bars_match_pandas_resample() -> None:
+    df = _frame()
+    bars = Timeframes(df).bars("15m")
+    ref = df.set_index("ts").resample("15min").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    assert np.array_equal(bars.ts, ref.index.to_numpy().astype("datetime64[s]").view(np.int64))
+    for col in ("open", "high", "low", "close"):
+        assert np.array_equal(getattr(bars, col), ref[col].to_numpy())
+    assert np.allclose(bars.volume, ref["volume"].to_numpy())
+    with pytest.raises(ValueError):
+        timeframe_seconds("5x")
+
+
+def test_alignment_has_no_look_ahead() -> None:
+    df = _frame()
+    frames = Timeframes(df)
+    idx = frames.index("5m")
+    bars = frames.bars("5m")
+    # The first bucket starts mid-way, so it completes at bar 1 (00:04).
+    assert idx[0] == -1 and idx[1] == 0 and idx[2] == 0 and idx[6] == 1
+    assert np.all(bars.end[idx[idx >= 0]] <= np.flatnonzero(idx >= 0))
+    full = trend_confirmation(frames, "15m")
+    cut = df.iloc[:400].copy()
+    assert np.array_equal(trend_confirmation(Timeframes(cut), "15m"), full[:400])
+
+
+def test_gap_delays_visibility_to_next_bar() -> None:
+    df = _frame(20).drop(index=[6]).reset_index(drop=True)
+    idx = Timeframes(df).index("5m")
+    # 00:08 was dropped, so the 00:05 bucket ends at 00:07 and shows at 00:10.
+    assert idx[5] == 0 and idx[6] == 1
+
+
+def test_confirmation_filters_entries() -> None:
+    engine = _engine()
+    df = engine.load_data()
+    params = {key: cls() for key, cls in CONFIG_TYPES.items()}
+    base = engine._signals(df, params)[2]
+    params["qbx3"] = replace(params["qbx3"], confirm_tf="15m")
+    params["ms7"] = replace(params["ms7"], confirm_tf="1h")
+    confirmed = engine._signals(df, params)[2]
+    assert np.count_nonzero(confirmed) < np.count_nonzero(base)
+    assert not np.any((base == 0) & (confirmed != 0) & np.isin(confirmed, (1, 4)))
+
+
+def test_run_full_applies_configured_confirmations(monkeypatch) -> None:
+    engine = _engine()
+    engine.run = RunConfig(trials=2, outputs="none", confirm_tf={"qbx3": "15m", "ms7": "1h"})
+    seen = []
+    simulate = engine.simulate
+
+    def spy(df, params):
+        seen.append(params)
+        return simulate(df, params)
+
+    monkeypatch.setattr(engine, "simulate", spy)
+    engine.run_full()
+    assert [(p["qbx3"].confirm_tf, p["ms7"].confirm_tf) for p in seen] == [("15m", "1h")]
+    engine.run = RunConfig(confirm_tf={"ssv2": "15m"})
+    with pytest.raises(ValueError):
+        engine._confirmed({key: cls() for key, cls in CONFIG_TYPES.items()})
@@ -13,3 +13,12 @@ def test_ema():
     data = [1, 2, 3, 4, 5]
     result = ema(data, 3)
     assert np.isclose(result[-1], 4.0, atol=1e-1)
+
+
+def test_ema_matches_recursion():
+    data = 100 + np.random.default_rng(0).normal(0, 1, 5000).cumsum()
+    expected = np.empty_like(data)
+    expected[0] = data[0]
+    for i in range(1, len(data)):
+        expected[i] = 0.1 * data[i] + 0.9 * expected[i - 1]
+    assert np.allclose(ema(data, 19), expected, rtol=1e-12, atol=0)